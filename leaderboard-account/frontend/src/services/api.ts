@@ -48,10 +48,16 @@ api.interceptors.response.use(
   }
 );
 
-export const fetchLeaderboard = async (limit: number = 50): Promise<LeaderboardEntry[]> => {
+// sortBy (a metric name) and category select a precomputed alternate ranking;
+// its entries carry the score they are ranked by in `score`
+export const fetchLeaderboard = async (
+  limit: number = 50,
+  sortBy?: string,
+  category?: string
+): Promise<LeaderboardEntry[]> => {
   try {
     const response = await api.get<ApiResponse<LeaderboardEntry>>('/leaderboard', {
-      params: { limit },
+      params: { limit, sortBy, category },
       timeout: 30000, // Increased timeout since we're processing S3 files
     });
     
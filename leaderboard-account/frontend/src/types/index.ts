@@ -8,6 +8,8 @@ export interface LeaderboardEntry {
   modelName: string;
   totalScore: number;
   metricScores: MetricScores;
+  categoryScores?: { [category: string]: MetricScores };
+  score?: number;
   timestamp: number;
   evaluationCount: number;
   status: string;
@@ -24,4 +26,7 @@ export interface ApiResponse<T> {
   rankings: T[];
   timestamp: number | null;
   count: number;
+  nextCursor?: string | null;
+  sortBy?: string;
+  category?: string | null;
 }
\ No newline at end of file
@@ -0,0 +1,128 @@
+import os
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from resilience import resilient_client
+from local_s3 import LocalS3Client
+
+logger = logging.getLogger()
+
+# Clients are created on first use and kept at module level, so warm Lambda
+# invocations reuse their connection pools instead of paying a new TCP and
+# TLS handshake per request.
+HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '4'))
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '10'))
+HTTP_RETRY_ATTEMPTS = int(os.environ.get('HTTP_RETRY_ATTEMPTS', '3'))
+HTTP_RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', '0.5'))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', '30'))
+
+# requests has no session-wide timeout, so callers pass this to every request
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+AWS_CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', '5'))
+AWS_READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', '60'))
+
+# botocore's default pool size; clients never get fewer connections than this
+AWS_MIN_POOL_CONNECTIONS = 10
+
+_http_session = None
+_aws_clients = {}
+_clients_lock = threading.Lock()
+
+def get_http_session():
+    """
+    Process-wide requests.Session with a keep-alive urllib3 pool that retries
+    connection errors and throttling/5xx responses to idempotent requests
+    """
+    global _http_session
+    with _clients_lock:
+        if _http_session is None:
+            # Imported here so functions without requests can still use get_client
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=HTTP_RETRY_ATTEMPTS,
+                backoff_factor=HTTP_RETRY_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({'GET', 'HEAD'}),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                max_retries=retry
+            )
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['Connection'] = 'keep-alive'
+            _http_session = session
+            logger.info(f"Created HTTP session (pool size {HTTP_POOL_MAXSIZE}, {HTTP_RETRY_ATTEMPTS} retries)")
+        return _http_session
+
+class LazyClient:
+    """
+    Stands in for a client until its first attribute access, so modules can
+    keep clients at module level without creating them during import
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._client = None
+
+    def resolve(self):
+        """The underlying client, created on first call"""
+        if self._client is None:
+            self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name: str):
+        return getattr(self.resolve(), name)
+
+def get_client(service_name: str, concurrency: int = 1, dependency: Optional[str] = None, **client_kwargs) -> LazyClient:
+    """
+    Shared resilient boto3 client for a service, with a connection pool large
+    enough for concurrency parallel calls; client_kwargs (e.g. endpoint_url)
+    are passed to boto3.client
+    The client is only built on first use, not when get_client is called
+    S3_BACKEND=local swaps S3 for a directory under LOCAL_S3_ROOT
+    """
+    return LazyClient(lambda: _create_client(service_name, concurrency, dependency, client_kwargs))
+
+def _create_client(service_name: str, concurrency: int, dependency: Optional[str], client_kwargs: Dict[str, Any]):
+    if service_name == 's3' and os.environ.get('S3_BACKEND') == 'local':
+        return get_local_s3_client()
+
+    max_pool_connections = max(AWS_MIN_POOL_CONNECTIONS, concurrency)
+    key = _client_key(service_name, dependency, max_pool_connections, client_kwargs)
+    with _clients_lock:
+        if key not in _aws_clients:
+            _aws_clients[key] = resilient_client(
+                service_name,
+                dependency,
+                client_kwargs=client_kwargs,
+                max_pool_connections=max_pool_connections,
+                connect_timeout=AWS_CONNECT_TIMEOUT,
+                read_timeout=AWS_READ_TIMEOUT,
+                tcp_keepalive=True
+            )
+            logger.info(f"Created {service_name} client (pool size {max_pool_connections})")
+        return _aws_clients[key]
+
+def get_local_s3_client() -> LocalS3Client:
+    """Process-wide local S3 stand-in rooted at LOCAL_S3_ROOT"""
+    root = os.environ.get('LOCAL_S3_ROOT', '/tmp/local-s3')
+    key = ('local-s3', root)
+    with _clients_lock:
+        if key not in _aws_clients:
+            logger.info(f"Using local S3 stand-in at {root}")
+            _aws_clients[key] = LocalS3Client(root)
+        return _aws_clients[key]
+
+def _client_key(service_name: str, dependency: Optional[str], max_pool_connections: int, client_kwargs: Dict[str, Any]) -> Tuple:
+    return (service_name, dependency, max_pool_connections, tuple(sorted((name, repr(value)) for name, value in client_kwargs.items())))
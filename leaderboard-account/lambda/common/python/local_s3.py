@@ -0,0 +1,162 @@
+import hashlib
+import io
+import os
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+
+logger = logging.getLogger()
+
+class LocalS3Client:
+    """
+    Directory-backed stand-in for the S3 calls made by the Lambda functions,
+    for running them offline (S3_BACKEND=local)
+    Objects live at <root>/<bucket>/<key>, so tests can seed outputs as plain
+    files. ETags are content MD5s and conditional writes (IfMatch/IfNoneMatch)
+    behave like S3's.
+    """
+
+    class exceptions:
+        class NoSuchKey(ClientError):
+            def __init__(self, key: str):
+                super().__init__({'Error': {'Code': 'NoSuchKey', 'Message': f"No such key: {key}"}}, 'GetObject')
+
+    def __init__(self, root: str):
+        self.root = root
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        self.calls.append(('GetObject', Key))
+        body = self._read(Bucket, Key)
+        return {
+            'Body': StreamingBody(io.BytesIO(body), len(body)),
+            'ETag': self._etag(body),
+            'ContentLength': len(body)
+        }
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        self.calls.append(('HeadObject', Key))
+        body = self._read(Bucket, Key)
+        return {'ETag': self._etag(body), 'ContentLength': len(body)}
+
+    def put_object(
+        self,
+        Bucket: str,
+        Key: str,
+        Body=b'',
+        IfMatch: Optional[str] = None,
+        IfNoneMatch: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        self.calls.append(('PutObject', Key))
+        if hasattr(Body, 'read'):
+            Body = Body.read()
+        if isinstance(Body, str):
+            Body = Body.encode('utf-8')
+
+        with self._lock:
+            path = self._path(Bucket, Key)
+            current = None
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    current = self._etag(f.read())
+            if (IfNoneMatch == '*' and current is not None) or (IfMatch is not None and current != IfMatch):
+                raise ClientError({'Error': {'Code': 'PreconditionFailed', 'Message': 'At least one of the pre-conditions you specified did not hold'}}, 'PutObject')
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(Body)
+            os.replace(temp_path, path)
+        return {'ETag': self._etag(Body)}
+
+    def upload_fileobj(self, Fileobj, Bucket: str, Key: str, ExtraArgs: Optional[Dict[str, Any]] = None, Config=None):
+        self.put_object(Bucket=Bucket, Key=Key, Body=Fileobj.read())
+
+    def copy_object(self, Bucket: str, Key: str, CopySource: Dict[str, str], **kwargs) -> Dict[str, Any]:
+        body = self._read(CopySource['Bucket'], CopySource['Key'])
+        return self.put_object(Bucket=Bucket, Key=Key, Body=body)
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs):
+        self.calls.append(('DeleteObject', Key))
+        try:
+            os.remove(self._path(Bucket, Key))
+        except FileNotFoundError:
+            pass
+
+    def list_objects_v2(
+        self,
+        Bucket: str,
+        Prefix: str = '',
+        ContinuationToken: Optional[str] = None,
+        StartAfter: Optional[str] = None,
+        MaxKeys: int = 1000,
+        **kwargs
+    ) -> Dict[str, Any]:
+        self.calls.append(('ListObjectsV2', Prefix))
+        bucket_root = os.path.join(self.root, Bucket)
+        keys = []
+        for directory, _, files in os.walk(bucket_root):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                key = os.path.relpath(os.path.join(directory, name), bucket_root).replace(os.sep, '/')
+                if key.startswith(Prefix):
+                    keys.append(key)
+        keys.sort()
+
+        after = ContinuationToken or StartAfter
+        if after:
+            keys = [key for key in keys if key > after]
+        page = keys[:MaxKeys]
+        response = {
+            'KeyCount': len(page),
+            'IsTruncated': len(keys) > MaxKeys,
+            'Contents': [self._summary(Bucket, key) for key in page]
+        }
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = page[-1]
+        return response
+
+    def get_paginator(self, operation_name: str):
+        if operation_name != 'list_objects_v2':
+            raise NotImplementedError(f"Local S3 has no paginator for {operation_name}")
+        return _ListObjectsPaginator(self)
+
+    def _summary(self, bucket: str, key: str) -> Dict[str, Any]:
+        body = self._read(bucket, key)
+        return {'Key': key, 'ETag': self._etag(body), 'Size': len(body)}
+
+    def _read(self, bucket: str, key: str) -> bytes:
+        try:
+            with open(self._path(bucket, key), 'rb') as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            raise self.exceptions.NoSuchKey(key)
+
+    def _path(self, bucket: str, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, bucket, key))
+        if not path.startswith(os.path.normpath(os.path.join(self.root, bucket)) + os.sep):
+            raise ValueError(f"Key {key} escapes the local bucket directory")
+        return path
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return f'"{hashlib.md5(body).hexdigest()}"'
+
+class _ListObjectsPaginator:
+    def __init__(self, client: LocalS3Client):
+        self.client = client
+
+    def paginate(self, **kwargs):
+        token = None
+        while True:
+            response = self.client.list_objects_v2(ContinuationToken=token, **kwargs)
+            yield response
+            if not response['IsTruncated']:
+                return
+            token = response['NextContinuationToken']
@@ -0,0 +1,275 @@
+import json
+import os
+import logging
+import random
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotocoreConnectionError
+
+logger = logging.getLogger()
+
+# Shared resilience layer for the Lambda functions (packaged as a Lambda layer).
+# botocore's adaptive mode provides client-side rate limiting; retries are
+# done here instead of by botocore so they can be classified by error code,
+# bounded by a retry budget and cut off by a per-dependency circuit breaker.
+RETRY_MAX_ATTEMPTS = int(os.environ.get('RESILIENCE_MAX_ATTEMPTS', '4'))
+RETRY_BASE_DELAY = float(os.environ.get('RESILIENCE_BASE_DELAY', '0.1'))
+RETRY_THROTTLE_BASE_DELAY = float(os.environ.get('RESILIENCE_THROTTLE_BASE_DELAY', '0.5'))
+RETRY_MAX_DELAY = float(os.environ.get('RESILIENCE_MAX_DELAY', '8'))
+
+# Each retry spends budget, each success earns a little back, so a dependency
+# that keeps failing is not hit with a multiple of the original traffic
+RETRY_BUDGET_CAPACITY = float(os.environ.get('RESILIENCE_RETRY_BUDGET', '20'))
+RETRY_BUDGET_REFUND = 0.2
+
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('RESILIENCE_BREAKER_THRESHOLD', '8'))
+BREAKER_RESET_SECONDS = float(os.environ.get('RESILIENCE_BREAKER_RESET_SECONDS', '30'))
+
+THROTTLING_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'RequestLimitExceeded',
+    'BandwidthLimitExceeded',
+    'LimitExceededException',
+    'RequestThrottled',
+    'SlowDown',
+    'EC2ThrottledException',
+    # Bedrock's answer when the concurrent evaluation job quota is used up
+    'ServiceQuotaExceededException',
+    # Raised by CircuitOpenError while a dependency is failing fast
+    'CircuitOpen'
+}
+
+TRANSIENT_ERROR_CODES = {
+    'RequestTimeout',
+    'RequestTimeoutException',
+    'PriorRequestNotComplete',
+    'InternalError',
+    'InternalFailure',
+    'InternalServerException',
+    'ServiceUnavailable',
+    'ServiceUnavailableException'
+}
+
+class CircuitOpenError(ClientError):
+    """Raised instead of calling a dependency whose circuit breaker is open"""
+
+    def __init__(self, dependency: str, operation_name: str, retry_after: float):
+        self.dependency = dependency
+        self.retry_after = retry_after
+        super().__init__(
+            {'Error': {'Code': 'CircuitOpen', 'Message': f"{dependency} is unavailable, retry in {retry_after:.0f}s"}},
+            operation_name
+        )
+
+class CircuitBreaker:
+    """
+    Per-dependency breaker: opens after failure_threshold consecutive
+    throttling or transient failures, fails fast for reset_seconds, then lets
+    a single trial call through (half-open) before closing again
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.retry_budget = RETRY_BUDGET_CAPACITY
+        self.metrics = {
+            'Calls': 0,
+            'Successes': 0,
+            'Retries': 0,
+            'Throttles': 0,
+            'TransientErrors': 0,
+            'RetriesExhausted': 0,
+            'BudgetExhausted': 0,
+            'BreakerOpened': 0,
+            'ShortCircuited': 0
+        }
+        self._lock = threading.Lock()
+
+    def before_call(self, operation_name: str):
+        with self._lock:
+            self.metrics['Calls'] += 1
+            if self.state == 'open':
+                elapsed = time.time() - self.opened_at
+                if elapsed < self.reset_seconds:
+                    self.metrics['ShortCircuited'] += 1
+                    raise CircuitOpenError(self.name, operation_name, self.reset_seconds - elapsed)
+                self.state = 'half-open'
+                self.opened_at = time.time()
+                logger.info(f"Circuit for {self.name} is half-open, trying {operation_name}")
+            elif self.state == 'half-open':
+                # Only the trial call may go through until it succeeds; a trial
+                # that never reported back is replaced after reset_seconds
+                elapsed = time.time() - self.opened_at
+                if elapsed < self.reset_seconds:
+                    self.metrics['ShortCircuited'] += 1
+                    raise CircuitOpenError(self.name, operation_name, self.reset_seconds - elapsed)
+                self.opened_at = time.time()
+
+    def record_success(self):
+        with self._lock:
+            self.metrics['Successes'] += 1
+            self.consecutive_failures = 0
+            self.retry_budget = min(RETRY_BUDGET_CAPACITY, self.retry_budget + RETRY_BUDGET_REFUND)
+            if self.state != 'closed':
+                logger.info(f"Circuit for {self.name} closed")
+                self.state = 'closed'
+
+    def record_failure(self, throttled: bool):
+        with self._lock:
+            self.metrics['Throttles' if throttled else 'TransientErrors'] += 1
+            self.consecutive_failures += 1
+            if self.state == 'half-open' or (self.state == 'closed' and self.consecutive_failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.time()
+                self.metrics['BreakerOpened'] += 1
+                logger.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} consecutive failures")
+
+    def spend_retry(self, cost: float) -> bool:
+        with self._lock:
+            if self.state == 'open' or self.retry_budget < cost:
+                self.metrics['BudgetExhausted'] += 1
+                return False
+            self.retry_budget -= cost
+            self.metrics['Retries'] += 1
+            return True
+
+    def record_exhausted(self):
+        with self._lock:
+            self.metrics['RetriesExhausted'] += 1
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+# Counters already published, so each publish reports only the increase
+_published_metrics = {}
+
+def get_circuit_breaker(dependency: str) -> CircuitBreaker:
+    """Process-wide breaker for a dependency, shared by every client of it"""
+    with _breakers_lock:
+        if dependency not in _breakers:
+            _breakers[dependency] = CircuitBreaker(dependency, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS)
+        return _breakers[dependency]
+
+def classify_error(response=None, caught_exception=None) -> Optional[str]:
+    """'throttle', 'transient' or None (success or an error not worth retrying)"""
+    if caught_exception is not None:
+        if isinstance(caught_exception, (BotocoreConnectionError, HTTPClientError)):
+            return 'transient'
+        return None
+    if response is None:
+        return None
+
+    http_response, parsed = response
+    code = (parsed or {}).get('Error', {}).get('Code')
+    if code in THROTTLING_ERROR_CODES or http_response.status_code == 429:
+        return 'throttle'
+    if code in TRANSIENT_ERROR_CODES or http_response.status_code in (500, 502, 503, 504):
+        return 'transient'
+    return None
+
+def backoff_delay(attempt: int, throttled: bool) -> float:
+    """Exponential backoff with full jitter"""
+    base = RETRY_THROTTLE_BASE_DELAY if throttled else RETRY_BASE_DELAY
+    return random.uniform(0, min(RETRY_MAX_DELAY, base * (2 ** (attempt - 1))))
+
+def is_throttling_error(error: Exception) -> bool:
+    """True for errors that mean a dependency is saturated rather than broken"""
+    if isinstance(error, CircuitOpenError):
+        return True
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+    return False
+
+def instrument_client(client, dependency: Optional[str] = None, max_attempts: int = RETRY_MAX_ATTEMPTS):
+    """Attach the breaker and classified retries to a botocore client"""
+    service_event_name = client.meta.service_model.service_id.hyphenize()
+    breaker = get_circuit_breaker(dependency or service_event_name)
+
+    def before_call(model, **kwargs):
+        breaker.before_call(model.name)
+
+    def needs_retry(response, attempts, caught_exception=None, **kwargs):
+        kind = classify_error(response, caught_exception)
+        if kind is None:
+            if caught_exception is None and response is not None and response[0].status_code < 500:
+                breaker.record_success()
+            return None
+
+        throttled = kind == 'throttle'
+        breaker.record_failure(throttled)
+        if attempts >= max_attempts:
+            breaker.record_exhausted()
+            return None
+        if not breaker.spend_retry(2.0 if throttled else 1.0):
+            return None
+        return backoff_delay(attempts, throttled)
+
+    client.meta.events.register(f'before-call.{service_event_name}', before_call)
+    client.meta.events.register(f'needs-retry.{service_event_name}', needs_retry)
+    return client
+
+def resilient_client(
+    service_name: str,
+    dependency: Optional[str] = None,
+    client_kwargs: Optional[Dict[str, Any]] = None,
+    **config_kwargs
+):
+    """
+    boto3 client with adaptive client-side rate limiting, classified jittered
+    retries and a circuit breaker; config_kwargs are passed to botocore Config
+    and client_kwargs (e.g. endpoint_url) to boto3.client
+    """
+    config = Config(
+        retries={'mode': 'adaptive', 'total_max_attempts': 1},
+        **config_kwargs
+    )
+    client = boto3.client(service_name, config=config, **(client_kwargs or {}))
+    return instrument_client(client, dependency)
+
+def metrics_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Current counters and state of every dependency"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {
+        breaker.name: dict(breaker.metrics, State=breaker.state, RetryBudget=round(breaker.retry_budget, 2))
+        for breaker in breakers
+    }
+
+def publish_metrics(namespace: str = 'LLMLeaderboard/Resilience'):
+    """Log the retry and breaker counters accumulated since the last publish in CloudWatch embedded metric format"""
+    for dependency, metrics in metrics_snapshot().items():
+        previous = _published_metrics.get(dependency, {})
+        counters = {
+            name: value - previous.get(name, 0)
+            for name, value in metrics.items()
+            if isinstance(value, int) and not isinstance(value, bool)
+        }
+        _published_metrics[dependency] = {name: metrics[name] for name in counters}
+        if not any(counters.values()):
+            continue
+        print(json.dumps({
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': namespace,
+                    'Dimensions': [['Dependency']],
+                    'Metrics': [{'Name': name, 'Unit': 'Count'} for name in counters]
+                }]
+            },
+            'Dependency': dependency,
+            'BreakerState': metrics['State'],
+            **counters
+        }))
@@ -0,0 +1,56 @@
+import json
+import logging
+import math
+import tempfile
+from typing import Dict, List, Any
+
+from judge_cache import iter_jsonl_records
+
+logger = logging.getLogger()
+
+# A sharded run keeps one directory: every shard job writes its output under
+# <run dir>/shards/<index>/, next to a manifest that says how many shards make
+# the run complete. Resubmitted shards reuse their index directory.
+SHARD_MANIFEST_NAME = 'shard-manifest.json'
+SHARD_OUTPUT_DIR = 'shards'
+
+def plan_shard_count(record_count: int, records_per_shard: int, max_shards: int) -> int:
+    """Number of jobs to split a dataset into (1 means no sharding)"""
+    if record_count is None or records_per_shard <= 0 or max_shards <= 1:
+        return 1
+    return max(1, min(max_shards, math.ceil(record_count / records_per_shard)))
+
+def split_dataset(s3_client, bucket: str, key: str, shard_count: int) -> List[Dict[str, Any]]:
+    """
+    Split a JSONL dataset into category-stratified shards
+    Records of each category are dealt round-robin across the shards, starting
+    at a different shard per category, so every shard gets about the same
+    number of records and the same category mix. Returns one spooled file per
+    shard with its record and per-category counts.
+    """
+    shards = [
+        {'file': tempfile.TemporaryFile(), 'records': 0, 'categories': {}}
+        for _ in range(shard_count)
+    ]
+    next_shard = {}
+
+    try:
+        for record in iter_jsonl_records(s3_client, bucket, key):
+            category = record.get('category') or 'uncategorized'
+            if category not in next_shard:
+                next_shard[category] = len(next_shard) % shard_count
+            shard = shards[next_shard[category]]
+            next_shard[category] = (next_shard[category] + 1) % shard_count
+
+            shard['file'].write(json.dumps(record).encode('utf-8') + b'\n')
+            shard['records'] += 1
+            shard['categories'][category] = shard['categories'].get(category, 0) + 1
+    except Exception:
+        for shard in shards:
+            shard['file'].close()
+        raise
+
+    for shard in shards:
+        shard['file'].seek(0)
+    logger.info(f"Split {key} into {shard_count} shards of {[shard['records'] for shard in shards]} records")
+    return shards
@@ -0,0 +1,165 @@
+import json
+import logging
+from typing import Dict, Any, Optional, Iterable
+
+logger = logging.getLogger()
+
+# Only the first errors are reported back; the total is still counted
+MAX_REPORTED_ERRORS = 50
+
+class DatasetValidationError(Exception):
+    """Raised when a participant dataset cannot be evaluated"""
+
+    def __init__(self, report: Dict[str, Any]):
+        self.report = report
+        super().__init__(f"Dataset failed validation with {report['errorCount']} error(s)")
+
+class DatasetValidator:
+    """
+    Incremental validator for Bedrock LLM-as-judge JSONL datasets
+    Chunks are fed as they are streamed, so the dataset is checked in the
+    same pass that copies it and never held in memory. Exceeding a size or
+    record limit raises DatasetValidationError immediately to stop the copy.
+    """
+
+    def __init__(
+        self,
+        participant_id: str,
+        max_records: int,
+        max_bytes: int,
+        max_line_bytes: int,
+        categories: Optional[Iterable[str]] = None
+    ):
+        self.participant_id = participant_id
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_line_bytes = max_line_bytes
+        self.categories = set(categories) if categories else None
+        self.bytes_seen = 0
+        self.line_number = 0
+        self.record_count = 0
+        self.error_count = 0
+        self.errors = []
+        self._partial = b''
+        self._skipping_long_line = False
+
+    def check_declared_size(self, content_length: int):
+        """Reject a dataset by its Content-Length before streaming any of it"""
+        if content_length > self.max_bytes:
+            self._fail(None, None, f"Dataset size {content_length} exceeds the {self.max_bytes} byte limit")
+
+    def feed(self, chunk: bytes):
+        """Validate every line completed by this chunk"""
+        self.bytes_seen += len(chunk)
+        if self.bytes_seen > self.max_bytes:
+            self._fail(None, None, f"Dataset exceeds the {self.max_bytes} byte limit")
+
+        lines = (self._partial + chunk).split(b'\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._end_line(line)
+
+        if len(self._partial) > self.max_line_bytes and not self._skipping_long_line:
+            # Keep only a flag, not the oversized line, until its newline arrives
+            self._add_error(self.line_number + 1, None, f"Line exceeds the {self.max_line_bytes} byte limit")
+            self._skipping_long_line = True
+        if self._skipping_long_line:
+            self._partial = b''
+
+    def finish(self) -> Dict[str, Any]:
+        """Validate the final unterminated line and return the report"""
+        if self._partial or self._skipping_long_line:
+            self._end_line(self._partial)
+            self._partial = b''
+        if self.record_count == 0:
+            self._add_error(None, None, 'Dataset contains no records')
+        return self.report()
+
+    @property
+    def valid(self) -> bool:
+        return self.error_count == 0
+
+    def report(self) -> Dict[str, Any]:
+        """Structured validation result stored on the submission"""
+        return {
+            'valid': self.valid,
+            'recordCount': self.record_count,
+            'sizeBytes': self.bytes_seen,
+            'errorCount': self.error_count,
+            'errors': list(self.errors),
+            'truncated': self.error_count > len(self.errors)
+        }
+
+    def _end_line(self, line: bytes):
+        self.line_number += 1
+        if self._skipping_long_line:
+            # The over-long line was already reported, but still counts as a record
+            self._skipping_long_line = False
+            self._count_record()
+            return
+        if not line.strip():
+            return
+
+        self._count_record()
+        if len(line) > self.max_line_bytes:
+            self._add_error(self.line_number, None, f"Line exceeds the {self.max_line_bytes} byte limit")
+            return
+
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self._add_error(self.line_number, None, f"Invalid JSON: {str(e)}")
+            return
+        self._validate_record(record)
+
+    def _count_record(self):
+        self.record_count += 1
+        if self.record_count > self.max_records:
+            self._fail(self.line_number, None, f"Dataset exceeds the {self.max_records} record limit")
+
+    def _validate_record(self, record: Any):
+        line_number = self.line_number
+        if not isinstance(record, dict):
+            self._add_error(line_number, None, 'Record must be a JSON object')
+            return
+
+        for field in ('prompt', 'referenceResponse'):
+            if not isinstance(record.get(field), str) or not record[field].strip():
+                self._add_error(line_number, field, f"{field} must be a non-empty string")
+
+        # category is optional in Bedrock datasets (the leaderboard files records
+        # without one under 'unknown'); a category that is given must be usable
+        category = record.get('category')
+        if category is not None:
+            if not isinstance(category, str) or not category:
+                self._add_error(line_number, 'category', 'category must be a non-empty string when present')
+            elif self.categories is not None and category not in self.categories:
+                self._add_error(line_number, 'category', f"Unknown category '{category}'")
+
+        model_responses = record.get('modelResponses')
+        if not isinstance(model_responses, list) or len(model_responses) != 1:
+            self._add_error(line_number, 'modelResponses', 'modelResponses must be a list with exactly one response')
+            return
+
+        model_response = model_responses[0]
+        if not isinstance(model_response, dict):
+            self._add_error(line_number, 'modelResponses[0]', 'Model response must be a JSON object')
+            return
+        if not isinstance(model_response.get('response'), str):
+            self._add_error(line_number, 'modelResponses[0].response', 'response must be a string')
+        if model_response.get('modelIdentifier') != self.participant_id:
+            self._add_error(
+                line_number,
+                'modelResponses[0].modelIdentifier',
+                f"modelIdentifier must match participantId '{self.participant_id}'"
+            )
+
+    def _add_error(self, line_number: Optional[int], field: Optional[str], message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'field': field, 'message': message})
+
+    def _fail(self, line_number: Optional[int], field: Optional[str], message: str):
+        self._add_error(line_number, field, message)
+        logger.warning(f"Stopping dataset ingest for {self.participant_id}: {message}")
+        raise DatasetValidationError(self.report())
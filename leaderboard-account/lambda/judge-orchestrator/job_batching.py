@@ -0,0 +1,92 @@
+import json
+import logging
+import tempfile
+from collections import deque
+from typing import Dict, List, Any
+
+from judge_cache import iter_jsonl_records, record_cache_key
+
+logger = logging.getLogger()
+
+# Batched jobs judge the datasets of several queued submissions at once.
+# Bedrock evaluates one precomputed inference source per job, so every record
+# is submitted under a shared model identifier and attributed back to its
+# submission by content hash when the output is split.
+BATCH_PREFIX = 'evaluation-batches/'
+BATCH_MODEL_IDENTIFIER = 'llm-league-batch'
+BATCH_PART_DIR = 'batch'
+
+def build_batch_dataset(
+    s3_client,
+    bucket: str,
+    entries: List[Dict[str, Any]],
+    metrics: List[str],
+    evaluator_model_id: str
+) -> Dict[str, Any]:
+    """
+    Concatenate the datasets of the batched entries into one spooled JSONL
+    file under the shared model identifier. The attribution maps each record's
+    content hash to the entry indexes it came from, once per occurrence.
+    """
+    dataset_file = tempfile.TemporaryFile()
+    attribution = {}
+    records = [0] * len(entries)
+
+    try:
+        for index, entry in enumerate(entries):
+            dataset_key = entry['datasetS3Uri'].split('/', 3)[3]
+            for record in iter_jsonl_records(s3_client, bucket, dataset_key):
+                attribution.setdefault(record_cache_key(record, metrics, evaluator_model_id), []).append(index)
+                for model_response in record.get('modelResponses', []):
+                    model_response['modelIdentifier'] = BATCH_MODEL_IDENTIFIER
+                dataset_file.write(json.dumps(record).encode('utf-8') + b'\n')
+                records[index] += 1
+    except Exception:
+        dataset_file.close()
+        raise
+
+    dataset_file.seek(0)
+    logger.info(f"Built batch dataset of {sum(records)} records from {len(entries)} submissions")
+    return {'file': dataset_file, 'records': records, 'attribution': attribution}
+
+def split_batch_output(
+    s3_client,
+    bucket: str,
+    output_keys: List[str],
+    manifest: Dict[str, Any],
+    metrics: List[str],
+    evaluator_model_id: str
+) -> List[Dict[str, Any]]:
+    """
+    Split a batch job's output files into one spooled _output.jsonl per
+    batched entry, restoring each record's original model identifier.
+    Returns the file and record count for every entry, in manifest order.
+    """
+    members = manifest['entries']
+    parts = [{'file': tempfile.TemporaryFile(), 'records': 0} for _ in members]
+    pending = {key: deque(indexes) for key, indexes in manifest['attribution'].items()}
+    unattributed = 0
+
+    try:
+        for output_key in output_keys:
+            for record in iter_jsonl_records(s3_client, bucket, output_key):
+                owners = pending.get(record_cache_key(record, metrics, evaluator_model_id))
+                if not owners:
+                    unattributed += 1
+                    continue
+                index = owners.popleft()
+                participant_id = members[index]['participantId']
+                for model_response in record.get('modelResponses', []) + record.get('inputRecord', {}).get('modelResponses', []):
+                    model_response['modelIdentifier'] = participant_id
+                parts[index]['file'].write(json.dumps(record).encode('utf-8') + b'\n')
+                parts[index]['records'] += 1
+    except Exception:
+        for part in parts:
+            part['file'].close()
+        raise
+
+    if unattributed:
+        logger.warning(f"{unattributed} batch output records could not be attributed to a submission")
+    for part in parts:
+        part['file'].seek(0)
+    return parts
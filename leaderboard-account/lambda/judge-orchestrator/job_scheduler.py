@@ -0,0 +1,348 @@
+import json
+import logging
+import math
+import time
+import uuid
+from typing import Dict, List, Any, Optional, Callable
+
+from botocore.exceptions import ClientError
+
+from resilience import THROTTLING_ERROR_CODES, backoff_delay
+
+logger = logging.getLogger()
+
+# Scheduler state (pending jobs, token bucket, fairness cursor) lives in one
+# S3 object updated with conditional writes, like the job registry
+JOB_SCHEDULER_STATE_KEY = 'evaluation-jobs/scheduler.json'
+# Workers that lose a write race back off with full jitter, so a burst of
+# submissions does not keep colliding on the same object
+JOB_SCHEDULER_WRITE_ATTEMPTS = 8
+
+# Claims older than this belong to a dispatcher that died mid-dispatch
+DISPATCH_CLAIM_TTL_SECONDS = 900
+
+# Priority classes: a participant's first submission goes before resubmissions
+PRIORITY_FIRST_SUBMISSION = 0
+PRIORITY_RESUBMISSION = 1
+
+# Scheduler entries that stand for several queued jobs judged as one
+BATCH_ID_PREFIX = 'batch-'
+
+class EvaluationJobScheduler:
+    """
+    Quota-aware queue in front of CreateEvaluationJob
+    Jobs start only while fewer than max_concurrent are running and the token
+    bucket (create_rate per second, up to create_burst) has a token. Pending
+    jobs are served by priority class, then round-robin across participants,
+    then first in first out per participant.
+    With batching enabled (batch_max_entries > 1), small jobs are combined
+    into one batch entry of up to batch_max_entries jobs and batch_max_records
+    records. A batch that is not full waits until its oldest job has been
+    pending for batch_window_seconds; other jobs are dispatched meanwhile.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket: str,
+        max_concurrent: int,
+        create_rate: float,
+        create_burst: int,
+        default_job_seconds: int = 1800,
+        throttle_backoff_seconds: int = 30,
+        batch_max_entries: int = 1,
+        batch_max_records: int = 1000,
+        batch_window_seconds: float = 0
+    ):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.max_concurrent = max_concurrent
+        self.create_rate = create_rate
+        self.create_burst = create_burst
+        self.default_job_seconds = default_job_seconds
+        self.throttle_backoff_seconds = throttle_backoff_seconds
+        self.batch_max_entries = batch_max_entries
+        self.batch_max_records = batch_max_records
+        self.batch_window_seconds = batch_window_seconds
+
+    def reserve_run_timestamp(self, participant_id: str, count: int = 1, now: Optional[float] = None) -> int:
+        """
+        Job names and run directories are llm-judge-<participant>-<timestamp>,
+        so every run of a participant gets a distinct (increasing) timestamp
+        count reserves consecutive timestamps and returns the first one
+        """
+        now = int(now or time.time())
+        reserved = []
+
+        def reserve(state):
+            last = state.setdefault('lastRunTimestamps', {}).get(participant_id, 0)
+            reserved[:] = [max(now, last + 1)]
+            state['lastRunTimestamps'][participant_id] = reserved[0] + count - 1
+        self._update_state(reserve)
+        return reserved[0]
+
+    def last_run_timestamp(self, participant_id: str) -> int:
+        """Timestamp of the participant's newest reserved run (0 if none)"""
+        state, _ = self._load_state()
+        return state.get('lastRunTimestamps', {}).get(participant_id, 0)
+
+    def has_pending(self) -> bool:
+        """Whether any job is waiting to be dispatched"""
+        state, _ = self._load_state()
+        return bool(state['pending'])
+
+    def enqueue(self, entry: Dict[str, Any], now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Queue a job request; returns it with its priority and enqueue time (None if already queued)"""
+        queued = self.enqueue_all([entry], now)
+        return queued[0] if queued else None
+
+    def enqueue_all(self, entries: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Queue the jobs of one submission (e.g. its shards) in a single state
+        update, so they all get the submission's priority class. Jobs of a
+        redelivered submission that are already queued are skipped.
+        """
+        now = now or time.time()
+        queued = []
+
+        def add_entries(state):
+            queued.clear()
+            seen = set(state['participantsSeen'])
+            first = entries[0]['participantId'] not in seen and entries[0].get('attempt', 1) == 1
+            waiting = {
+                queue_key(job)
+                for entry in state['pending'] + [claim['entry'] for claim in state['dispatching'].values()]
+                for job in entry.get('entries', [entry])
+            }
+            for entry in entries:
+                if entry.get('submissionId') and queue_key(entry) in waiting:
+                    continue
+                queued.append(dict(
+                    entry,
+                    priority=PRIORITY_FIRST_SUBMISSION if first else PRIORITY_RESUBMISSION,
+                    enqueuedAt=now
+                ))
+            state['pending'].extend(dict(entry) for entry in queued)
+            seen.add(entries[0]['participantId'])
+            state['participantsSeen'] = sorted(seen)
+        self._update_state(add_entries)
+
+        for entry in queued:
+            logger.info(f"Queued evaluation job {entry['id']} with priority {entry['priority']}")
+        if len(queued) < len(entries):
+            logger.info(f"Skipped {len(entries) - len(queued)} evaluation jobs that were already queued")
+        return queued
+
+    def dispatch(self, start_job: Callable[[Dict[str, Any]], None], active_jobs: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Start as many pending jobs as the concurrency cap and token bucket allow
+        Jobs are claimed in the state object before start_job is called, so
+        concurrent dispatchers never exceed the cap. A throttled job goes back
+        to the front of the queue and pauses dispatching.
+        """
+        now = now or time.time()
+        claimed = []
+
+        def claim(state):
+            claimed.clear()
+            self._expire_claims(state, now)
+            self._refill(state, now)
+            if now < state.get('throttledUntil', 0):
+                return
+            capacity = self.max_concurrent - active_jobs - len(state['dispatching'])
+            # Jobs of batches whose window is still open; jobs behind them can go
+            waiting = set()
+            while capacity > 0 and state['tokens'] >= 1:
+                ready = [entry for entry in state['pending'] if entry['id'] not in waiting]
+                if not ready:
+                    break
+                entry = next_entry(ready, state.get('lastServedParticipant'))
+                group = [entry]
+                if self.batch_max_entries > 1 and self.batchable(entry):
+                    group = self._collect_batch(ready, entry)
+                    if len(group) < self.batch_max_entries and now - min(job['enqueuedAt'] for job in group) < self.batch_window_seconds:
+                        # Leave the window open for more submissions to join
+                        waiting.update(job['id'] for job in group)
+                        continue
+                    if len(group) > 1:
+                        entry = {
+                            'id': f"{BATCH_ID_PREFIX}{uuid.uuid4().hex[:12]}",
+                            'participantId': group[-1]['participantId'],
+                            'priority': min(job['priority'] for job in group),
+                            'enqueuedAt': min(job['enqueuedAt'] for job in group),
+                            'entries': group
+                        }
+                for job in group:
+                    state['pending'].remove(job)
+                state['dispatching'][entry['id']] = {'entry': entry, 'claimedAt': now}
+                state['lastServedParticipant'] = group[-1]['participantId']
+                state['tokens'] -= 1
+                capacity -= 1
+                claimed.append(entry)
+        self._update_state(claim)
+
+        started = []
+        throttled = []
+        for entry in claimed:
+            if throttled:
+                # Once Bedrock pushes back, the rest of the batch waits as well
+                throttled.append(entry)
+                continue
+            try:
+                start_job(entry)
+                started.append(entry)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES:
+                    logger.warning(f"Job creation throttled, requeueing {entry['id']}")
+                    throttled.append(entry)
+                else:
+                    logger.error(f"Failed to start scheduled job {entry['id']}: {str(e)}")
+            except Exception as e:
+                logger.error(f"Failed to start scheduled job {entry['id']}: {str(e)}")
+
+        def release(state):
+            for entry in claimed:
+                state['dispatching'].pop(entry['id'], None)
+            if throttled:
+                # Batches go back as their individual jobs
+                requeued = [job for entry in throttled for job in entry.get('entries', [entry])]
+                state['pending'] = requeued + state['pending']
+                state['tokens'] = 0
+                state['throttledUntil'] = time.time() + self.throttle_backoff_seconds
+        if claimed:
+            self._update_state(release)
+
+        if claimed:
+            logger.info(f"Dispatched {len(started)} evaluation jobs, {len(throttled)} throttled")
+        return started
+
+    def batchable(self, entry: Dict[str, Any]) -> bool:
+        """Whether a queued job is small and simple enough to share a batch"""
+        return (
+            entry.get('records') is not None
+            and entry['records'] <= self.batch_max_records
+            and entry.get('shardCount', 1) == 1
+        )
+
+    def _collect_batch(self, pending: List[Dict[str, Any]], first: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Batchable jobs to combine with first, in the usual fair order"""
+        candidates = [entry for entry in pending if entry is not first and self.batchable(entry)]
+        group = [first]
+        records = first['records']
+        last_served = first['participantId']
+        while candidates and len(group) < self.batch_max_entries:
+            entry = next_entry(candidates, last_served)
+            candidates.remove(entry)
+            if records + entry['records'] > self.batch_max_records:
+                continue
+            group.append(entry)
+            records += entry['records']
+            last_served = entry['participantId']
+        return group
+
+    def record_job_duration(self, seconds: float):
+        """Fold a finished job's runtime into the wait estimate (moving average)"""
+        def update(state):
+            average = state.get('avgJobSeconds') or self.default_job_seconds
+            state['avgJobSeconds'] = 0.8 * average + 0.2 * seconds
+        self._update_state(update)
+
+    def queue_status(self, active_jobs: int, now: Optional[float] = None) -> Dict[str, Any]:
+        """Queue depth and estimated wait for every pending job, in dispatch order"""
+        now = now or time.time()
+        state, _ = self._load_state()
+        self._refill(state, now)
+        average = state.get('avgJobSeconds') or self.default_job_seconds
+        free_slots = max(0, self.max_concurrent - active_jobs - len(state['dispatching']))
+        throttle_wait = max(0.0, state.get('throttledUntil', 0) - now)
+
+        order = []
+        pending = list(state['pending'])
+        last_served = state.get('lastServedParticipant')
+        while pending:
+            entry = next_entry(pending, last_served)
+            pending.remove(entry)
+            last_served = entry['participantId']
+            order.append(entry)
+
+        jobs = []
+        for position, entry in enumerate(order):
+            # Bounded by both the create rate and the time for running jobs to free a slot
+            token_wait = max(0.0, (position + 1 - state['tokens']) / self.create_rate)
+            slot_wait = 0 if position < free_slots else math.ceil((position - free_slots + 1) / self.max_concurrent) * average
+            jobs.append({
+                'id': entry['id'],
+                'submissionId': entry.get('submissionId'),
+                'participantId': entry['participantId'],
+                'priority': entry['priority'],
+                'position': position + 1,
+                'estimatedWaitSeconds': int(throttle_wait + max(token_wait, slot_wait))
+            })
+
+        return {
+            'queueDepth': len(order),
+            'activeJobs': active_jobs,
+            'dispatching': len(state['dispatching']),
+            'maxConcurrentJobs': self.max_concurrent,
+            'averageJobSeconds': int(average),
+            'jobs': jobs
+        }
+
+    def _refill(self, state: Dict[str, Any], now: float):
+        elapsed = max(0.0, now - state.get('tokensUpdatedAt', now))
+        state['tokens'] = min(self.create_burst, state.get('tokens', self.create_burst) + elapsed * self.create_rate)
+        state['tokensUpdatedAt'] = now
+
+    def _expire_claims(self, state: Dict[str, Any], now: float):
+        for job_id, claim in list(state['dispatching'].items()):
+            if now - claim['claimedAt'] > DISPATCH_CLAIM_TTL_SECONDS:
+                # The job may or may not have been created; never create it twice
+                logger.warning(f"Dropping stale dispatch claim for {job_id}")
+                del state['dispatching'][job_id]
+
+    def _load_state(self):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=JOB_SCHEDULER_STATE_KEY)
+            return json.loads(response['Body'].read()), response['ETag']
+        except self.s3_client.exceptions.NoSuchKey:
+            return {'pending': [], 'dispatching': {}, 'participantsSeen': [], 'tokens': self.create_burst}, None
+
+    def _update_state(self, mutate: Callable[[Dict[str, Any]], None]):
+        for attempt in range(JOB_SCHEDULER_WRITE_ATTEMPTS):
+            state, etag = self._load_state()
+            mutate(state)
+            condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+            try:
+                self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=JOB_SCHEDULER_STATE_KEY,
+                    Body=json.dumps(state).encode('utf-8'),
+                    ContentType='application/json',
+                    **condition
+                )
+                return
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                    raise
+                logger.info(f"Scheduler state changed concurrently, retrying (attempt {attempt + 1})")
+                time.sleep(backoff_delay(attempt + 1, throttled=False))
+        raise RuntimeError(f"Could not update {JOB_SCHEDULER_STATE_KEY} after {JOB_SCHEDULER_WRITE_ATTEMPTS} attempts")
+
+def queue_key(entry: Dict[str, Any]) -> tuple:
+    """Identity of a queued job that survives redelivery (its id has a fresh timestamp)"""
+    return (entry.get('submissionId'), entry.get('shardIndex', 0), entry.get('attempt', 1))
+
+def next_entry(pending: List[Dict[str, Any]], last_served: Optional[str]) -> Dict[str, Any]:
+    """
+    Pick the next pending job: best priority class first, then the next
+    participant after last_served in round-robin order, oldest job first
+    """
+    priority = min(entry['priority'] for entry in pending)
+    candidates = [entry for entry in pending if entry['priority'] == priority]
+    participants = sorted({entry['participantId'] for entry in candidates})
+    following = [participant for participant in participants if last_served is None or participant > last_served]
+    participant = following[0] if following else participants[0]
+    return min(
+        (entry for entry in candidates if entry['participantId'] == participant),
+        key=lambda entry: entry['enqueuedAt']
+    )
@@ -0,0 +1,204 @@
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Callable
+
+from botocore.exceptions import ClientError
+
+from resilience import backoff_delay
+
+logger = logging.getLogger()
+
+# Registry of evaluation jobs that are running or whose completion hooks have
+# not all succeeded yet, together with the adaptive poll schedule
+JOB_REGISTRY_KEY = 'evaluation-jobs/registry.json'
+# A poller that loses a write race sleeps a jittered, growing delay first
+JOB_REGISTRY_WRITE_ATTEMPTS = 8
+
+# Bedrock job states after which a job never changes again
+TERMINAL_JOB_STATUSES = ('Completed', 'Failed', 'Stopped')
+
+# Hook claims older than this belong to a poller that died while running them
+HOOK_CLAIM_TTL_SECONDS = 900
+
+# Jobs are listed from slightly before the oldest tracked job was created
+LIST_CREATION_TIME_SLACK_SECONDS = 300
+
+class EvaluationJobTracker:
+    """
+    Tracks Bedrock evaluation jobs and fires hooks when they finish
+    Every job ARN is recorded in one S3 registry object (updated with
+    conditional writes). A poll lists jobs in pages of up to 100 with
+    ListEvaluationJobs instead of one GetEvaluationJob per job, and the poll
+    interval doubles while nothing changes, up to max_interval.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket: str,
+        bedrock_client,
+        min_interval: int = 60,
+        max_interval: int = 900
+    ):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.bedrock_client = bedrock_client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hooks = {'Completed': [], 'Failed': [], 'Stopped': []}
+
+    def add_hook(self, status: str, hook: Callable[[Dict[str, Any]], None]):
+        """Call hook(job) when a tracked job ends in the given terminal status"""
+        self.hooks[status].append(hook)
+
+    def register(self, job: Dict[str, Any]):
+        """Start tracking a job; it is polled soon regardless of the current backoff"""
+        def add_job(registry):
+            registry['jobs'][job['evaluationJobArn']] = dict(job, status='InProgress')
+            registry['pollIntervalSeconds'] = self.min_interval
+            due = job['createdAt'] + self.min_interval
+            registry['nextPollAt'] = min(registry.get('nextPollAt') or due, due)
+        self._update_registry(add_job)
+        logger.info(f"Tracking evaluation job {job['evaluationJobArn']}")
+
+    def active_jobs(self) -> List[Dict[str, Any]]:
+        """Tracked jobs that have not finished yet"""
+        registry, _ = self._load_registry()
+        return [job for job in registry['jobs'].values() if job.get('status') not in TERMINAL_JOB_STATUSES]
+
+    def poll(self, now: Optional[float] = None, force: bool = False) -> Dict[str, Any]:
+        """Refresh job statuses if the poll is due and run hooks for finished jobs"""
+        now = now or time.time()
+        registry, _ = self._load_registry()
+        jobs = registry['jobs']
+        if not jobs:
+            return {'polled': False, 'tracked': 0, 'finished': []}
+        if not force and now < (registry.get('nextPollAt') or 0):
+            return {'polled': False, 'tracked': len(jobs), 'finished': []}
+
+        # Finished jobs whose hooks failed on an earlier tick are not listed again
+        running = {arn: job for arn, job in jobs.items() if job.get('status') not in TERMINAL_JOB_STATUSES}
+        statuses = self.fetch_statuses(running) if running else {}
+        changed = any(
+            statuses.get(arn) and statuses[arn] != job.get('status') for arn, job in running.items()
+        ) or len(running) < len(jobs)
+
+        # Claim finished jobs before running their hooks, so a hook with side
+        # effects (such as resubmitting) is not run by two pollers at once.
+        # A job leaves the registry only once all of its hooks succeeded.
+        claimed = {}
+
+        def apply_poll(registry):
+            claimed.clear()
+            for arn, job in registry['jobs'].items():
+                if arn in statuses:
+                    job['status'] = statuses[arn]
+                if job.get('status') in TERMINAL_JOB_STATUSES and now - job.get('hooksClaimedAt', 0) > HOOK_CLAIM_TTL_SECONDS:
+                    job['hooksClaimedAt'] = now
+                    claimed[arn] = dict(job)
+            interval = registry.get('pollIntervalSeconds') or self.min_interval
+            interval = self.min_interval if changed else min(interval * 2, self.max_interval)
+            registry['pollIntervalSeconds'] = interval
+            registry['nextPollAt'] = now + interval
+            registry['lastPolledAt'] = now
+        self._update_registry(apply_poll)
+
+        hooks_done = {arn: self._run_hooks(job) for arn, job in claimed.items()}
+        finished = [arn for arn, job in claimed.items() if len(hooks_done[arn]) == len(self.hooks.get(job['status'], []))]
+
+        def release(registry):
+            for arn in claimed:
+                job = registry['jobs'].get(arn)
+                if job is None or job.get('hooksClaimedAt') != now:
+                    continue
+                if arn in finished:
+                    del registry['jobs'][arn]
+                else:
+                    # Retried on the next tick; hooks that already succeeded are skipped
+                    job['hooksDone'] = hooks_done[arn]
+                    del job['hooksClaimedAt']
+        if claimed:
+            self._update_registry(release)
+
+        logger.info(f"Polled {len(jobs)} evaluation jobs, {len(finished)} finished, {len(claimed) - len(finished)} hooks to retry")
+        return {'polled': True, 'tracked': len(jobs) - len(finished), 'finished': [claimed[arn] for arn in finished]}
+
+    def fetch_statuses(self, jobs: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """Current status of each tracked job, listed in batches"""
+        oldest = min(job['createdAt'] for job in jobs.values()) - LIST_CREATION_TIME_SLACK_SECONDS
+        remaining = set(jobs)
+        statuses = {}
+        next_token = None
+
+        # Newest first, so listing stops as soon as every tracked job was seen
+        while remaining:
+            request = {
+                'creationTimeAfter': datetime.fromtimestamp(oldest, tz=timezone.utc),
+                'sortBy': 'CreationTime',
+                'sortOrder': 'Descending',
+                'maxResults': 100
+            }
+            if next_token:
+                request['nextToken'] = next_token
+            response = self.bedrock_client.list_evaluation_jobs(**request)
+            for summary in response.get('jobSummaries', []):
+                if summary['jobArn'] in remaining:
+                    statuses[summary['jobArn']] = summary['status']
+                    remaining.discard(summary['jobArn'])
+            next_token = response.get('nextToken')
+            if not next_token:
+                break
+
+        # Jobs the listing did not return (e.g. clock skew) are looked up directly
+        for arn in remaining:
+            try:
+                statuses[arn] = self.bedrock_client.get_evaluation_job(jobIdentifier=arn)['status']
+            except Exception as e:
+                logger.warning(f"Failed to get status of evaluation job {arn}: {str(e)}")
+
+        return statuses
+
+    def _run_hooks(self, job: Dict[str, Any]) -> List[str]:
+        """Run the job's hooks that have not succeeded yet; returns the names of all that have"""
+        hooks_done = list(job.get('hooksDone', []))
+        for hook in self.hooks.get(job['status'], []):
+            name = getattr(hook, '__name__', repr(hook))
+            if name in hooks_done:
+                continue
+            try:
+                hook(job)
+                hooks_done.append(name)
+            except Exception as e:
+                # One failing hook must not keep the others from running
+                logger.error(f"Hook {name} failed for {job['evaluationJobArn']}: {str(e)}")
+        return hooks_done
+
+    def _load_registry(self):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=JOB_REGISTRY_KEY)
+            return json.loads(response['Body'].read()), response['ETag']
+        except self.s3_client.exceptions.NoSuchKey:
+            return {'jobs': {}}, None
+
+    def _update_registry(self, mutate: Callable[[Dict[str, Any]], None]):
+        for attempt in range(JOB_REGISTRY_WRITE_ATTEMPTS):
+            registry, etag = self._load_registry()
+            mutate(registry)
+            condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+            try:
+                self.s3_client.put_object(
+                    Bucket=self.bucket,
+                    Key=JOB_REGISTRY_KEY,
+                    Body=json.dumps(registry).encode('utf-8'),
+                    ContentType='application/json',
+                    **condition
+                )
+                return
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                    raise
+                logger.info(f"Job registry changed concurrently, retrying (attempt {attempt + 1})")
+                time.sleep(backoff_delay(attempt + 1, throttled=False))
+        raise RuntimeError(f"Could not update {JOB_REGISTRY_KEY} after {JOB_REGISTRY_WRITE_ATTEMPTS} attempts")
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Iterator
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+# Record-level cache of judge scores. Entries are content-addressed by
+# (prompt, reference, response, metric set, evaluator model) and stored as one
+# small object per record, so a dataset costs one GET per record no matter how
+# large the cache grows. Entries never change once written, so writes are
+# plain create-if-absent PUTs without read-modify-write contention.
+JUDGE_CACHE_PREFIX = 'judge-cache/'
+JUDGE_CACHE_PREFIX_CHARS = 2
+
+# Records are looked up in parallel batches of this size
+JUDGE_CACHE_LOOKUP_BATCH = 64
+
+# Run parts written by the cache itself (never re-ingested)
+CACHED_PART_DIR = 'judge-cache'
+CACHED_PART_SUFFIX = '_cached.jsonl'
+
+def record_cache_key(record: Dict[str, Any], metrics: List[str], evaluator_model_id: str) -> str:
+    """Content hash of a dataset or Bedrock output record plus the judge configuration"""
+    input_record = record.get('inputRecord', record)
+    model_responses = record.get('modelResponses') or input_record.get('modelResponses') or [{}]
+    material = [
+        input_record.get('prompt'),
+        input_record.get('referenceResponse'),
+        model_responses[0].get('response'),
+        sorted(metrics),
+        evaluator_model_id
+    ]
+    return hashlib.sha256(json.dumps(material).encode('utf-8')).hexdigest()
+
+class JudgeResultCache:
+    """S3-backed cache of per-record judge scores, one object per record key"""
+
+    def __init__(self, s3_client, bucket: str, concurrency: int = 4):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.concurrency = concurrency
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached scores for a record key, or None"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Cached scores of the keys that are in the cache"""
+        unique_keys = list(dict.fromkeys(keys))
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(unique_keys)))) as executor:
+            found = dict(zip(unique_keys, executor.map(self._get_entry, unique_keys)))
+        scores = {key: value for key, value in found.items() if value is not None}
+        self.hits += sum(1 for key in keys if key in scores)
+        self.misses += sum(1 for key in keys if key not in scores)
+        return scores
+
+    def put_many(self, entries: Dict[str, List[Dict[str, Any]]]):
+        """
+        Add scores to the cache; keys that are already cached keep their scores
+        Raises if any entry could not be written, so the caller can retry
+        """
+        if not entries:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(entries)))) as executor:
+            errors = [error for error in executor.map(self._put_entry, entries.items()) if error is not None]
+        if errors:
+            logger.error(f"Failed to write {len(errors)} of {len(entries)} judge cache entries: {str(errors[0])}")
+            raise errors[0]
+
+    def _entry_key(self, key: str) -> str:
+        return f"{JUDGE_CACHE_PREFIX}records/{key[:JUDGE_CACHE_PREFIX_CHARS]}/{key}.json"
+
+    def _get_entry(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self._entry_key(key))
+            return json.loads(response['Body'].read())
+        except self.s3_client.exceptions.NoSuchKey:
+            return None
+
+    def _put_entry(self, item) -> Optional[Exception]:
+        key, scores = item
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self._entry_key(key),
+                Body=json.dumps(scores).encode('utf-8'),
+                ContentType='application/json',
+                IfNoneMatch='*'
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                return e
+        except Exception as e:
+            return e
+        return None
+
+def compact_scores(scores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only what the leaderboard needs from a Bedrock score entry"""
+    return [{'metricName': score.get('metricName'), 'result': score.get('result')} for score in scores]
+
+def iter_jsonl_records(s3_client, bucket: str, key: str) -> Iterator[Dict[str, Any]]:
+    """Stream the JSON records of a JSONL object, skipping unparsable lines"""
+    body = s3_client.get_object(Bucket=bucket, Key=key)['Body']
+    try:
+        for line in body.iter_lines(chunk_size=64 * 1024):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unparsable line in {key}")
+    finally:
+        body.close()
+
+def partition_dataset(
+    cache: JudgeResultCache,
+    s3_client,
+    dataset_bucket: str,
+    dataset_key: str,
+    metrics: List[str],
+    evaluator_model_id: str
+) -> Dict[str, Any]:
+    """
+    Split a dataset into records that still need judging and records whose
+    scores are cached. Returns spooled files holding the uncached dataset lines
+    and the cached records already in Bedrock output format.
+    """
+    uncached_file = tempfile.TemporaryFile()
+    cached_file = tempfile.TemporaryFile()
+    uncached_count = 0
+    cached_count = 0
+
+    def write_batch(batch: List[Dict[str, Any]]):
+        nonlocal uncached_count, cached_count
+        keys = [record_cache_key(record, metrics, evaluator_model_id) for record in batch]
+        found = cache.get_many(keys)
+        for record, key in zip(batch, keys):
+            scores = found.get(key)
+            if scores is None:
+                uncached_file.write(json.dumps(record).encode('utf-8') + b'\n')
+                uncached_count += 1
+            else:
+                output_record = {
+                    'inputRecord': record,
+                    'modelResponses': record.get('modelResponses', []),
+                    'automatedEvaluationResult': {'scores': scores}
+                }
+                cached_file.write(json.dumps(output_record).encode('utf-8') + b'\n')
+                cached_count += 1
+
+    try:
+        batch = []
+        for record in iter_jsonl_records(s3_client, dataset_bucket, dataset_key):
+            batch.append(record)
+            if len(batch) == JUDGE_CACHE_LOOKUP_BATCH:
+                write_batch(batch)
+                batch = []
+        if batch:
+            write_batch(batch)
+    except Exception:
+        uncached_file.close()
+        cached_file.close()
+        raise
+
+    uncached_file.seek(0)
+    cached_file.seek(0)
+    logger.info(f"Judge cache partitioned {dataset_key}: {cached_count} cached, {uncached_count} to judge")
+    return {
+        'uncachedFile': uncached_file,
+        'uncachedCount': uncached_count,
+        'cachedFile': cached_file,
+        'cachedCount': cached_count
+    }
+
+def ingest_evaluation_output(
+    cache: JudgeResultCache,
+    s3_client,
+    bucket: str,
+    output_key: str,
+    metrics: List[str],
+    evaluator_model_id: str
+) -> int:
+    """Add the fresh scores of a completed Bedrock output file to the cache"""
+    entries = {}
+    for record in iter_jsonl_records(s3_client, bucket, output_key):
+        scores = record.get('automatedEvaluationResult', {}).get('scores')
+        if scores:
+            entries[record_cache_key(record, metrics, evaluator_model_id)] = compact_scores(scores)
+    cache.put_many(entries)
+    logger.info(f"Cached {len(entries)} judged records from {output_key}")
+    return len(entries)
+
+def ingest_job_outputs(
+    cache: JudgeResultCache,
+    s3_client,
+    output_bucket: str,
+    prefix: str,
+    metrics: List[str],
+    evaluator_model_id: str
+) -> int:
+    """
+    Ingest the Bedrock outputs of one finished job (everything under its output prefix)
+    Called once per job by its completion hook; ingesting again only rewrites
+    the same scores, so a retried hook needs no ledger
+    """
+    output_keys = []
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=output_bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            key = obj['Key']
+            if key.endswith('_output.jsonl') and f'/{CACHED_PART_DIR}/' not in key:
+                output_keys.append(key)
+
+    for key in output_keys:
+        ingest_evaluation_output(cache, s3_client, output_bucket, key, metrics, evaluator_model_id)
+    return len(output_keys)
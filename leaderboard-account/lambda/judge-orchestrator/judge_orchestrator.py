@@ -1,99 +1,245 @@
+import io
 import json
-import boto3
+import hashlib
 import os
 import logging
+import re
 import time
-import requests
-from typing import Dict, List, Any
+import uuid
+from typing import Dict, List, Any, Iterator, Optional
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+from submission_queue import create_submission_queue
+from dataset_validator import DatasetValidator, DatasetValidationError
+from job_tracker import EvaluationJobTracker
+from job_scheduler import EvaluationJobScheduler
+from local_bedrock import create_bedrock_client
+from dataset_sharding import SHARD_MANIFEST_NAME, SHARD_OUTPUT_DIR, plan_shard_count, split_dataset
+from job_batching import (
+    BATCH_MODEL_IDENTIFIER,
+    BATCH_PART_DIR,
+    BATCH_PREFIX,
+    build_batch_dataset,
+    split_batch_output
+)
+from resilience import THROTTLING_ERROR_CODES, is_throttling_error, publish_metrics
+from clients import HTTP_TIMEOUT, get_client, get_http_session
+from judge_cache import (
+    CACHED_PART_DIR,
+    CACHED_PART_SUFFIX,
+    JudgeResultCache,
+    ingest_job_outputs,
+    partition_dataset
+)
 
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-s3_client = boto3.client('s3')
-bedrock_client = boto3.client('bedrock')
-
 # Environment variables
 BEDROCK_MODEL_ID = os.environ['BEDROCK_MODEL_ID']
 PARTICIPANT_RESULTS_BUCKET = os.environ['PARTICIPANT_RESULTS_BUCKET']
 BEDROCK_EVALUATION_ROLE_ARN = os.environ['BEDROCK_EVALUATION_ROLE_ARN']
 EVALUATION_OUTPUT_BUCKET = os.environ['EVALUATION_OUTPUT_BUCKET']
 
+# Streaming ingest of participant datasets. Datasets smaller than the
+# multipart threshold go up in a single PUT; larger or unknown-size ones are
+# streamed as a multipart upload, so memory stays bounded by
+# chunk size x upload concurrency regardless of dataset size.
+INGEST_CHUNK_SIZE = 1024 * 1024
+INGEST_MULTIPART_THRESHOLD = int(os.environ.get('INGEST_MULTIPART_THRESHOLD', str(8 * 1024 * 1024)))
+INGEST_MULTIPART_CHUNK_SIZE = int(os.environ.get('INGEST_MULTIPART_CHUNK_SIZE', str(8 * 1024 * 1024)))
+INGEST_UPLOAD_CONCURRENCY = int(os.environ.get('INGEST_UPLOAD_CONCURRENCY', '4'))
+
+# Initialize AWS clients (shared and reused across warm invocations). The S3
+# pool covers the multipart upload threads plus the submission bookkeeping.
+s3_client = get_client('s3', concurrency=INGEST_UPLOAD_CONCURRENCY + 2)
+bedrock_client = create_bedrock_client()
+
+# Dataset limits enforced while the dataset is streamed in, before any job
+# is created. The optional category may be restricted with a comma-separated
+# list; by default any category is accepted.
+DATASET_MAX_RECORDS = int(os.environ.get('DATASET_MAX_RECORDS', '1000'))
+DATASET_MAX_BYTES = int(os.environ.get('DATASET_MAX_BYTES', str(256 * 1024 * 1024)))
+DATASET_MAX_LINE_BYTES = int(os.environ.get('DATASET_MAX_LINE_BYTES', str(256 * 1024)))
+DATASET_CATEGORIES = [
+    category.strip()
+    for category in os.environ.get('DATASET_CATEGORIES', '').split(',')
+    if category.strip()
+] or None
+
+# Datasets with more than DATASET_SHARD_RECORDS records to judge are split
+# into category-stratified shards (at most DATASET_MAX_SHARDS) that run as
+# parallel evaluation jobs. 0 disables sharding.
+DATASET_SHARD_RECORDS = int(os.environ.get('DATASET_SHARD_RECORDS', '0'))
+DATASET_MAX_SHARDS = int(os.environ.get('DATASET_MAX_SHARDS', '8'))
+
+# Scheduler entry fields kept with a tracked job, so a resubmission is queued
+# the same way (into the same shard directory, batchable again)
+TRACKED_ENTRY_FIELDS = ('outputS3Uri', 'runTimestamp', 'shardIndex', 'shardCount', 'records')
+
+# Submissions are accepted by the API handler, recorded in S3 and queued for
+# the worker, which downloads the dataset and creates the evaluation job
+SUBMISSIONS_PREFIX = 'submissions/'
+submission_queue = create_submission_queue()
+
+# All available LLM-as-judge metrics
+LLM_JUDGE_METRICS = [
+    "Builtin.Correctness",
+    "Builtin.Completeness", 
+    # "Builtin.Faithfulness",
+    # "Builtin.Helpfulness",
+    # "Builtin.Coherence",
+    # "Builtin.Relevance",
+    # "Builtin.FollowingInstructions",
+    "Builtin.ProfessionalStyleAndTone"
+    # "Builtin.Harmfulness",
+    # "Builtin.Stereotyping",
+    # "Builtin.Refusal"
+]
+
+# Task type for the evaluation (adjust based on your use case)
+TASK_TYPE = "General"
+
+# Evaluator model ID
+EVALUATOR_MODEL_ID = "amazon.nova-pro-v1:0"
+
+# Index from dataset SHA-256 digest to the evaluation run that judged it, so
+# byte-identical resubmissions do not start another Bedrock job
+DATASET_INDEX_PREFIX = 'dataset-index/'
+
+# Job states in which an earlier evaluation run can be reused. A job that is
+# still running may yet fail, and nothing would revisit a submission linked to it
+REUSABLE_JOB_STATUSES = ('Completed',)
+
+# Record-level judge cache: records whose (prompt, reference, response) were
+# already judged with the same metrics and evaluator are not sent to Bedrock again
+JUDGE_CACHE_ENABLED = os.environ.get('JUDGE_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Evaluation job tracking: status is polled in batches on a schedule, backing
+# off from the min to the max interval while nothing changes. Failed jobs are
+# resubmitted up to JOB_RESUBMIT_ATTEMPTS times.
+JOB_POLL_MIN_INTERVAL = int(os.environ.get('JOB_POLL_MIN_INTERVAL', '60'))
+JOB_POLL_MAX_INTERVAL = int(os.environ.get('JOB_POLL_MAX_INTERVAL', '900'))
+JOB_RESUBMIT_ATTEMPTS = int(os.environ.get('JOB_RESUBMIT_ATTEMPTS', '0'))
+job_tracker = EvaluationJobTracker(
+    s3_client,
+    PARTICIPANT_RESULTS_BUCKET,
+    bedrock_client,
+    min_interval=JOB_POLL_MIN_INTERVAL,
+    max_interval=JOB_POLL_MAX_INTERVAL
+)
+
+# Job creation goes through a scheduler that keeps at most JOB_MAX_CONCURRENT
+# jobs running, creates at most JOB_CREATE_RATE jobs per second (bursts of
+# JOB_CREATE_BURST) and serves participants round-robin, first submissions first
+JOB_MAX_CONCURRENT = int(os.environ.get('JOB_MAX_CONCURRENT', '10'))
+JOB_CREATE_RATE = float(os.environ.get('JOB_CREATE_RATE', '0.2'))
+JOB_CREATE_BURST = int(os.environ.get('JOB_CREATE_BURST', '2'))
+
+# Small jobs can be combined into one Bedrock job of up to
+# JOB_BATCH_MAX_SUBMISSIONS submissions and JOB_BATCH_MAX_RECORDS records; a
+# batch that is not full waits up to JOB_BATCH_WINDOW_SECONDS for more.
+# 1 disables batching.
+JOB_BATCH_MAX_SUBMISSIONS = int(os.environ.get('JOB_BATCH_MAX_SUBMISSIONS', '1'))
+JOB_BATCH_MAX_RECORDS = int(os.environ.get('JOB_BATCH_MAX_RECORDS', '1000'))
+JOB_BATCH_WINDOW_SECONDS = float(os.environ.get('JOB_BATCH_WINDOW_SECONDS', '30'))
+job_scheduler = EvaluationJobScheduler(
+    s3_client,
+    PARTICIPANT_RESULTS_BUCKET,
+    max_concurrent=JOB_MAX_CONCURRENT,
+    create_rate=JOB_CREATE_RATE,
+    create_burst=JOB_CREATE_BURST,
+    batch_max_entries=JOB_BATCH_MAX_SUBMISSIONS,
+    batch_max_records=JOB_BATCH_MAX_RECORDS,
+    batch_window_seconds=JOB_BATCH_WINDOW_SECONDS
+)
+
+# Participant IDs end up in S3 keys and Bedrock job names
+# (llm-judge-<participant>-<timestamp>, at most 63 lowercase characters)
+PARTICIPANT_ID_PATTERN = re.compile(r'^[a-z0-9](-*[a-z0-9]){0,40}$')
+
 def handler(event, context):
     """
     Main handler for judge orchestrator
-    Receives evaluation requests from participants via standard HTTPS API calls
-    and coordinates the judging process using Bedrock LLM
+    Receives evaluation requests from participants via standard HTTPS API calls,
+    records and queues them, and returns 202 while the worker does the judging.
+    GET /submissions/{submissionId} reports a submission's status and
+    GET /queue the job queue.
     """
     try:
+        if event.get('httpMethod') == 'GET':
+            if (event.get('path') or '').rstrip('/').endswith('/queue'):
+                return get_queue_status()
+            submission_id = (event.get('pathParameters') or {}).get('submissionId')
+            return get_submission_status(submission_id)
+        
         logger.info(f"Received evaluation request from participant")
         logger.debug(f"Event details: {json.dumps(event, default=str)}")
         
         # Parse the request body from standard HTTPS POST request
-        raw_body = event.get('body', '{}')
-        logger.info(f"Raw request body: {raw_body}")
+        raw_body = event.get('body') or '{}'
+        
+        try:
+            body = json.loads(raw_body)
+        except json.JSONDecodeError:
+            return error_response(400, 'Request body must be valid JSON')
         
-        body = json.loads(raw_body)
         participant_id = body.get('participantId')
         presigned_url = body.get('presignedUrl')
         
-        logger.info(f"Parsed participant_id: {participant_id}")
-        logger.info(f"Parsed presigned_url: {presigned_url}")
-        
         # Log the request details (without sensitive URLs)
         logger.info(f"Processing evaluation for participant: {participant_id}")
         
         if not participant_id or not presigned_url:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                },
-                'body': json.dumps({
-                    'error': 'Missing required parameters: participantId and presignedUrl'
-                })
-            }
+            return error_response(400, 'Missing required parameters: participantId and presignedUrl')
         
-        # TODO: improve it to use cross-account S3 CopyObject
-        # Copy participant results to our S3 bucket
-        logger.info("Retrieving and copying participant results...")
-        participant_results_s3_uri = retrieve_participant_results(presigned_url, participant_id)
-        logger.info(f"Participant results copied to: {participant_results_s3_uri}")
+        if not isinstance(participant_id, str) or not PARTICIPANT_ID_PATTERN.match(participant_id):
+            return error_response(400, 'participantId must be lowercase letters, digits and hyphens (max 41 characters)')
         
-        # Evaluate using Bedrock LLM Judge
-        logger.info("Starting Bedrock evaluation...")
-        evaluation_scores = evaluate_with_bedrock_judge(
-            participant_results_s3_uri, 
-            participant_id
-        )
-        logger.info("Bedrock evaluation completed")
+        if not isinstance(presigned_url, str) or not presigned_url.startswith('https://'):
+            return error_response(400, 'presignedUrl must be an https:// URL')
         
-        # Note: Results will be stored in S3 by Bedrock evaluation job
-        logger.info(f"Evaluation job started for participant {participant_id}")
+        submission = create_submission(participant_id)
+        
+        # The presigned URL only travels in the queue message, never in the stored record
+        try:
+            submission_queue.send({
+                'submissionId': submission['submissionId'],
+                'participantId': participant_id,
+                'presignedUrl': presigned_url
+            })
+        except Exception as e:
+            # Nothing will ever process this record, so it must not stay QUEUED
+            logger.error(f"Failed to queue submission {submission['submissionId']}: {str(e)}")
+            update_submission(submission['submissionId'], status='FAILED', error='Submission could not be queued')
+            raise
+        logger.info(f"Queued submission {submission['submissionId']} for participant {participant_id}")
         
         return {
-            'statusCode': 200,
+            'statusCode': 202,
             'headers': {
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*',
             },
             'body': json.dumps({
-                'message': 'Evaluation job started successfully',
+                'message': 'Evaluation request accepted',
+                'submissionId': submission['submissionId'],
                 'participantId': participant_id,
-                'evaluationJobArn': evaluation_scores.get('evaluationJobArn'),
-                'evaluationJobName': evaluation_scores.get('evaluationJobName'),
-                'status': evaluation_scores.get('status', 'IN_PROGRESS'),
-                'timestamp': evaluation_scores['timestamp'],
-                'participantResultsS3Uri': evaluation_scores.get('datasetS3Uri', participant_results_s3_uri),
-                'outputS3Uri': evaluation_scores.get('outputS3Uri')
+                'status': submission['status'],
+                'timestamp': submission['createdAt']
             })
         }
         
     except Exception as e:
         logger.error(f"Error in judge orchestrator: {str(e)}")
+        if is_throttling_error(e):
+            # A saturated dependency: ask the participant to retry later
+            response = error_response(503, 'Service temporarily unavailable, please retry')
+            response['headers']['Retry-After'] = str(max(1, int(getattr(e, 'retry_after', 5))))
+            return response
         return {
             'statusCode': 500,
             'headers': {
@@ -105,57 +251,561 @@ def handler(event, context):
                 'message': str(e)
             })
         }
+    finally:
+        publish_metrics()
 
-def retrieve_participant_results(presigned_url: str, participant_id: str) -> str:
-    """Copy participant results from presigned URL to our S3 bucket and return S3 URI"""
+def worker_handler(event, context):
+    """
+    Worker entry point that processes queued submissions
+    Invoked by the SQS event source in AWS; any other invocation drains the
+    configured local queue instead
+    """
     try:
-        logger.info(f"Retrieving participant results via presigned URL: {presigned_url}")
+        records = (event or {}).get('Records') or []
         
-        # Standard HTTPS GET request to presigned URL
-        response = requests.get(
-            presigned_url, 
-            timeout=30,
-            headers={
-                'User-Agent': 'LLM-Leaderboard-Judge/1.0'
-            }
-        )
-        response.raise_for_status()
+        if records and records[0].get('eventSource') == 'aws:sqs':
+            batch_item_failures = []
+            for record in records:
+                try:
+                    process_submission(json.loads(record['body']))
+                except Exception as e:
+                    logger.error(f"Error processing queued submission {record.get('messageId')}: {str(e)}")
+                    # Reported failures are retried by SQS and end up in the DLQ
+                    batch_item_failures.append({'itemIdentifier': record['messageId']})
+            return {'batchItemFailures': batch_item_failures}
+        
+        processed = 0
+        failed = 0
+        while True:
+            messages = submission_queue.drain()
+            if not messages:
+                break
+            for message in messages:
+                try:
+                    process_submission(message)
+                    processed += 1
+                except Exception as e:
+                    logger.error(f"Error processing submission {message.get('submissionId')}: {str(e)}")
+                    failed += 1
+        
+        return {'processed': processed, 'failed': failed}
+    finally:
+        publish_metrics()
+
+def tracker_handler(event, context):
+    """
+    Scheduled entry point that polls tracked evaluation jobs
+    Pass {"force": true} to poll regardless of the backoff schedule
+    """
+    try:
+        # While jobs wait for a slot, every tick polls: a finished job then frees
+        # its slot within a minute instead of after the backed-off interval
+        force = bool((event or {}).get('force')) or job_scheduler.has_pending()
+        result = job_tracker.poll(force=force)
+        
+        # Finished jobs free capacity, and throttled jobs become due again
+        dispatched = dispatch_pending_jobs()
+        return {
+            'polled': result['polled'],
+            'dispatched': len(dispatched),
+            'tracked': result['tracked'],
+            'finished': [
+                {'evaluationJobArn': job['evaluationJobArn'], 'status': job['status']}
+                for job in result['finished']
+            ]
+        }
+    finally:
+        publish_metrics()
+
+def process_submission(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a queued submission's dataset and start its Bedrock evaluation job"""
+    submission_id = message['submissionId']
+    participant_id = message['participantId']
+    
+    try:
+        update_submission(submission_id, status='PROCESSING')
         
-        # DEBUG: Log response details
-        logger.info(f"Response status: {response.status_code}")
-        logger.info(f"Response headers: {dict(response.headers)}")
-        logger.info(f"Response content length: {len(response.content)}")
+        # TODO: improve it to use cross-account S3 CopyObject
+        # Copy participant results to our S3 bucket
+        logger.info("Retrieving and copying participant results...")
+        try:
+            dataset = retrieve_participant_results(message['presignedUrl'], participant_id)
+        except DatasetValidationError as e:
+            # Invalid datasets are final: no job is created and SQS must not retry
+            logger.warning(f"Submission {submission_id} rejected: {str(e)}")
+            return update_submission(submission_id, status='INVALID', validation=e.report)
         
-        # Get the content as bytes and log first 500 chars for debugging
-        content = response.content
-        content_preview = content.decode('utf-8')[:500] if content else "No content"
-        logger.info(f"Response content preview: {content_preview}")
+        participant_results_s3_uri = dataset['s3Uri']
+        logger.info(f"Participant results copied to: {participant_results_s3_uri}")
+        
+        # Byte-identical dataset already judged with the same configuration:
+        # link to that run instead of paying for another evaluation job
+        existing_run = find_existing_evaluation_run(dataset['sha256'], participant_id)
+        if existing_run and existing_run.get('createdAt', 0) < job_scheduler.last_run_timestamp(participant_id):
+            # A newer run is ranked now, so linking would ignore this submission;
+            # the earlier results become the participant's newest run instead
+            existing_run = copy_evaluation_run(existing_run, dataset['sha256'], participant_id)
+        if existing_run:
+            logger.info(f"Dataset {dataset['sha256']} was already evaluated by {existing_run['evaluationJobArn']}, skipping job creation")
+            return update_submission(
+                submission_id,
+                status='DEDUPLICATED',
+                datasetSha256=dataset['sha256'],
+                evaluationJobArn=existing_run['evaluationJobArn'],
+                evaluationJobName=existing_run['evaluationJobName'],
+                participantResultsS3Uri=existing_run['datasetS3Uri'],
+                outputS3Uri=existing_run['outputS3Uri']
+            )
         
-        # Generate S3 key for storing the participant results
-        timestamp = int(time.time())
-        s3_key = f"participant-results/{participant_id}/{timestamp}/dataset.jsonl"
+        # The job timestamp fixes the run directory, so cached scores can be
+        # filed next to the output of the job that judges the rest
+        timestamp = job_scheduler.reserve_run_timestamp(participant_id)
+        judge_cache_split = apply_judge_cache(dataset, participant_id, timestamp)
         
-        logger.info(f"Storing data to S3 key: {s3_key}")
+        if judge_cache_split['judgedRecords'] == 0:
+            logger.info(f"All {judge_cache_split['cachedRecords']} records were served from the judge cache, no job needed")
+            return update_submission(
+                submission_id,
+                status='COMPLETED',
+                datasetSha256=dataset['sha256'],
+                participantResultsS3Uri=participant_results_s3_uri,
+                outputS3Uri=judge_cache_split['cachedOutputS3Uri'],
+                cachedRecords=judge_cache_split['cachedRecords'],
+                judgedRecords=0
+            )
         
-        # Copy to our S3 bucket
+        judged_records = judge_cache_split['judgedRecords']
+        if judged_records is None:
+            judged_records = dataset['recordCount']
+        shard_count = plan_shard_count(judged_records, DATASET_SHARD_RECORDS, DATASET_MAX_SHARDS)
+        
+        entry = {
+            'id': evaluation_job_name(participant_id, timestamp),
+            'submissionId': submission_id,
+            'participantId': participant_id,
+            'datasetS3Uri': judge_cache_split['datasetS3Uri'],
+            'datasetSha256': dataset['sha256'],
+            'cachedPartKey': judge_cache_split['cachedPartKey'],
+            'timestamp': timestamp,
+            'records': judged_records,
+            'attempt': 1
+        }
+        entries = shard_evaluation_run(entry, shard_count) if shard_count > 1 else [entry]
+        
+        # Job creation is left to the scheduler, which respects the Bedrock quota
+        update_submission(
+            submission_id,
+            status='SCHEDULED',
+            datasetSha256=dataset['sha256'],
+            participantResultsS3Uri=participant_results_s3_uri,
+            cachedRecords=judge_cache_split['cachedRecords'],
+            judgedRecords=judged_records,
+            shardCount=shard_count
+        )
+        job_scheduler.enqueue_all(entries)
+        dispatch_pending_jobs()
+        
+        return load_submission(submission_id)
+        
+    except Exception as e:
+        logger.error(f"Error processing submission {submission_id}: {str(e)}")
+        # Saturated dependencies are transient: leave the submission to the
+        # queue's redelivery (and eventually the DLQ) instead of failing it
+        if is_throttling_error(e):
+            raise
+        # Anything else already went through the client retries and is final,
+        # so the message is acknowledged instead of being redelivered
+        return update_submission(submission_id, status='FAILED', error=str(e))
+
+def dispatch_pending_jobs() -> List[Dict[str, Any]]:
+    """Start queued jobs the quota allows; anything left is retried on the tracker schedule"""
+    try:
+        return job_scheduler.dispatch(start_scheduled_job, len(job_tracker.active_jobs()))
+    except Exception as e:
+        logger.error(f"Error dispatching scheduled jobs: {str(e)}")
+        return []
+
+def start_scheduled_job(entry: Dict[str, Any]):
+    """Create the Bedrock job for a scheduled entry (called by the scheduler)"""
+    if entry.get('entries'):
+        start_batch_job(entry)
+        return
+    
+    submission_id = entry.get('submissionId')
+    participant_id = entry['participantId']
+    
+    try:
+        # Evaluate using Bedrock LLM Judge
+        logger.info(f"Starting Bedrock evaluation for scheduled job {entry['id']}...")
+        evaluation_job = evaluate_with_bedrock_judge(
+            entry['datasetS3Uri'], 
+            participant_id,
+            entry['timestamp'],
+            entry.get('outputS3Uri')
+        )
+    except Exception as e:
+        # Throttled jobs are requeued by the scheduler; anything else is final
+        if not (isinstance(e, ClientError) and e.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES):
+            if submission_id:
+                update_submission(submission_id, status='FAILED', error=str(e))
+        raise
+    
+    # Note: Results will be stored in S3 by Bedrock evaluation job
+    logger.info(f"Evaluation job started for participant {participant_id}")
+    sharded = entry.get('shardCount', 1) > 1
+    
+    # A single shard's job cannot stand in for the whole dataset
+    if entry.get('datasetSha256') and not sharded:
+        record_evaluation_run(entry['datasetSha256'], participant_id, evaluation_job)
+    track_evaluation_job(
+        evaluation_job,
+        submission_id,
+        entry.get('datasetSha256'),
+        entry.get('cachedPartKey'),
+        entry.get('attempt', 1),
+        {field: entry[field] for field in TRACKED_ENTRY_FIELDS if field in entry}
+    )
+    
+    if submission_id and sharded:
+        # Shards report progress on the shared submission instead of their own job
+        submission = load_submission(submission_id)
+        if submission and submission.get('status') in ('SCHEDULED', 'JOB_CREATED'):
+            update_submission(
+                submission_id,
+                status='JOB_CREATED',
+                outputS3Uri=f"s3://{EVALUATION_OUTPUT_BUCKET}/{evaluation_run_dir(participant_id, entry['runTimestamp'])}/",
+                startedShards=sorted(set(submission.get('startedShards', [])) | {entry['shardIndex']})
+            )
+    elif submission_id:
+        update_submission(
+            submission_id,
+            status='JOB_CREATED',
+            evaluationJobArn=evaluation_job.get('evaluationJobArn'),
+            evaluationJobName=evaluation_job.get('evaluationJobName'),
+            judgedDatasetS3Uri=evaluation_job.get('datasetS3Uri'),
+            outputS3Uri=evaluation_job.get('outputS3Uri'),
+            attempt=entry.get('attempt', 1)
+        )
+
+def start_batch_job(batch: Dict[str, Any]):
+    """
+    Create one Bedrock job for a batch of scheduled entries
+    The combined dataset and the batch manifest (the entries plus the record
+    attribution used to split the output) are stored under the batch prefix
+    """
+    entries = batch['entries']
+    job_name = f"llm-judge-{batch['id']}"
+    batch_dir = f"{BATCH_PREFIX}{job_name}"
+    manifest_key = f"{batch_dir}/manifest.json"
+    
+    try:
+        logger.info(f"Starting batched Bedrock evaluation {job_name} for {len(entries)} submissions...")
+        dataset = build_batch_dataset(
+            s3_client,
+            PARTICIPANT_RESULTS_BUCKET,
+            entries,
+            LLM_JUDGE_METRICS,
+            EVALUATOR_MODEL_ID
+        )
+        with dataset['file'] as dataset_file:
+            s3_client.upload_fileobj(
+                dataset_file,
+                PARTICIPANT_RESULTS_BUCKET,
+                f"{batch_dir}/dataset.jsonl",
+                ExtraArgs={'ContentType': 'application/jsonl'}
+            )
+        
+        manifest = {
+            'jobName': job_name,
+            'createdAt': int(time.time()),
+            'entries': [dict(entry, batchedRecords=records) for entry, records in zip(entries, dataset['records'])],
+            'attribution': dataset['attribution']
+        }
         s3_client.put_object(
             Bucket=PARTICIPANT_RESULTS_BUCKET,
-            Key=s3_key,
-            Body=content,
-            ContentType='application/jsonl',
-            Metadata={
+            Key=manifest_key,
+            Body=json.dumps(manifest).encode('utf-8'),
+            ContentType='application/json'
+        )
+        
+        evaluation_job = evaluate_with_bedrock_judge(
+            f"s3://{PARTICIPANT_RESULTS_BUCKET}/{batch_dir}/dataset.jsonl",
+            BATCH_MODEL_IDENTIFIER,
+            manifest['createdAt'],
+            f"s3://{EVALUATION_OUTPUT_BUCKET}/{BATCH_PREFIX}",
+            job_name
+        )
+    except Exception as e:
+        # Throttled batches are requeued entry by entry by the scheduler
+        if not (isinstance(e, ClientError) and e.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES):
+            for entry in entries:
+                if entry.get('submissionId'):
+                    update_submission(entry['submissionId'], status='FAILED', error=str(e))
+        raise
+    
+    track_evaluation_job(
+        evaluation_job,
+        None,
+        None,
+        attempt=1,
+        entry_fields={'batchManifestKey': manifest_key, 'batchSize': len(entries)}
+    )
+    
+    for entry in entries:
+        if entry.get('submissionId'):
+            update_submission(
+                entry['submissionId'],
+                status='JOB_CREATED',
+                evaluationJobArn=evaluation_job['evaluationJobArn'],
+                evaluationJobName=job_name,
+                judgedDatasetS3Uri=entry['datasetS3Uri'],
+                outputS3Uri=f"s3://{EVALUATION_OUTPUT_BUCKET}/{evaluation_run_dir(entry['participantId'], entry['timestamp'])}/",
+                batchSize=len(entries),
+                attempt=entry.get('attempt', 1)
+            )
+
+def get_queue_status() -> Dict[str, Any]:
+    """Queue depth and estimated waits, without submission IDs"""
+    status = job_scheduler.queue_status(len(job_tracker.active_jobs()))
+    for job in status['jobs']:
+        job.pop('submissionId', None)
+    
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+        },
+        'body': json.dumps(status)
+    }
+
+def get_submission_status(submission_id: Optional[str]) -> Dict[str, Any]:
+    """Return a submission record, including validation errors for rejected datasets"""
+    if not submission_id or not re.match(r'^[0-9a-f]{32}$', submission_id):
+        return error_response(400, 'submissionId must be a 32 character hex string')
+    
+    submission = load_submission(submission_id)
+    if submission is None:
+        return error_response(404, f"Submission {submission_id} not found")
+    
+    # Scheduled submissions also report where they are in the job queue
+    if submission.get('status') == 'SCHEDULED':
+        queue = job_scheduler.queue_status(len(job_tracker.active_jobs()))
+        for job in queue['jobs']:
+            if job['submissionId'] == submission_id:
+                submission['queuePosition'] = job['position']
+                submission['estimatedWaitSeconds'] = job['estimatedWaitSeconds']
+        submission['queueDepth'] = queue['queueDepth']
+    
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+        },
+        'body': json.dumps(submission)
+    }
+
+def error_response(status_code: int, message: str) -> Dict[str, Any]:
+    """Build a JSON error response"""
+    return {
+        'statusCode': status_code,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+        },
+        'body': json.dumps({'error': message})
+    }
+
+def submission_key(submission_id: str) -> str:
+    """S3 key of a submission record"""
+    return f"{SUBMISSIONS_PREFIX}{submission_id}.json"
+
+def create_submission(participant_id: str) -> Dict[str, Any]:
+    """Persist a new submission record in the QUEUED state"""
+    now = int(time.time())
+    submission = {
+        'submissionId': uuid.uuid4().hex,
+        'participantId': participant_id,
+        'status': 'QUEUED',
+        'createdAt': now,
+        'updatedAt': now
+    }
+    save_submission(submission)
+    return submission
+
+def load_submission(submission_id: str) -> Optional[Dict[str, Any]]:
+    """Load a submission record, or None if it does not exist"""
+    try:
+        response = s3_client.get_object(
+            Bucket=PARTICIPANT_RESULTS_BUCKET,
+            Key=submission_key(submission_id)
+        )
+        return json.loads(response['Body'].read())
+    except s3_client.exceptions.NoSuchKey:
+        return None
+
+def save_submission(submission: Dict[str, Any]):
+    """Write a submission record to S3"""
+    s3_client.put_object(
+        Bucket=PARTICIPANT_RESULTS_BUCKET,
+        Key=submission_key(submission['submissionId']),
+        Body=json.dumps(submission).encode('utf-8'),
+        ContentType='application/json'
+    )
+
+def update_submission(submission_id: str, **fields) -> Dict[str, Any]:
+    """Merge fields into a submission record and bump its updatedAt"""
+    submission = load_submission(submission_id) or {'submissionId': submission_id}
+    submission.update(fields)
+    submission['updatedAt'] = int(time.time())
+    save_submission(submission)
+    logger.info(f"Submission {submission_id} is now {submission.get('status')}")
+    return submission
+
+class DatasetStream(io.RawIOBase):
+    """Read-only file object over an HTTP response body streamed in chunks"""
+    
+    def __init__(self, chunks: Iterator[bytes], preview_size: int = 500, validator: Optional[DatasetValidator] = None):
+        self._chunks = chunks
+        self._buffer = b''
+        self.bytes_read = 0
+        self.preview = b''
+        self.preview_size = preview_size
+        self.sha256 = hashlib.sha256()
+        self.validator = validator
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._consume(chunk)
+            self._buffer = chunk
+        
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+    
+    def _consume(self, chunk: bytes):
+        self.bytes_read += len(chunk)
+        self.sha256.update(chunk)
+        if len(self.preview) < self.preview_size:
+            self.preview += chunk[:self.preview_size - len(self.preview)]
+        if self.validator is not None:
+            self.validator.feed(chunk)
+
+def retrieve_participant_results(presigned_url: str, participant_id: str) -> Dict[str, Any]:
+    """
+    Stream participant results from presigned URL into our S3 bucket
+    Returns the S3 URI together with the dataset's SHA-256 digest and size.
+    The dataset is validated in the same pass; DatasetValidationError is
+    raised as soon as it is known to be unusable.
+    """
+    try:
+        logger.info(f"Retrieving participant results via presigned URL: {presigned_url}")
+        
+        # HTTPS GET to the presigned URL over the shared keep-alive session,
+        # streamed rather than buffered. The URL is only signed for GET, so the
+        # response headers double as the size preflight instead of a HEAD request.
+        response = get_http_session().get(
+            presigned_url, 
+            timeout=HTTP_TIMEOUT,
+            stream=True,
+            headers={
+                'User-Agent': 'LLM-Leaderboard-Judge/1.0'
+            }
+        )
+        
+        with response:
+            response.raise_for_status()
+            
+            # DEBUG: Log response details
+            logger.info(f"Response status: {response.status_code}")
+            logger.info(f"Response headers: {dict(response.headers)}")
+            
+            content_length = response.headers.get('Content-Length')
+            content_length = int(content_length) if content_length and content_length.isdigit() else None
+            logger.info(f"Response content length: {content_length if content_length is not None else 'unknown'}")
+            
+            validator = DatasetValidator(
+                participant_id,
+                max_records=DATASET_MAX_RECORDS,
+                max_bytes=DATASET_MAX_BYTES,
+                max_line_bytes=DATASET_MAX_LINE_BYTES,
+                categories=DATASET_CATEGORIES
+            )
+            if content_length is not None:
+                validator.check_declared_size(content_length)
+            
+            # Generate S3 key for storing the participant results
+            timestamp = int(time.time())
+            s3_key = f"participant-results/{participant_id}/{timestamp}/dataset.jsonl"
+            
+            logger.info(f"Storing data to S3 key: {s3_key}")
+            
+            # The content digest is only known once the stream is consumed, so it
+            # is recorded in the dataset index rather than in object metadata
+            metadata = {
                 'participant-id': participant_id,
-                'original-url-hash': str(hash(presigned_url)),
                 'timestamp': str(timestamp)
             }
-        )
+            
+            stream = DatasetStream(response.iter_content(chunk_size=INGEST_CHUNK_SIZE), validator=validator)
+            
+            if content_length is not None and content_length < INGEST_MULTIPART_THRESHOLD:
+                # Small dataset: a single PUT is cheaper than a multipart upload
+                s3_client.put_object(
+                    Bucket=PARTICIPANT_RESULTS_BUCKET,
+                    Key=s3_key,
+                    Body=stream.read(),
+                    ContentType='application/jsonl',
+                    Metadata=metadata
+                )
+            else:
+                # Large or unknown size: stream the body through a multipart upload.
+                # BufferedReader hands the uploader full-size parts.
+                s3_client.upload_fileobj(
+                    io.BufferedReader(stream, buffer_size=INGEST_CHUNK_SIZE),
+                    PARTICIPANT_RESULTS_BUCKET,
+                    s3_key,
+                    ExtraArgs={
+                        'ContentType': 'application/jsonl',
+                        'Metadata': metadata
+                    },
+                    Config=TransferConfig(
+                        multipart_threshold=INGEST_MULTIPART_THRESHOLD,
+                        multipart_chunksize=INGEST_MULTIPART_CHUNK_SIZE,
+                        max_concurrency=INGEST_UPLOAD_CONCURRENCY
+                    )
+                )
+        
+        validation = validator.finish()
+        if not validation['valid']:
+            raise DatasetValidationError(validation)
+        
+        # Log only a short preview of the dataset for debugging
+        content_preview = stream.preview.decode('utf-8', errors='replace') if stream.preview else "No content"
+        logger.info(f"Copied {stream.bytes_read} bytes, content preview: {content_preview}")
         
         # Return S3 URI for the copied file
         s3_uri = f"s3://{PARTICIPANT_RESULTS_BUCKET}/{s3_key}"
-        logger.info(f"Successfully copied participant results to S3: {s3_uri}")
+        logger.info(f"Successfully copied participant results to S3: {s3_uri} (sha256 {stream.sha256.hexdigest()})")
         
-        return s3_uri
+        return {
+            's3Uri': s3_uri,
+            's3Key': s3_key,
+            'sha256': stream.sha256.hexdigest(),
+            'sizeBytes': stream.bytes_read,
+            'recordCount': validation['recordCount']
+        }
     
+    except DatasetValidationError:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error retrieving participant results: {str(e)}")
         logger.error(f"Error type: {type(e).__name__}")
@@ -163,9 +813,278 @@ def retrieve_participant_results(presigned_url: str, participant_id: str) -> str
         logger.error(f"Full traceback: {traceback.format_exc()}")
         raise
 
+def evaluation_config_fingerprint() -> str:
+    """Digest of everything besides the dataset that determines an evaluation result"""
+    config = {
+        'metrics': sorted(LLM_JUDGE_METRICS),
+        'evaluatorModelId': EVALUATOR_MODEL_ID,
+        'taskType': TASK_TYPE
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+def dataset_index_key(dataset_sha256: str) -> str:
+    """S3 key of the dataset index entry for a digest"""
+    return f"{DATASET_INDEX_PREFIX}{dataset_sha256}.json"
+
+def load_dataset_index(dataset_sha256: str) -> Dict[str, Any]:
+    """Load the evaluation runs recorded for a dataset digest"""
+    try:
+        response = s3_client.get_object(
+            Bucket=PARTICIPANT_RESULTS_BUCKET,
+            Key=dataset_index_key(dataset_sha256)
+        )
+        return json.loads(response['Body'].read())
+    except s3_client.exceptions.NoSuchKey:
+        return {'sha256': dataset_sha256, 'runs': {}}
+
+def find_existing_evaluation_run(dataset_sha256: str, participant_id: str) -> Optional[Dict[str, Any]]:
+    """Find a reusable evaluation run of the same dataset, metrics and evaluator"""
+    try:
+        run = load_dataset_index(dataset_sha256)['runs'].get(evaluation_config_fingerprint())
+        
+        # Results are filed under the participant's prefix, so only that
+        # participant's earlier run can stand in for a new one
+        if not run or run.get('participantId') != participant_id:
+            return None
+        
+        # Only a job that already judged the dataset has results to link to
+        job = bedrock_client.get_evaluation_job(jobIdentifier=run['evaluationJobArn'])
+        if job.get('status') not in REUSABLE_JOB_STATUSES:
+            logger.info(f"Earlier run {run['evaluationJobArn']} is {job.get('status')}, not reusing it")
+            return None
+        
+        return dict(run, status=job.get('status'))
+        
+    except Exception as e:
+        # Dedup is an optimization; on any error fall back to a new job
+        logger.warning(f"Dataset dedup lookup failed for {dataset_sha256}: {str(e)}")
+        return None
+
+def copy_evaluation_run(run: Dict[str, Any], dataset_sha256: str, participant_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Copy a completed run's outputs and summary sidecars into a new run directory,
+    so the leaderboard's newest-run selection picks the reused results up again
+    Returns the run as recorded for the copy, or None to fall back to a new job
+    """
+    try:
+        source_dir = evaluation_run_dir(participant_id, run['createdAt'])
+        keys = []
+        paginator = s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=EVALUATION_OUTPUT_BUCKET, Prefix=f"{source_dir}/"):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        if not any(key.endswith('_output.jsonl') for key in keys):
+            logger.info(f"Earlier run {source_dir} has no output, judging the dataset again")
+            return None
+        
+        timestamp = job_scheduler.reserve_run_timestamp(participant_id)
+        target_dir = evaluation_run_dir(participant_id, timestamp)
+        
+        # Outputs go last: each one triggers a leaderboard update, which should
+        # find the run's sidecars and cached parts already in place
+        for key in sorted(keys, key=lambda key: key.endswith('_output.jsonl')):
+            s3_client.copy_object(
+                Bucket=EVALUATION_OUTPUT_BUCKET,
+                Key=f"{target_dir}{key[len(source_dir):]}",
+                CopySource={'Bucket': EVALUATION_OUTPUT_BUCKET, 'Key': key}
+            )
+        logger.info(f"Copied {len(keys)} objects of {source_dir} to {target_dir}")
+        
+        copy = {
+            'evaluationJobArn': run['evaluationJobArn'],
+            'evaluationJobName': evaluation_job_name(participant_id, timestamp),
+            'datasetS3Uri': run['datasetS3Uri'],
+            'outputS3Uri': f"s3://{EVALUATION_OUTPUT_BUCKET}/evaluation-results/{participant_id}/",
+            'timestamp': timestamp
+        }
+        record_evaluation_run(dataset_sha256, participant_id, copy)
+        return dict(copy, createdAt=timestamp)
+        
+    except Exception as e:
+        # Dedup is an optimization; on any error fall back to a new job
+        logger.warning(f"Failed to copy earlier run {run['evaluationJobArn']}: {str(e)}")
+        return None
+
+def record_evaluation_run(dataset_sha256: str, participant_id: str, evaluation_job: Dict[str, Any]):
+    """Remember which evaluation run judged a dataset digest"""
+    try:
+        index = load_dataset_index(dataset_sha256)
+        index['runs'][evaluation_config_fingerprint()] = {
+            'participantId': participant_id,
+            'evaluationJobArn': evaluation_job['evaluationJobArn'],
+            'evaluationJobName': evaluation_job['evaluationJobName'],
+            'datasetS3Uri': evaluation_job['datasetS3Uri'],
+            'outputS3Uri': evaluation_job['outputS3Uri'],
+            'createdAt': evaluation_job['timestamp']
+        }
+        
+        s3_client.put_object(
+            Bucket=PARTICIPANT_RESULTS_BUCKET,
+            Key=dataset_index_key(dataset_sha256),
+            Body=json.dumps(index).encode('utf-8'),
+            ContentType='application/json'
+        )
+        
+    except Exception as e:
+        logger.warning(f"Failed to record evaluation run for dataset {dataset_sha256}: {str(e)}")
+
+def evaluation_job_name(participant_id: str, timestamp: int) -> str:
+    """Bedrock job name, which is also the run directory under the participant's output prefix"""
+    return f"llm-judge-{participant_id}-{timestamp}"
+
+def evaluation_run_dir(participant_id: str, timestamp: int) -> str:
+    """Output bucket prefix (without trailing slash) of one evaluation run"""
+    return f"evaluation-results/{participant_id}/{evaluation_job_name(participant_id, timestamp)}"
+
+def apply_judge_cache(dataset: Dict[str, Any], participant_id: str, timestamp: int) -> Dict[str, Any]:
+    """
+    Split a copied dataset into cached and uncached records
+    Cached scores are written as an extra part of the run's output; the
+    returned dataset URI holds only the records Bedrock still has to judge
+    (datasetS3Uri is None and judgedRecords 0 when everything was cached)
+    """
+    no_cache = {
+        'datasetS3Uri': dataset['s3Uri'],
+        'cachedRecords': 0,
+        'judgedRecords': None,
+        'cachedPartKey': None,
+        'cachedOutputS3Uri': None
+    }
+    if not JUDGE_CACHE_ENABLED:
+        return no_cache
+    
+    judge_cache = JudgeResultCache(s3_client, PARTICIPANT_RESULTS_BUCKET, concurrency=INGEST_UPLOAD_CONCURRENCY)
+    try:
+        # Finished jobs were folded into the cache by their completion hooks
+        split = partition_dataset(
+            judge_cache,
+            s3_client,
+            PARTICIPANT_RESULTS_BUCKET,
+            dataset['s3Key'],
+            LLM_JUDGE_METRICS,
+            EVALUATOR_MODEL_ID
+        )
+    except Exception as e:
+        # The cache is an optimization; on any error judge the full dataset
+        logger.warning(f"Judge cache lookup failed, judging the full dataset: {str(e)}")
+        return no_cache
+    
+    with split['uncachedFile'] as uncached_file, split['cachedFile'] as cached_file:
+        if not split['cachedCount']:
+            no_cache['judgedRecords'] = split['uncachedCount']
+            return no_cache
+        
+        dataset_s3_uri = None
+        if split['uncachedCount']:
+            uncached_key = f"{dataset['s3Key'].rsplit('/', 1)[0]}/dataset-uncached.jsonl"
+            s3_client.upload_fileobj(
+                uncached_file,
+                PARTICIPANT_RESULTS_BUCKET,
+                uncached_key,
+                ExtraArgs={'ContentType': 'application/jsonl'}
+            )
+            dataset_s3_uri = f"s3://{PARTICIPANT_RESULTS_BUCKET}/{uncached_key}"
+        
+        # A run served entirely from the cache gets a regular _output.jsonl so the
+        # leaderboard treats it as complete; otherwise the cached part waits for
+        # the Bedrock output of the same run
+        suffix = CACHED_PART_SUFFIX if split['uncachedCount'] else '_output.jsonl'
+        cached_key = f"{evaluation_run_dir(participant_id, timestamp)}/{CACHED_PART_DIR}/records{suffix}"
+        s3_client.upload_fileobj(
+            cached_file,
+            EVALUATION_OUTPUT_BUCKET,
+            cached_key,
+            ExtraArgs={'ContentType': 'application/jsonl'}
+        )
+    
+    logger.info(f"Judge cache: {split['cachedCount']} records reused, {split['uncachedCount']} sent to Bedrock")
+    return {
+        'datasetS3Uri': dataset_s3_uri,
+        'cachedRecords': split['cachedCount'],
+        'judgedRecords': split['uncachedCount'],
+        'cachedPartKey': cached_key,
+        'cachedOutputS3Uri': f"s3://{EVALUATION_OUTPUT_BUCKET}/{cached_key}"
+    }
+
+def shard_evaluation_run(entry: Dict[str, Any], shard_count: int) -> List[Dict[str, Any]]:
+    """
+    Split a run's dataset into category-stratified shards and return one
+    scheduler entry per shard
+    Every shard job writes into <run dir>/shards/<index>/ and the run's shard
+    manifest tells the leaderboard how many shard outputs complete the run.
+    """
+    participant_id = entry['participantId']
+    run_timestamp = entry['timestamp']
+    run_dir = evaluation_run_dir(participant_id, run_timestamp)
+    dataset_key = entry['datasetS3Uri'].split('/', 3)[3]
+    
+    try:
+        shards = split_dataset(s3_client, PARTICIPANT_RESULTS_BUCKET, dataset_key, shard_count)
+        try:
+            # Each shard job needs a name of its own; the run directory stays the same
+            first_job_timestamp = job_scheduler.reserve_run_timestamp(participant_id, count=shard_count)
+            entries = []
+            for index, shard in enumerate(shards):
+                shard_key = f"{dataset_key.rsplit('/', 1)[0]}/dataset-shard-{index}.jsonl"
+                s3_client.upload_fileobj(
+                    shard['file'],
+                    PARTICIPANT_RESULTS_BUCKET,
+                    shard_key,
+                    ExtraArgs={'ContentType': 'application/jsonl'}
+                )
+                entries.append(dict(
+                    entry,
+                    id=evaluation_job_name(participant_id, first_job_timestamp + index),
+                    datasetS3Uri=f"s3://{PARTICIPANT_RESULTS_BUCKET}/{shard_key}",
+                    timestamp=first_job_timestamp + index,
+                    outputS3Uri=f"s3://{EVALUATION_OUTPUT_BUCKET}/{run_dir}/{SHARD_OUTPUT_DIR}/{index}/",
+                    runTimestamp=run_timestamp,
+                    shardIndex=index,
+                    shardCount=shard_count,
+                    records=shard['records']
+                ))
+        finally:
+            for shard in shards:
+                shard['file'].close()
+        
+        # Written before any shard job exists, so no shard output is ever
+        # mistaken for a complete run
+        manifest = {
+            'participantId': participant_id,
+            'submissionId': entry.get('submissionId'),
+            'runTimestamp': run_timestamp,
+            'shardCount': shard_count,
+            'createdAt': int(time.time()),
+            'shards': [
+                {
+                    'index': index,
+                    'records': shard['records'],
+                    'categories': shard['categories'],
+                    'datasetS3Uri': entries[index]['datasetS3Uri'],
+                    'outputS3Uri': entries[index]['outputS3Uri']
+                }
+                for index, shard in enumerate(shards)
+            ]
+        }
+        s3_client.put_object(
+            Bucket=EVALUATION_OUTPUT_BUCKET,
+            Key=f"{run_dir}/{SHARD_MANIFEST_NAME}",
+            Body=json.dumps(manifest).encode('utf-8'),
+            ContentType='application/json'
+        )
+        
+        logger.info(f"Sharded run {run_dir} into {shard_count} jobs")
+        return entries
+        
+    except Exception as e:
+        logger.error(f"Error sharding dataset {dataset_key}: {str(e)}")
+        raise
+
 def evaluate_with_bedrock_judge(
     participant_results_s3_uri: str, 
-    participant_id: str
+    participant_id: str,
+    timestamp: Optional[int] = None,
+    output_s3_uri: Optional[str] = None,
+    job_name: Optional[str] = None
 ) -> Dict[str, Any]:
     """Evaluate participant results using Bedrock LLM Judge"""
     try:
@@ -173,24 +1092,9 @@ def evaluate_with_bedrock_judge(
         logger.info(f"Participant results stored at: {participant_results_s3_uri}")
         
         # Generate unique job name
-        timestamp = int(time.time())
-        job_name = f"llm-judge-{participant_id}-{timestamp}"
-        
-        # All available LLM-as-judge metrics
-        llm_judge_metrics = [
-            "Builtin.Correctness",
-            "Builtin.Completeness", 
-            # "Builtin.Faithfulness",
-            # "Builtin.Helpfulness",
-            # "Builtin.Coherence",
-            # "Builtin.Relevance",
-            # "Builtin.FollowingInstructions",
-            "Builtin.ProfessionalStyleAndTone"
-            # "Builtin.Harmfulness",
-            # "Builtin.Stereotyping",
-            # "Builtin.Refusal"
-        ]
-
+        timestamp = timestamp or int(time.time())
+        job_name = job_name or evaluation_job_name(participant_id, timestamp)
+        
         # Configure dataset using the S3 URI where we copied the participant results
         dataset_config = {
             "name": f"ParticipantDataset-{participant_id}",
@@ -199,14 +1103,9 @@ def evaluate_with_bedrock_judge(
             }
         }
 
-        # Configure output S3 URI for evaluation results
-        output_s3_uri = f"s3://{EVALUATION_OUTPUT_BUCKET}/evaluation-results/{participant_id}/"
-        
-        # Task type for the evaluation (adjust based on your use case)
-        task_type = "General"
-        
-        # Evaluator model ID
-        evaluator_model_id = "amazon.nova-pro-v1:0"
+        # Configure output S3 URI for evaluation results (shards of a sharded
+        # run write into their own directory of the run instead)
+        output_s3_uri = output_s3_uri or f"s3://{EVALUATION_OUTPUT_BUCKET}/evaluation-results/{participant_id}/"
         
         # Model clean name for inference source
         model_clean_name = f"{participant_id}"
@@ -220,15 +1119,15 @@ def evaluate_with_bedrock_judge(
                     "automated": {
                         "datasetMetricConfigs": [
                             {
-                                "taskType": task_type,
+                                "taskType": TASK_TYPE,
                                 "dataset": dataset_config,
-                                "metricNames": llm_judge_metrics
+                                "metricNames": LLM_JUDGE_METRICS
                             }
                         ],
                         "evaluatorModelConfig": {
                             "bedrockEvaluatorModels": [
                                 {
-                                    "modelIdentifier": evaluator_model_id
+                                    "modelIdentifier": EVALUATOR_MODEL_ID
                                 }
                             ]
                         }
@@ -259,8 +1158,8 @@ def evaluate_with_bedrock_judge(
                 'outputS3Uri': output_s3_uri,
                 'timestamp': timestamp,
                 'datasetS3Uri': participant_results_s3_uri,
-                'metrics': llm_judge_metrics,
-                'taskType': task_type
+                'metrics': LLM_JUDGE_METRICS,
+                'taskType': TASK_TYPE
             }
             
             logger.info(f"Started Bedrock evaluation job for participant {participant_id}")
@@ -274,5 +1173,213 @@ def evaluate_with_bedrock_judge(
         logger.error(f"Error in Bedrock evaluation: {str(e)}")
         raise
 
+def track_evaluation_job(
+    evaluation_job: Dict[str, Any],
+    submission_id: Optional[str],
+    dataset_sha256: Optional[str],
+    cached_part_key: Optional[str] = None,
+    attempt: int = 1,
+    entry_fields: Optional[Dict[str, Any]] = None
+):
+    """Hand a created job to the tracker; a job that is not tracked still runs"""
+    try:
+        job_tracker.register({
+            **(entry_fields or {}),
+            'evaluationJobArn': evaluation_job['evaluationJobArn'],
+            'evaluationJobName': evaluation_job['evaluationJobName'],
+            'participantId': evaluation_job['participantId'],
+            'submissionId': submission_id,
+            'datasetSha256': dataset_sha256,
+            'datasetS3Uri': evaluation_job['datasetS3Uri'],
+            'outputS3Uri': evaluation_job['outputS3Uri'],
+            'cachedPartKey': cached_part_key,
+            'createdAt': evaluation_job['timestamp'],
+            'attempt': attempt
+        })
+    except Exception as e:
+        logger.error(f"Failed to track evaluation job {evaluation_job['evaluationJobArn']}: {str(e)}")
+
+def job_output_prefix(job: Dict[str, Any]) -> str:
+    """Output bucket prefix Bedrock writes a job's results to"""
+    output_prefix = job['outputS3Uri'].split('/', 3)[3]
+    return f"{output_prefix}{job['evaluationJobName']}/"
+
+def completed_shards(participant_id: str, run_timestamp: int) -> List[int]:
+    """Indexes of the shards of a sharded run that already have an output file"""
+    prefix = f"{evaluation_run_dir(participant_id, run_timestamp)}/{SHARD_OUTPUT_DIR}/"
+    completed = set()
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=EVALUATION_OUTPUT_BUCKET, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            shard_index = obj['Key'][len(prefix):].split('/', 1)[0]
+            if obj['Key'].endswith('_output.jsonl') and shard_index.isdigit():
+                completed.add(int(shard_index))
+    return sorted(completed)
+
+def load_batch_manifest(manifest_key: str) -> Dict[str, Any]:
+    """Read the manifest of a batched job"""
+    response = s3_client.get_object(Bucket=PARTICIPANT_RESULTS_BUCKET, Key=manifest_key)
+    return json.loads(response['Body'].read())
+
+def batch_part_key(entry: Dict[str, Any]) -> str:
+    """Key of the regular run output a batched submission's share is written to"""
+    return f"{evaluation_run_dir(entry['participantId'], entry['timestamp'])}/{BATCH_PART_DIR}/records_output.jsonl"
+
+def object_exists(bucket: str, key: str) -> bool:
+    """Whether an object with exactly this key exists"""
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=key):
+        if any(obj['Key'] == key for obj in page.get('Contents', [])):
+            return True
+    return False
+
+def complete_batch_job(job: Dict[str, Any]):
+    """
+    Split a finished batch job's output into the run of each batched submission
+    Parts that were already written are skipped, so a hook run that failed
+    part-way is simply run again on the next tracker poll; any error is raised
+    to keep the batch in the tracker registry until every part is written
+    """
+    manifest = load_batch_manifest(job['batchManifestKey'])
+    missing = [entry for entry in manifest['entries'] if not object_exists(EVALUATION_OUTPUT_BUCKET, batch_part_key(entry))]
+    
+    parts = []
+    if missing:
+        output_prefix = job_output_prefix(job)
+        output_keys = []
+        paginator = s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=EVALUATION_OUTPUT_BUCKET, Prefix=output_prefix):
+            output_keys.extend(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith('_output.jsonl'))
+        
+        parts = split_batch_output(
+            s3_client,
+            EVALUATION_OUTPUT_BUCKET,
+            output_keys,
+            manifest,
+            LLM_JUDGE_METRICS,
+            EVALUATOR_MODEL_ID
+        )
+    try:
+        for index, entry in enumerate(manifest['entries']):
+            part = parts[index] if parts else None
+            if part is not None and entry in missing:
+                if not part['records']:
+                    logger.error(f"Batch {manifest['jobName']} returned no results for {entry['id']}")
+                    if entry.get('submissionId'):
+                        update_submission(entry['submissionId'], status='FAILED', error='Batched evaluation returned no results')
+                    continue
+                
+                # Written as a regular run output, so the leaderboard needs no batch awareness
+                s3_client.upload_fileobj(
+                    part['file'],
+                    EVALUATION_OUTPUT_BUCKET,
+                    batch_part_key(entry),
+                    ExtraArgs={'ContentType': 'application/jsonl'}
+                )
+            if entry.get('submissionId'):
+                update_submission(entry['submissionId'], status='COMPLETED', completedAt=int(time.time()))
+    finally:
+        for part in parts:
+            part['file'].close()
+    
+    logger.info(f"Split batch {manifest['jobName']}: {len(manifest['entries']) - len(missing)} parts already written, {len(missing)} to write")
+
+def on_evaluation_job_completed(job: Dict[str, Any]):
+    """Mark the submission complete and fold the fresh scores into the judge cache"""
+    if job.get('batchManifestKey'):
+        complete_batch_job(job)
+    elif job.get('submissionId'):
+        if job.get('shardCount', 1) > 1:
+            # A sharded submission is complete once every shard has its output
+            shards_done = completed_shards(job['participantId'], job['runTimestamp'])
+            if len(shards_done) >= job['shardCount']:
+                update_submission(job['submissionId'], status='COMPLETED', completedShards=shards_done, completedAt=int(time.time()))
+            else:
+                update_submission(job['submissionId'], completedShards=shards_done)
+        else:
+            update_submission(job['submissionId'], status='COMPLETED', completedAt=int(time.time()))
+    job_scheduler.record_job_duration(time.time() - job['createdAt'])
+    
+    # The leaderboard's ranking index is refreshed by the S3 notification for
+    # the job's _output.jsonl, so only the judge cache is updated here
+    if JUDGE_CACHE_ENABLED:
+        ingest_job_outputs(
+            JudgeResultCache(s3_client, PARTICIPANT_RESULTS_BUCKET, concurrency=INGEST_UPLOAD_CONCURRENCY),
+            s3_client,
+            EVALUATION_OUTPUT_BUCKET,
+            job_output_prefix(job),
+            LLM_JUDGE_METRICS,
+            EVALUATOR_MODEL_ID
+        )
+
+def on_evaluation_job_failed(job: Dict[str, Any]):
+    """Record why a job failed and optionally resubmit it"""
+    try:
+        failure_messages = bedrock_client.get_evaluation_job(jobIdentifier=job['evaluationJobArn']).get('failureMessages', [])
+    except Exception as e:
+        logger.warning(f"Could not fetch failure details for {job['evaluationJobArn']}: {str(e)}")
+        failure_messages = []
+    logger.error(f"Evaluation job {job['evaluationJobArn']} ended as {job['status']}: {failure_messages}")
+    
+    # Every submission of a failed batch is retried (or failed) on its own
+    failed_jobs = [job]
+    if job.get('batchManifestKey'):
+        failed_jobs = [
+            dict(entry, evaluationJobArn=job['evaluationJobArn'], status=job['status'])
+            for entry in load_batch_manifest(job['batchManifestKey'])['entries']
+        ]
+    
+    for failed_job in failed_jobs:
+        if failed_job.get('attempt', 1) <= JOB_RESUBMIT_ATTEMPTS:
+            resubmit_evaluation_job(failed_job)
+            continue
+        
+        if failed_job.get('submissionId'):
+            shard = f" (shard {failed_job['shardIndex']} of {failed_job['shardCount']})" if failed_job.get('shardCount', 1) > 1 else ''
+            update_submission(
+                failed_job['submissionId'],
+                status='FAILED',
+                error=f"Evaluation job {failed_job['status'].lower()}{shard}",
+                failureMessages=failure_messages
+            )
+
+def resubmit_evaluation_job(job: Dict[str, Any]):
+    """Queue a new job for the same dataset as a failed one"""
+    participant_id = job['participantId']
+    timestamp = job_scheduler.reserve_run_timestamp(participant_id)
+    
+    # Cached scores belong to the failed run's directory; copy them to the new
+    # run. A resubmitted shard writes into the same run and shard directory.
+    sharded = job.get('shardCount', 1) > 1
+    cached_part_key = job.get('cachedPartKey')
+    if cached_part_key and not sharded:
+        cached_part_key = f"{evaluation_run_dir(participant_id, timestamp)}/{CACHED_PART_DIR}/records{CACHED_PART_SUFFIX}"
+        s3_client.copy_object(
+            Bucket=EVALUATION_OUTPUT_BUCKET,
+            Key=cached_part_key,
+            CopySource={'Bucket': EVALUATION_OUTPUT_BUCKET, 'Key': job['cachedPartKey']}
+        )
+    
+    attempt = job.get('attempt', 1) + 1
+    job_scheduler.enqueue({
+        'id': evaluation_job_name(participant_id, timestamp),
+        'submissionId': job.get('submissionId'),
+        'participantId': participant_id,
+        'datasetS3Uri': job['datasetS3Uri'],
+        'datasetSha256': job.get('datasetSha256'),
+        'cachedPartKey': cached_part_key,
+        'timestamp': timestamp,
+        'attempt': attempt,
+        **{field: job[field] for field in TRACKED_ENTRY_FIELDS if field in job}
+    })
+    logger.info(f"Requeued failed job {job['evaluationJobArn']} (attempt {attempt})")
+    
+    if job.get('submissionId'):
+        update_submission(job['submissionId'], status='SCHEDULED', attempt=attempt)
+
+job_tracker.add_hook('Completed', on_evaluation_job_completed)
+job_tracker.add_hook('Failed', on_evaluation_job_failed)
+job_tracker.add_hook('Stopped', on_evaluation_job_failed)
+
 # Note: Results are now stored directly in S3 by Bedrock evaluation jobs
 # The leaderboard API will read results from S3 instead of DynamoDB
\ No newline at end of file
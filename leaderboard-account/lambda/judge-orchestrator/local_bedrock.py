@@ -0,0 +1,109 @@
+import os
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+from clients import get_client
+
+logger = logging.getLogger()
+
+class LocalBedrockClient:
+    """
+    In-process stand-in for the Bedrock evaluation job APIs used by the
+    orchestrator and job tracker, for running the flow offline
+    Jobs stay InProgress until complete_after_seconds have passed (or
+    finish_job is called) and then end in the configured outcome
+    """
+
+    def __init__(self, complete_after_seconds: float = 0.0, default_outcome: str = 'Completed'):
+        self.complete_after_seconds = complete_after_seconds
+        self.default_outcome = default_outcome
+        self.jobs = {}
+        self.calls = []
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def create_evaluation_job(self, jobName: str, **kwargs) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append('CreateEvaluationJob')
+            self._counter += 1
+            job_arn = f"arn:aws:bedrock:local:000000000000:evaluation-job/{self._counter:012d}"
+            self.jobs[job_arn] = {
+                'jobArn': job_arn,
+                'jobName': jobName,
+                'status': 'InProgress',
+                'creationTime': datetime.now(timezone.utc),
+                'outcome': self.default_outcome,
+                'request': kwargs
+            }
+            return {'jobArn': job_arn}
+
+    def get_evaluation_job(self, jobIdentifier: str) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append('GetEvaluationJob')
+            job = self._refresh(self.jobs[jobIdentifier])
+            response = {
+                'jobArn': job['jobArn'],
+                'jobName': job['jobName'],
+                'status': job['status'],
+                'creationTime': job['creationTime']
+            }
+            if job['status'] == 'Failed':
+                response['failureMessages'] = ['Local evaluation job failed']
+            return response
+
+    def list_evaluation_jobs(
+        self,
+        creationTimeAfter: Optional[datetime] = None,
+        maxResults: int = 100,
+        nextToken: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append('ListEvaluationJobs')
+            jobs = sorted(self.jobs.values(), key=lambda job: job['creationTime'], reverse=True)
+            if creationTimeAfter is not None:
+                jobs = [job for job in jobs if job['creationTime'] > creationTimeAfter]
+
+            start = int(nextToken or 0)
+            page = jobs[start:start + maxResults]
+            response = {
+                'jobSummaries': [
+                    {
+                        'jobArn': job['jobArn'],
+                        'jobName': job['jobName'],
+                        'status': self._refresh(job)['status'],
+                        'creationTime': job['creationTime']
+                    }
+                    for job in page
+                ]
+            }
+            if start + maxResults < len(jobs):
+                response['nextToken'] = str(start + maxResults)
+            return response
+
+    def finish_job(self, job_arn: str, status: str = 'Completed'):
+        """Force a job into a terminal state"""
+        with self._lock:
+            self.jobs[job_arn]['status'] = status
+
+    def _refresh(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        if job['status'] == 'InProgress':
+            age = (datetime.now(timezone.utc) - job['creationTime']).total_seconds()
+            if age >= self.complete_after_seconds:
+                job['status'] = job['outcome']
+        return job
+
+def create_bedrock_client():
+    """
+    Build the Bedrock client from the environment
+    BEDROCK_BACKEND=local selects the in-process stand-in
+    """
+    if os.environ.get('BEDROCK_BACKEND') == 'local':
+        logger.info("Using local Bedrock stand-in")
+        return LocalBedrockClient(
+            complete_after_seconds=float(os.environ.get('LOCAL_BEDROCK_JOB_SECONDS', '0')),
+            default_outcome=os.environ.get('LOCAL_BEDROCK_JOB_OUTCOME', 'Completed')
+        )
+    return get_client('bedrock')
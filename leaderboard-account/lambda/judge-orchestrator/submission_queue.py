@@ -0,0 +1,98 @@
+import fcntl
+import json
+import os
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Any, Optional
+
+from clients import get_client
+
+logger = logging.getLogger()
+
+class SqsSubmissionQueue:
+    """Submission queue backed by Amazon SQS (used in AWS)"""
+
+    def __init__(self, queue_url: str, sqs_client=None):
+        self.queue_url = queue_url
+        self.sqs_client = sqs_client or get_client('sqs')
+
+    def send(self, message: Dict[str, Any]):
+        self.sqs_client.send_message(
+            QueueUrl=self.queue_url,
+            MessageBody=json.dumps(message)
+        )
+
+    def drain(self, max_messages: int = 10) -> List[Dict[str, Any]]:
+        """Receive and delete up to max_messages queued submissions"""
+        response = self.sqs_client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=min(max_messages, 10),
+            WaitTimeSeconds=0
+        )
+        messages = []
+        for sqs_message in response.get('Messages', []):
+            messages.append(json.loads(sqs_message['Body']))
+            self.sqs_client.delete_message(
+                QueueUrl=self.queue_url,
+                ReceiptHandle=sqs_message['ReceiptHandle']
+            )
+        return messages
+
+class InMemorySubmissionQueue:
+    """In-process submission queue for running the flow offline"""
+
+    def __init__(self):
+        self._messages = deque()
+        self._lock = threading.Lock()
+
+    def send(self, message: Dict[str, Any]):
+        with self._lock:
+            # Round-trip through JSON so messages look exactly like SQS bodies
+            self._messages.append(json.dumps(message))
+
+    def drain(self, max_messages: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(max_messages, len(self._messages))
+            return [json.loads(self._messages.popleft()) for _ in range(count)]
+
+class FileSubmissionQueue:
+    """File-backed submission queue (one JSON message per line) for local runs across processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, message: Dict[str, Any]):
+        with open(self.path, 'a', encoding='utf-8') as queue_file:
+            fcntl.flock(queue_file, fcntl.LOCK_EX)
+            queue_file.write(json.dumps(message) + '\n')
+
+    def drain(self, max_messages: int = 10) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r+', encoding='utf-8') as queue_file:
+            fcntl.flock(queue_file, fcntl.LOCK_EX)
+            lines = [line for line in queue_file.read().splitlines() if line.strip()]
+            queue_file.seek(0)
+            queue_file.truncate()
+            queue_file.writelines(line + '\n' for line in lines[max_messages:])
+        return [json.loads(line) for line in lines[:max_messages]]
+
+def create_submission_queue(queue_url: Optional[str] = None):
+    """
+    Build the submission queue from the environment
+    SUBMISSION_QUEUE_URL selects SQS; otherwise SUBMISSION_QUEUE_BACKEND
+    chooses the local 'memory' (default) or 'file' stand-in
+    """
+    queue_url = queue_url or os.environ.get('SUBMISSION_QUEUE_URL')
+    if queue_url:
+        return SqsSubmissionQueue(queue_url)
+
+    backend = os.environ.get('SUBMISSION_QUEUE_BACKEND', 'memory')
+    if backend == 'file':
+        path = os.environ.get('SUBMISSION_QUEUE_PATH', '/tmp/submission-queue.jsonl')
+        logger.info(f"Using file-backed submission queue at {path}")
+        return FileSubmissionQueue(path)
+
+    logger.info("Using in-memory submission queue")
+    return InMemorySubmissionQueue()
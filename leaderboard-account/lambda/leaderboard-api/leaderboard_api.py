@@ -1,37 +1,122 @@
 import json
-import boto3
+import base64
+import bisect
+import gzip
+import hashlib
+import zlib
 import os
 import logging
 import time
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Dict, List, Any, Optional, Iterator
 import re
-from collections import defaultdict
+from collections import OrderedDict
+from urllib.parse import unquote_plus
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from botocore.exceptions import ClientError
+
+from metric_accumulator import MetricAccumulator, merge_accumulators
+from ranking_index import RankingIndex
+from resilience import is_throttling_error, publish_metrics
+from clients import get_client
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-s3_client = boto3.client('s3')
-
 # Environment variables
 EVALUATION_OUTPUT_BUCKET = os.environ['EVALUATION_OUTPUT_BUCKET']
 
+# Materialized leaderboard snapshots. Each rebuild writes an immutable
+# versioned object and then swaps the pointer object to reference it, so
+# readers always see a complete snapshot.
+SNAPSHOT_PREFIX = 'leaderboard-snapshots/'
+SNAPSHOT_POINTER_KEY = f'{SNAPSHOT_PREFIX}latest.json'
+SNAPSHOT_VERSIONS_PREFIX = f'{SNAPSHOT_PREFIX}versions/'
+SNAPSHOT_POINTER_MAX_ATTEMPTS = 5
+
+# One small object per participant (rank key, ranked entry and run list),
+# rewritten whenever that participant's ranking is updated, so
+# GET /participants/{participantId} never loads the snapshot
+PARTICIPANT_ENTRY_PREFIX = 'leaderboard-participants/'
+
+# Participant results are fetched and summarized by a bounded worker pool.
+# The byte cap limits how much evaluation output is held in memory at once.
+FETCH_CONCURRENCY = int(os.environ.get('FETCH_CONCURRENCY', '16'))
+FETCH_MAX_INFLIGHT_BYTES = int(os.environ.get('FETCH_MAX_INFLIGHT_BYTES', str(256 * 1024 * 1024)))
+
+# Parsed summaries are cached per S3 object version in warm containers
+SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get('SUMMARY_CACHE_MAX_ENTRIES', '2048'))
+
+# Read size used when streaming evaluation outputs line by line
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Records the judge orchestrator served from its score cache are written as an
+# extra _cached.jsonl part next to the Bedrock output of the same run
+CACHED_PART_SUFFIX = '_cached.jsonl'
+
+# Sharded runs: each shard job writes under <run dir>/shards/<index>/ and the
+# run's manifest gives the number of shards needed for the run to be complete
+SHARD_MANIFEST_NAME = 'shard-manifest.json'
+SHARD_OUTPUT_PATTERN = re.compile(r'/shards/(\d+)/')
+
+# Alternate leaderboards (?sortBy=<metric>&category=<category>) are ranking
+# indexes kept in the snapshot next to the default totalScore ranking, keyed
+# by view_key(); each view ranks by one score of the entry
+DEFAULT_SORT_BY = 'totalScore'
+
+# Same rule the judge orchestrator applies to submitted participant IDs
+PARTICIPANT_ID_PATTERN = re.compile(r'^[a-z0-9](-*[a-z0-9]){0,40}$')
+
+# Runs returned by GET /participants/{participantId}, newest first
+PARTICIPANT_RUN_HISTORY_LIMIT = int(os.environ.get('PARTICIPANT_RUN_HISTORY_LIMIT', '20'))
+
+# Run directory of an evaluation output key: evaluation-results/<participant>/llm-judge-<participant>-<timestamp>/
+RUN_DIR_PATTERN = re.compile(r'^(evaluation-results/([^/]+)/llm-judge-[^/]+-(\d{10,}))/')
+
+# Version of the scoring code. Bump it whenever the summary calculation
+# changes so persisted summary sidecars are invalidated and rebuilt.
+SCORING_VERSION = '1'
+
+# HTTP caching of leaderboard responses. Short max-age plus
+# stale-while-revalidate lets CloudFront and browsers absorb polling bursts.
+LEADERBOARD_MAX_AGE = int(os.environ.get('LEADERBOARD_MAX_AGE', '5'))
+LEADERBOARD_STALE_WHILE_REVALIDATE = int(os.environ.get('LEADERBOARD_STALE_WHILE_REVALIDATE', '30'))
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+
+# Initialize AWS clients (one pooled connection per fetch worker), with the
+# shared retry and circuit breaker layer
+s3_client = get_client('s3', concurrency=FETCH_CONCURRENCY)
+
 def handler(event, context):
     """
     Main handler for leaderboard API
-    Always processes latest S3 results and returns fresh leaderboard
+    Serves the leaderboard from the latest snapshot and rebuilds the snapshot
+    when S3 reports a new evaluation output
     """
     try:
         logger.info(f"Received event: {json.dumps(event)}")
         
+        if is_s3_event(event):
+            return handle_evaluation_output_event(event, context)
+        
         # Get the HTTP method and path
         http_method = event.get('httpMethod', 'GET')
         path = event.get('path', '')
         query_params = event.get('queryStringParameters') or {}
+        headers = event.get('headers') or {}
         
         if path.endswith('/leaderboard') and http_method == 'GET':
-            return get_leaderboard(query_params, context)
+            return get_leaderboard(query_params, context, headers)
+        
+        if '/participants/' in path and http_method == 'GET':
+            participant_id = (event.get('pathParameters') or {}).get('participantId')
+            if path.rstrip('/').endswith('/rank'):
+                return get_participant_rank(participant_id, headers)
+            return get_participant_detail(participant_id, headers)
         
         return {
             'statusCode': 404,
@@ -44,6 +129,8 @@ def handler(event, context):
         
     except Exception as e:
         logger.error(f"Error in leaderboard API: {str(e)}")
+        if is_throttling_error(e):
+            return unavailable_response(e)
         return {
             'statusCode': 500,
             'headers': {
@@ -55,238 +142,1259 @@ def handler(event, context):
                 'message': str(e)
             })
         }
+    finally:
+        publish_metrics()
+
+def unavailable_response(error: Exception) -> Dict[str, Any]:
+    """503 for a saturated dependency, so clients back off instead of retrying at once"""
+    retry_after = max(1, int(getattr(error, 'retry_after', 5)))
+    return {
+        'statusCode': 503,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Retry-After': str(retry_after),
+        },
+        'body': json.dumps({'error': 'Service temporarily unavailable'})
+    }
 
-def get_leaderboard(query_params: Dict[str, str], context=None):
-    """Get fresh leaderboard by processing latest S3 evaluation results"""
+def get_leaderboard(query_params: Dict[str, str], context=None, headers: Optional[Dict[str, str]] = None):
+    """Get the leaderboard from the latest materialized snapshot"""
     try:
-        limit = int(query_params.get('limit', '50'))
-        
-        # Process all participants from S3
-        participants = process_all_participant_results()
-        
-        # Sort with tiebreaker logic:
-        # 1. Primary: Higher total score wins
-        # 2. Tiebreaker: Earlier timestamp wins (first to achieve the score)
-        # 3. Final fallback: Alphabetical by participant ID
-        sorted_participants = sorted(
-            participants,
-            key=lambda x: (
-                -x['totalScore'],      # Negative for descending order (higher scores first)
-                x['timestamp'],        # Ascending order (earlier timestamps first)
-                x['participantId']     # Alphabetical order as final fallback
-            )
-        )
+        try:
+            limit = int(query_params.get('limit', '50'))
+            after_key = decode_cursor(query_params['after']) if query_params.get('after') else None
+            if limit < 1:
+                raise ValueError('limit must be a positive integer')
+            sort_by = query_params.get('sortBy') or DEFAULT_SORT_BY
+            category = query_params.get('category') or None
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                },
+                'body': json.dumps({'error': f'Invalid query parameters: {str(e)}'})
+            }
         
-        # Add rank numbers and limit results
-        for i, participant in enumerate(sorted_participants[:limit]):
-            participant['rank'] = i + 1
+        # The pointer alone identifies the data version, so unchanged
+        # leaderboards are answered with a 304 without loading the snapshot
+        pointer = read_snapshot_pointer()
+        if pointer is not None:
+            etag = leaderboard_etag(pointer['version'], query_params)
+            # Compressed representations carry an encoding suffix on the ETag
+            for candidate in [etag] + [encoded_etag(etag, encoding) for encoding in SUPPORTED_ENCODINGS]:
+                if etag_matches(get_header(headers, 'If-None-Match'), candidate):
+                    logger.info(f"Leaderboard snapshot {pointer['version']} not modified")
+                    return {
+                        'statusCode': 304,
+                        'headers': leaderboard_cache_headers(candidate),
+                        'body': ''
+                    }
         
-        rankings = sorted_participants[:limit]
+        snapshot = load_snapshot(pointer) if pointer is not None else None
+        if snapshot is None:
+            # No snapshot published yet (first deployment) - build one now
+            logger.info("No leaderboard snapshot found, building one")
+            snapshot = rebuild_snapshot()
         
-        logger.info(f"Leaderboard generated with {len(rankings)} participants using tiebreaker logic")
+        if sort_by == DEFAULT_SORT_BY and category is None:
+            rankings, next_cursor = select_rankings(snapshot['rankings'], limit, after_key)
+        else:
+            view = snapshot_view(snapshot, view_key(sort_by, category))
+            if view is None:
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*',
+                    },
+                    'body': json.dumps({'error': f"No leaderboard for sortBy={sort_by} and category={category}"})
+                }
+            rankings, next_cursor = select_rankings(view, limit, after_key, score_field='score')
         
-        return {
+        logger.info(f"Leaderboard view {view_key(sort_by, category)} served from snapshot {snapshot['version']} with {len(rankings)} participants")
+        
+        response = {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Cache-Control': 'no-cache',  # Always fresh data
+                **leaderboard_cache_headers(leaderboard_etag(snapshot['version'], query_params))
             },
             'body': json.dumps({
                 'rankings': rankings,
-                'timestamp': int(time.time()),
-                'count': len(rankings)
+                'timestamp': snapshot['generatedAt'],
+                'count': len(rankings),
+                'nextCursor': next_cursor,
+                'sortBy': sort_by,
+                'category': category
             })
         }
         
+        return compress_response(response, get_header(headers, 'Accept-Encoding'))
+        
     except Exception as e:
         logger.error(f"Error getting leaderboard: {str(e)}")
         raise
 
-def process_all_participant_results() -> List[Dict[str, Any]]:
-    """Process evaluation results for all participants directly from S3"""
+def get_participant_rank(participant_id: Optional[str], headers: Optional[Dict[str, str]] = None):
+    """Get one participant's rank and entry from the latest snapshot's ranking index"""
+    try:
+        if not participant_id or not PARTICIPANT_ID_PATTERN.match(participant_id):
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                },
+                'body': json.dumps({'error': 'participantId is not a valid participant ID'})
+            }
+        
+        pointer = read_snapshot_pointer()
+        if pointer is not None:
+            etag = leaderboard_etag(pointer['version'], {'rankOf': participant_id})
+            if etag_matches(get_header(headers, 'If-None-Match'), etag):
+                return {
+                    'statusCode': 304,
+                    'headers': leaderboard_cache_headers(etag),
+                    'body': ''
+                }
+        
+        snapshot = load_snapshot(pointer) if pointer is not None else None
+        if snapshot is None:
+            logger.info("No leaderboard snapshot found, building one")
+            snapshot = rebuild_snapshot()
+        
+        rank = snapshot_ranking_index(snapshot).rank_of(participant_id)
+        if rank is None:
+            return {
+                'statusCode': 404,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                },
+                'body': json.dumps({'error': f"Participant {participant_id} is not ranked"})
+            }
+        
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                **leaderboard_cache_headers(leaderboard_etag(snapshot['version'], {'rankOf': participant_id}))
+            },
+            'body': json.dumps({
+                **snapshot['rankings'][rank - 1],
+                'rank': rank,
+                'participantCount': snapshot['count'],
+                'generatedAt': snapshot['generatedAt']
+            })
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting rank of participant {participant_id}: {str(e)}")
+        raise
+
+def get_participant_detail(participant_id: Optional[str], headers: Optional[Dict[str, str]] = None):
+    """
+    Get one participant's summary, rank, per-metric and per-category scores and run history
+    Served from the participant entry written when the ranking was last updated
+    plus the summary sidecars of the listed runs; runs without sidecars are
+    reported as pending. The rank is the one the participant had in the
+    snapshot that last updated the entry
+    """
+    try:
+        if not participant_id or not PARTICIPANT_ID_PATTERN.match(participant_id):
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                },
+                'body': json.dumps({'error': 'participantId is not a valid participant ID'})
+            }
+        
+        entry = read_participant_entry(participant_id)
+        if entry is None or not entry['runs']:
+            return {
+                'statusCode': 404,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                },
+                'body': json.dumps({'error': f"Participant {participant_id} has no evaluation runs"})
+            }
+        
+        # The entry lists every part ETag of every run, so it changes whenever the body does
+        etag = leaderboard_etag(entry['snapshotVersion'], {'participant': participant_id, 'entry': entry['etag']})
+        for candidate in [etag] + [encoded_etag(etag, encoding) for encoding in SUPPORTED_ENCODINGS]:
+            if etag_matches(get_header(headers, 'If-None-Match'), candidate):
+                return {
+                    'statusCode': 304,
+                    'headers': leaderboard_cache_headers(candidate),
+                    'body': ''
+                }
+        
+        runs = entry['runs']
+        with ThreadPoolExecutor(max_workers=max(1, min(FETCH_CONCURRENCY, len(runs)))) as executor:
+            summaries = list(executor.map(
+                lambda run: summarize_run_from_sidecars(run) if run['complete'] else None,
+                runs
+            ))
+        
+        history = []
+        for run, summary in zip(runs, summaries):
+            if summary is None:
+                # A complete run without sidecars has not been summarized yet
+                history.append({'timestamp': run['timestamp'], 'status': 'PENDING' if run['complete'] else 'IN_PROGRESS'})
+                continue
+            history.append({
+                'timestamp': run['timestamp'],
+                'status': 'COMPLETED',
+                'totalScore': summary['totalScore'],
+                'metricScores': summary['metricScores'],
+                'evaluationCount': summary['evaluationCount']
+            })
+        
+        # The newest complete run is the one the ranking converges to
+        latest = next((summary for summary in summaries if summary is not None), None)
+        detail = {
+            'participantId': participant_id,
+            'modelName': participant_id,
+            'rank': entry['rank'],
+            'participantCount': entry['participantCount'],
+            'rankedTimestamp': entry['rankKey'][1] if entry['rankKey'] else None,
+            'runs': history,
+            'generatedAt': entry['generatedAt']
+        }
+        if latest is None and entry['ranked'] is not None:
+            # Sidecars of the ranked run are unreadable; its stored entry still has the scores
+            latest = {field: value for field, value in entry['ranked'].items() if field not in ('participantId', 'modelName', 'status')}
+        if latest is not None:
+            detail.update(latest)
+        
+        logger.info(f"Participant {participant_id} detail served with {len(history)} runs")
+        
+        response = {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                **leaderboard_cache_headers(etag)
+            },
+            'body': json.dumps(detail)
+        }
+        
+        return compress_response(response, get_header(headers, 'Accept-Encoding'))
+        
+    except Exception as e:
+        logger.error(f"Error getting participant {participant_id}: {str(e)}")
+        raise
+
+def ranking_key(participant: Dict[str, Any], score_field: str = 'totalScore') -> tuple:
+    """
+    Leaderboard sort key with tiebreaker logic:
+    1. Primary: Higher total score (or the view's score) wins
+    2. Tiebreaker: Earlier timestamp wins (first to achieve the score)
+    3. Final fallback: Alphabetical by participant ID
+    """
+    return (
+        -participant[score_field],     # Negative for descending order (higher scores first)
+        participant['timestamp'],      # Ascending order (earlier timestamps first)
+        participant['participantId']   # Alphabetical order as final fallback
+    )
+
+def select_rankings(
+    rankings: List[Dict[str, Any]],
+    limit: int,
+    after_key: Optional[tuple] = None,
+    score_field: str = 'totalScore'
+):
+    """
+    Return one page of an already ranked list and the cursor for the next page
+    The page start is found by binary search, so deep pages cost O(log n + limit).
+    Ranks are positions in the list, so incremental updates never renumber entries.
+    """
+    key = lambda participant: ranking_key(participant, score_field)
+    start = bisect.bisect_right(rankings, after_key, key=key) if after_key is not None else 0
+    page = [dict(participant, rank=start + i + 1) for i, participant in enumerate(rankings[start:start + limit])]
+    next_cursor = encode_cursor(page[-1], score_field) if page and start + limit < len(rankings) else None
+    return page, next_cursor
+
+def encode_cursor(participant: Dict[str, Any], score_field: str = 'totalScore') -> str:
+    """Opaque cursor pointing just after a participant in ranking order"""
+    position = [participant[score_field], participant['timestamp'], participant['participantId']]
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by encode_cursor back into a ranking key"""
     try:
-        # List all participant directories in S3
-        response = s3_client.list_objects_v2(
+        padded = cursor + '=' * (-len(cursor) % 4)
+        score, timestamp, participant_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (-float(score), int(timestamp), str(participant_id))
+    except Exception:
+        raise ValueError('after is not a valid leaderboard cursor')
+
+def leaderboard_etag(version: int, query_params: Dict[str, str]) -> str:
+    """Strong ETag derived from the snapshot version and the query that shapes the body"""
+    query_digest = hashlib.sha256(json.dumps(query_params, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return f'"{version}-{query_digest}"'
+
+def leaderboard_cache_headers(etag: str) -> Dict[str, str]:
+    """Caching headers shared by 200 and 304 leaderboard responses"""
+    return {
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': 'ETag',
+        'Cache-Control': f'public, max-age={LEADERBOARD_MAX_AGE}, stale-while-revalidate={LEADERBOARD_STALE_WHILE_REVALIDATE}',
+        'ETag': etag,
+        'Vary': 'Accept-Encoding'
+    }
+
+# Supported content codings in order of preference
+SUPPORTED_ENCODINGS = ['gzip', 'deflate']
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the preferred supported content coding allowed by an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+    
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    
+    best_encoding, best_quality = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the compressed representation of a response"""
+    return f'{etag[:-1]}-{encoding}"'
+
+def compress_response(response: Dict[str, Any], accept_encoding: Optional[str]) -> Dict[str, Any]:
+    """Compress a JSON API Gateway proxy response when the client accepts it"""
+    body = response['body'].encode('utf-8')
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return response
+    
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return response
+    
+    if encoding == 'gzip':
+        # mtime=0 keeps the compressed bytes (and so the ETag) deterministic
+        compressed = gzip.compress(body, compresslevel=6, mtime=0)
+    else:
+        compressed = zlib.compress(body, 6)
+    
+    response['headers']['Content-Encoding'] = encoding
+    if 'ETag' in response['headers']:
+        response['headers']['ETag'] = encoded_etag(response['headers']['ETag'], encoding)
+    response['body'] = base64.b64encode(compressed).decode('ascii')
+    response['isBase64Encoded'] = True
+    return response
+
+def get_header(headers: Optional[Dict[str, str]], name: str) -> Optional[str]:
+    """Look up a request header case-insensitively"""
+    for header_name, value in (headers or {}).items():
+        if header_name.lower() == name.lower():
+            return value
+    return None
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against the current ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def is_s3_event(event: Dict[str, Any]) -> bool:
+    """Check whether the event is an S3 event notification"""
+    records = event.get('Records') or []
+    return bool(records) and records[0].get('eventSource') == 'aws:s3'
+
+def handle_evaluation_output_event(event: Dict[str, Any], context=None) -> Dict[str, Any]:
+    """
+    Merge the runs that new evaluation outputs belong to into the ranking
+    Only the affected participants' runs are listed and only the new runs
+    summarized (other parts of a run come from their summary sidecars), then
+    their participant entries are rewritten; the snapshot is rebuilt from
+    scratch only when none has been published yet
+    """
+    try:
+        keys = [unquote_plus(record['s3']['object']['key']) for record in event['Records']]
+        logger.info(f"New evaluation outputs landed: {keys}")
+        
+        # Newest run per participant among the new outputs
+        run_dirs = {}
+        for key in keys:
+            match = RUN_DIR_PATTERN.match(key)
+            if not match:
+                logger.warning(f"Ignoring output outside a run directory: {key}")
+                continue
+            participant_id, timestamp = match.group(2), int(match.group(3))
+            if participant_id not in run_dirs or timestamp > run_dirs[participant_id][1]:
+                run_dirs[participant_id] = (match.group(1), timestamp)
+        
+        if read_snapshot_pointer() is None:
+            snapshot = rebuild_snapshot()
+            return {'version': snapshot['version'], 'count': snapshot['count'], 'updated': snapshot['count']}
+        
+        entries = {}
+        run_lists = {}
+        for participant_id, (run_dir, timestamp) in run_dirs.items():
+            # Only this participant's runs are listed, for the run history of its entry
+            runs = list_evaluation_runs(f"evaluation-results/{participant_id}/")
+            run_lists.update(participant_run_lists(runs))
+            run = runs.get((participant_id, timestamp))
+            if run is None or not evaluation_run_complete(run):
+                # Shards or Bedrock output still missing; the ranked run stays
+                logger.info(f"Run {run_dir} is not complete yet")
+                continue
+            entry = process_participant_result(participant_id, evaluation_run_result(timestamp, run))
+            if entry is not None:
+                entries[participant_id] = entry
+        
+        snapshot = apply_ranking_updates(entries)
+        write_participant_entries(snapshot, run_lists)
+        
+        return {
+            'version': snapshot['version'],
+            'count': snapshot['count'],
+            'updated': len(entries)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error handling evaluation output event: {str(e)}")
+        raise
+
+def apply_ranking_updates(entries: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge participant entries into the published snapshot and publish the result
+    Moving an entry in the ranking and view indexes is O(log n), but every call
+    deserializes the main index and each view index and rewrites the whole
+    snapshot, so an update costs O(n log n) per index. Entries that leave the
+    snapshot unchanged publish nothing. The pointer swap is conditional on the
+    snapshot the update was based on, so concurrent updates are retried on top
+    of each other instead of being lost.
+    """
+    for attempt in range(SNAPSHOT_POINTER_MAX_ATTEMPTS):
+        pointer = read_snapshot_pointer()
+        snapshot = load_snapshot(pointer) if pointer is not None else None
+        if snapshot is None:
+            return rebuild_snapshot()
+        
+        # Deserialized per attempt: the memoized index must not see unpublished changes
+        ranked = {participant['participantId']: participant for participant in snapshot['rankings']}
+        index = ranking_index_from_snapshot(snapshot)
+        views = view_indexes_from_snapshot(snapshot)
+        changed = False
+        for participant_id, entry in entries.items():
+            current = index.get(participant_id)
+            if current is not None and current[1] > entry['timestamp']:
+                logger.info(f"A newer run of {participant_id} is already ranked, ignoring run {entry['timestamp']}")
+                continue
+            previous = ranked.get(participant_id)
+            moved = index.insert(participant_id, entry['totalScore'], entry['timestamp'])
+            if not moved and previous is not None and without_rank(previous) == without_rank(entry):
+                # Duplicate event, or a rerun with identical results
+                continue
+            
+            scores = view_scores(entry)
+            for key in set(view_scores(previous) if previous else ()) - set(scores):
+                views[key].remove(participant_id)
+            for key, score in scores.items():
+                views.setdefault(key, RankingIndex()).insert(participant_id, score, entry['timestamp'])
+            
+            ranked[participant_id] = entry
+            changed = True
+        
+        if not changed:
+            return snapshot
+        
+        version = max(int(time.time() * 1000), snapshot['version'] + 1)
+        rankings = [ranked[participant_id] for participant_id in index]
+        updated = {
+            'version': version,
+            'generatedAt': int(time.time()),
+            'rankings': rankings,
+            'count': len(rankings),
+            'index': index.serialize(),
+            'views': {key: view.serialize() for key, view in views.items() if len(view)}
+        }
+        snapshot_key = f"{SNAPSHOT_VERSIONS_PREFIX}snapshot-{version}.json"
+        s3_client.put_object(
             Bucket=EVALUATION_OUTPUT_BUCKET,
-            Prefix='evaluation-results/',
-            Delimiter='/'
+            Key=snapshot_key,
+            Body=json.dumps(updated).encode('utf-8'),
+            ContentType='application/json'
         )
+        if swap_snapshot_pointer(version, snapshot_key, expected=pointer):
+            _snapshot_memo['snapshot'] = updated
+            _snapshot_memo['index'] = (version, index)
+            logger.info(f"Merged {len(entries)} participants into leaderboard snapshot {version}")
+            return updated
         
-        participants = []
+        logger.info(f"Snapshot changed during the update (attempt {attempt + 1}), reapplying")
+    
+    raise RuntimeError(f"Could not apply ranking updates after {SNAPSHOT_POINTER_MAX_ATTEMPTS} attempts")
+
+def without_rank(participant: Dict[str, Any]) -> Dict[str, Any]:
+    """A leaderboard entry without its (position-dependent) rank"""
+    return {field: value for field, value in participant.items() if field != 'rank'}
+
+def ranking_index_from_snapshot(snapshot: Dict[str, Any]) -> RankingIndex:
+    """Deserialize a snapshot's ranking index (built from its rankings for older snapshots)"""
+    if isinstance(snapshot.get('index'), list):
+        return RankingIndex.deserialize(snapshot['index'])
+    return RankingIndex.from_rankings(snapshot['rankings'])
+
+def snapshot_ranking_index(snapshot: Dict[str, Any]) -> RankingIndex:
+    """Read-only ranking index of a snapshot, deserialized once per version in a warm container"""
+    cached = _snapshot_memo.get('index')
+    if cached is not None and cached[0] == snapshot['version']:
+        return cached[1]
+    
+    index = ranking_index_from_snapshot(snapshot)
+    _snapshot_memo['index'] = (snapshot['version'], index)
+    return index
+
+def view_key(sort_by: str, category: Optional[str]) -> str:
+    """Key of an alternate leaderboard view in the snapshot"""
+    return f"{sort_by}|{category or ''}"
+
+def view_scores(participant: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Score of a leaderboard entry in every alternate view it belongs to
+    A category's totalScore is the average of the entry's metric averages in
+    that category, like the overall totalScore
+    """
+    scores = {view_key(metric_name, None): score for metric_name, score in participant['metricScores'].items()}
+    for category, metric_scores in (participant.get('categoryScores') or {}).items():
+        if metric_scores:
+            scores[view_key(DEFAULT_SORT_BY, category)] = sum(metric_scores.values()) / len(metric_scores)
+        for metric_name, score in metric_scores.items():
+            scores[view_key(metric_name, category)] = score
+    return scores
+
+def build_view_indexes(rankings: List[Dict[str, Any]]) -> Dict[str, RankingIndex]:
+    """Ranking index of every alternate view, built from leaderboard entries"""
+    views = {}
+    for participant in rankings:
+        for key, score in view_scores(participant).items():
+            views.setdefault(key, RankingIndex()).insert(participant['participantId'], score, participant['timestamp'])
+    return views
+
+def view_indexes_from_snapshot(snapshot: Dict[str, Any]) -> Dict[str, RankingIndex]:
+    """Deserialize a snapshot's view indexes (built from its rankings for older snapshots)"""
+    if 'views' not in snapshot:
+        return build_view_indexes(snapshot['rankings'])
+    return {key: RankingIndex.deserialize(entries) for key, entries in snapshot['views'].items()}
+
+def snapshot_view(snapshot: Dict[str, Any], key: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Entries of an alternate view in rank order, each with its view score as
+    'score', or None if no participant has that score
+    Each view is materialized once per snapshot version in a warm container
+    """
+    memo = _snapshot_memo.get('views')
+    if memo is None or memo['version'] != snapshot['version']:
+        views = snapshot.get('views')
+        if views is None:
+            views = {view: index.serialize() for view, index in build_view_indexes(snapshot['rankings']).items()}
+        memo = {'version': snapshot['version'], 'views': views, 'materialized': {}}
+        _snapshot_memo['views'] = memo
+    
+    if key not in memo['views']:
+        return None
+    if key not in memo['materialized']:
+        ranked = {participant['participantId']: participant for participant in snapshot['rankings']}
+        memo['materialized'][key] = [
+            dict(ranked[participant_id], score=score)
+            for score, _, participant_id in memo['views'][key]
+        ]
+    return memo['materialized'][key]
+
+def rank_participants(participants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort participants into leaderboard order and assign rank numbers"""
+    sorted_participants = sorted(participants, key=ranking_key)
+    
+    for i, participant in enumerate(sorted_participants):
+        participant['rank'] = i + 1
+    
+    return sorted_participants
+
+def rebuild_snapshot() -> Dict[str, Any]:
+    """Rebuild the leaderboard snapshot from S3 evaluation results and publish it"""
+    try:
+        # Versions are millisecond timestamps taken before the scan starts, so a
+        # slower rebuild that started earlier can never replace a newer one
+        version = int(time.time() * 1000)
         
-        # Extract participant IDs from S3 prefixes and process each one
-        for prefix_info in response.get('CommonPrefixes', []):
-            prefix = prefix_info['Prefix']
-            # Extract participant ID from path like 'evaluation-results/participant-001/'
-            match = re.search(r'evaluation-results/([^/]+)/', prefix)
-            if match:
-                participant_id = match.group(1)
-                logger.info(f"Processing results for participant: {participant_id}")
-                
-                try:
-                    # Find the latest evaluation results
-                    latest_result_key = find_latest_evaluation_result(participant_id)
-                    if not latest_result_key:
-                        logger.warning(f"No evaluation results found for participant: {participant_id}")
-                        continue
-                    
-                    # Download and parse the JSONL file
-                    evaluation_data = download_and_parse_evaluation_results(latest_result_key)
-                    if not evaluation_data:
-                        logger.warning(f"No evaluation data found in {latest_result_key}")
-                        continue
-                    
-                    # Extract timestamp from the S3 key
-                    job_timestamp = None
-                    timestamp_match = re.search(r'llm-judge-[^/]+-(\d{10,})', latest_result_key)
-                    if timestamp_match:
-                        job_timestamp = int(timestamp_match.group(1))
-                    
-                    # Calculate metric summaries
-                    metric_summary = calculate_metric_summary(evaluation_data, job_timestamp)
-                    
-                    logger.info(f"Successfully processed participant {participant_id} - Total Score: {metric_summary['totalScore']:.3f}")
-                    
-                    participants.append({
-                        'participantId': participant_id,
-                        'modelName': participant_id,  # Use participant ID as model name
-                        'totalScore': metric_summary['totalScore'],
-                        'metricScores': metric_summary['metricScores'],
-                        'evaluationCount': metric_summary['evaluationCount'],
-                        'timestamp': metric_summary['timestamp'],
-                        'status': 'COMPLETED'
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"Error processing participant {participant_id}: {str(e)}")
-                    continue
+        runs = list_evaluation_runs('evaluation-results/')
+        participants = process_all_participant_results(runs)
+        rankings = rank_participants(participants)
         
-        return participants
+        snapshot = {
+            'version': version,
+            'generatedAt': int(time.time()),
+            'rankings': rankings,
+            'count': len(rankings),
+            'index': RankingIndex.from_rankings(rankings).serialize(),
+            'views': {key: view.serialize() for key, view in build_view_indexes(rankings).items()}
+        }
+        
+        if publish_snapshot(snapshot):
+            _snapshot_memo['snapshot'] = snapshot
+            write_participant_entries(snapshot, participant_run_lists(runs))
+        
+        logger.info(f"Rebuilt leaderboard snapshot {version} with {len(rankings)} participants")
+        return snapshot
         
     except Exception as e:
-        logger.error(f"Error processing all participant results: {str(e)}")
+        logger.error(f"Error rebuilding leaderboard snapshot: {str(e)}")
         raise
 
+def publish_snapshot(snapshot: Dict[str, Any]) -> bool:
+    """Write an immutable snapshot object and atomically point readers at it"""
+    try:
+        version = snapshot['version']
+        snapshot_key = f"{SNAPSHOT_VERSIONS_PREFIX}snapshot-{version}.json"
+        
+        s3_client.put_object(
+            Bucket=EVALUATION_OUTPUT_BUCKET,
+            Key=snapshot_key,
+            Body=json.dumps(snapshot).encode('utf-8'),
+            ContentType='application/json'
+        )
+        
+        return swap_snapshot_pointer(version, snapshot_key)
+        
+    except Exception as e:
+        logger.error(f"Error publishing leaderboard snapshot: {str(e)}")
+        raise
 
+def swap_snapshot_pointer(version: int, snapshot_key: str, expected: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Compare-and-swap the snapshot pointer using S3 conditional writes
+    With expected, only that exact pointer is replaced (a single attempt)
+    """
+    max_attempts = 1 if expected else SNAPSHOT_POINTER_MAX_ATTEMPTS
+    for attempt in range(max_attempts):
+        current = expected or read_snapshot_pointer()
+        if current and current['version'] >= version:
+            logger.info(f"Snapshot {current['version']} is already newer than {version}, not swapping pointer")
+            return False
+        
+        # Only replace the exact pointer we read; create it only if still absent
+        condition = {'IfMatch': current['etag']} if current else {'IfNoneMatch': '*'}
+        
+        try:
+            s3_client.put_object(
+                Bucket=EVALUATION_OUTPUT_BUCKET,
+                Key=SNAPSHOT_POINTER_KEY,
+                Body=json.dumps({'version': version, 'key': snapshot_key}).encode('utf-8'),
+                ContentType='application/json',
+                **condition
+            )
+            logger.info(f"Snapshot pointer now references version {version}")
+            return True
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code')
+            if error_code in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                logger.info(f"Snapshot pointer changed concurrently (attempt {attempt + 1}), retrying")
+                continue
+            raise
+    
+    logger.warning(f"Gave up swapping snapshot pointer to version {version} after {max_attempts} attempts")
+    return False
 
-def find_latest_evaluation_result(participant_id: str) -> Optional[str]:
-    """Find the latest evaluation result file for a participant"""
+def read_snapshot_pointer() -> Optional[Dict[str, Any]]:
+    """Read the pointer to the current snapshot, or None if none has been published"""
     try:
-        prefix = f'evaluation-results/{participant_id}/'
-        response = s3_client.list_objects_v2(
+        response = s3_client.get_object(
             Bucket=EVALUATION_OUTPUT_BUCKET,
-            Prefix=prefix
+            Key=SNAPSHOT_POINTER_KEY
         )
+        pointer = json.loads(response['Body'].read())
+        pointer['etag'] = response['ETag']
+        return pointer
         
-        if 'Contents' not in response:
-            logger.warning(f"No evaluation results found for participant: {participant_id}")
+    except s3_client.exceptions.NoSuchKey:
+        return None
+
+def load_snapshot(pointer: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Load the snapshot a pointer references, reusing the copy held by a warm container"""
+    try:
+        cached = _snapshot_memo.get('snapshot')
+        if cached is not None and cached['version'] == pointer['version']:
+            return cached
+        
+        try:
+            response = s3_client.get_object(
+                Bucket=EVALUATION_OUTPUT_BUCKET,
+                Key=pointer['key']
+            )
+        except s3_client.exceptions.NoSuchKey:
+            logger.warning(f"Snapshot pointer references missing object {pointer['key']}")
             return None
         
-        # Find JSONL output files and sort by timestamp
-        jsonl_files = []
-        for obj in response['Contents']:
-            key = obj['Key']
-            if key.endswith('_output.jsonl'):
-                # Extract timestamp from job name: llm-judge-participant-XXX-TIMESTAMP
+        snapshot = json.loads(response['Body'].read())
+        _snapshot_memo['snapshot'] = snapshot
+        return snapshot
+        
+    except Exception as e:
+        logger.error(f"Error loading leaderboard snapshot: {str(e)}")
+        raise
+
+# Most recently loaded snapshot; versioned snapshot objects are immutable
+_snapshot_memo = {}
+
+def participant_entry_key(participant_id: str) -> str:
+    """S3 key of a participant's entry"""
+    return f"{PARTICIPANT_ENTRY_PREFIX}{participant_id}.json"
+
+def read_participant_entry(participant_id: str) -> Optional[Dict[str, Any]]:
+    """Read a participant's entry with its ETag, or None if none has been written"""
+    try:
+        response = s3_client.get_object(
+            Bucket=EVALUATION_OUTPUT_BUCKET,
+            Key=participant_entry_key(participant_id)
+        )
+        entry = json.loads(response['Body'].read())
+        entry['etag'] = response['ETag']
+        return entry
+        
+    except s3_client.exceptions.NoSuchKey:
+        return None
+
+def participant_run_lists(runs: Dict[tuple, Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Newest PARTICIPANT_RUN_HISTORY_LIMIT runs of every listed participant,
+    with the key and ETag of each output part, as stored in participant entries
+    """
+    run_lists = {}
+    for (participant_id, timestamp), run in sorted(runs.items(), key=lambda item: item[0][1], reverse=True):
+        run_list = run_lists.setdefault(participant_id, [])
+        if len(run_list) >= PARTICIPANT_RUN_HISTORY_LIMIT:
+            continue
+        parts = sorted(run['parts'] + list(run['shardParts'].values()), key=lambda part: part['key'])
+        run_list.append({
+            'timestamp': timestamp,
+            'complete': evaluation_run_complete(run),
+            'parts': [{'key': part['key'], 'etag': part['etag']} for part in parts]
+        })
+    return run_lists
+
+def write_participant_entries(snapshot: Dict[str, Any], run_lists: Dict[str, List[Dict[str, Any]]]):
+    """Write the entries of the given participants with their position in a published snapshot"""
+    if not run_lists:
+        return
+    
+    index = snapshot_ranking_index(snapshot)
+    ranked = {participant['participantId']: participant for participant in snapshot['rankings'] if participant['participantId'] in run_lists}
+    
+    def write(item):
+        participant_id, runs = item
+        rank_key = index.get(participant_id)
+        write_participant_entry({
+            'participantId': participant_id,
+            'rankKey': list(rank_key) if rank_key else None,
+            'rank': index.rank_of(participant_id),
+            'participantCount': len(index),
+            'snapshotVersion': snapshot['version'],
+            'generatedAt': snapshot['generatedAt'],
+            'ranked': without_rank(ranked[participant_id]) if participant_id in ranked else None,
+            'runs': runs
+        })
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(FETCH_CONCURRENCY, len(run_lists)))) as executor:
+        list(executor.map(write, run_lists.items()))
+
+def write_participant_entry(entry: Dict[str, Any]) -> bool:
+    """
+    Replace a participant's entry unless it was written from a newer snapshot
+    Conditional on the entry that was read, so concurrent updates cannot go back in time
+    """
+    participant_id = entry['participantId']
+    for attempt in range(SNAPSHOT_POINTER_MAX_ATTEMPTS):
+        current = read_participant_entry(participant_id)
+        if current and current['snapshotVersion'] > entry['snapshotVersion']:
+            logger.info(f"Entry of {participant_id} is already from snapshot {current['snapshotVersion']}, not replacing it")
+            return False
+        
+        condition = {'IfMatch': current['etag']} if current else {'IfNoneMatch': '*'}
+        try:
+            s3_client.put_object(
+                Bucket=EVALUATION_OUTPUT_BUCKET,
+                Key=participant_entry_key(participant_id),
+                Body=json.dumps(entry).encode('utf-8'),
+                ContentType='application/json',
+                **condition
+            )
+            return True
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code')
+            if error_code in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                logger.info(f"Entry of {participant_id} changed concurrently (attempt {attempt + 1}), retrying")
+                continue
+            raise
+    
+    logger.warning(f"Gave up writing the entry of {participant_id} after {SNAPSHOT_POINTER_MAX_ATTEMPTS} attempts")
+    return False
+
+class SummaryCache:
+    """
+    LRU cache of metric summaries keyed by S3 key and ETag
+    Lives at module level so warm Lambda containers skip unchanged outputs
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, s3_key: str, etag: Optional[str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            summary = self._entries.get((s3_key, etag)) if etag else None
+            if summary is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((s3_key, etag))
+            self.hits += 1
+            return summary
+    
+    def put(self, s3_key: str, etag: Optional[str], summary: Dict[str, Any]):
+        if not etag or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[(s3_key, etag)] = summary
+            self._entries.move_to_end((s3_key, etag))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+summary_cache = SummaryCache(SUMMARY_CACHE_MAX_ENTRIES)
+
+class InflightByteBudget:
+    """Caps the total size of evaluation outputs being downloaded at the same time"""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._condition = threading.Condition()
+    
+    @contextmanager
+    def reserve(self, nbytes: int):
+        with self._condition:
+            # An object larger than the whole budget is still admitted once
+            # nothing else is in flight, so it cannot block forever
+            while self.in_flight > 0 and self.in_flight + nbytes > self.max_bytes:
+                self._condition.wait()
+            self.in_flight += nbytes
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= nbytes
+                self._condition.notify_all()
+
+def process_all_participant_results(runs: Optional[Dict[tuple, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Process evaluation results for all participants directly from S3 (or from already listed runs)"""
+    try:
+        latest_results = list_latest_evaluation_results(runs=runs)
+        if not latest_results:
+            return []
+        
+        budget = InflightByteBudget(FETCH_MAX_INFLIGHT_BYTES)
+        max_workers = max(1, min(FETCH_CONCURRENCY, len(latest_results)))
+        logger.info(f"Processing {len(latest_results)} participants with {max_workers} workers")
+        
+        # executor.map yields results in submission order, so the output is
+        # identical to processing the participants one after another
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda item: process_participant_result(item[0], item[1], budget),
+                latest_results.items()
+            )
+            participants = [result for result in results if result]
+        
+        logger.info(f"Summary cache stats: {summary_cache.stats()}")
+        return participants
+        
+    except Exception as e:
+        logger.error(f"Error processing all participant results: {str(e)}")
+        raise
+
+def list_latest_evaluation_results(
+    prefix: str = 'evaluation-results/',
+    runs: Optional[Dict[tuple, Dict[str, Any]]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Keep the newest complete evaluation run per participant under the prefix (or among the given runs)"""
+    try:
+        if runs is None:
+            runs = list_evaluation_runs(prefix)
+        
+        # Newest run first, so at most one shard manifest per participant is
+        # read beyond the run that ends up on the leaderboard
+        latest_results = {}
+        for (participant_id, timestamp), run in sorted(runs.items(), key=lambda item: item[0][1], reverse=True):
+            if participant_id in latest_results or not evaluation_run_complete(run):
+                continue
+            latest_results[participant_id] = evaluation_run_result(timestamp, run)
+        
+        logger.info(f"Found latest results for {len(latest_results)} participants")
+        return latest_results
+        
+    except Exception as e:
+        logger.error(f"Error listing evaluation results under {prefix}: {str(e)}")
+        raise
+
+def list_evaluation_runs(prefix: str) -> Dict[tuple, Dict[str, Any]]:
+    """
+    Walk every object under the prefix once (following continuation tokens)
+    and group the output parts by (participant, run timestamp)
+    A run is complete once it has an _output.jsonl, or for a sharded run once
+    every shard in its manifest has one; parts served from the judge cache
+    (_cached.jsonl) are merged into the run they belong to
+    """
+    try:
+        paginator = s3_client.get_paginator('list_objects_v2')
+        runs = {}
+        page_count = 0
+        
+        for page in paginator.paginate(Bucket=EVALUATION_OUTPUT_BUCKET, Prefix=prefix):
+            page_count += 1
+            for obj in page.get('Contents', []):
+                key = obj['Key']
+                if not key.endswith(('_output.jsonl', CACHED_PART_SUFFIX, f'/{SHARD_MANIFEST_NAME}')):
+                    continue
+                
+                # Keys look like evaluation-results/<participant>/llm-judge-<participant>-<timestamp>/..._output.jsonl
+                participant_match = re.match(r'evaluation-results/([^/]+)/', key)
                 timestamp_match = re.search(r'llm-judge-[^/]+-(\d{10,})', key)
-                if timestamp_match:
-                    timestamp = int(timestamp_match.group(1))
-                    jsonl_files.append((timestamp, key))
+                if not participant_match or not timestamp_match:
+                    continue
+                
+                run = runs.setdefault(
+                    (participant_match.group(1), int(timestamp_match.group(1))),
+                    {'parts': [], 'shardParts': {}, 'complete': False, 'manifest': None}
+                )
+                part = {
+                    'key': key,
+                    'etag': obj.get('ETag'),
+                    'size': obj.get('Size', 0)
+                }
+                if key.endswith(SHARD_MANIFEST_NAME):
+                    run['manifest'] = part
+                    continue
+                
+                # A resubmitted shard writes into the same shard directory; the
+                # newest job's output (higher job timestamp) wins
+                shard_match = SHARD_OUTPUT_PATTERN.search(key)
+                if shard_match and key.endswith('_output.jsonl'):
+                    shard_index = int(shard_match.group(1))
+                    current = run['shardParts'].get(shard_index)
+                    if current is None or key > current['key']:
+                        run['shardParts'][shard_index] = part
+                    continue
+                
+                run['parts'].append(part)
+                if key.endswith('_output.jsonl'):
+                    run['complete'] = True
+        
+        logger.info(f"Listed {len(runs)} evaluation runs under {prefix} in {page_count} listing pages")
+        return runs
         
-        if not jsonl_files:
-            logger.warning(f"No JSONL output files found for participant {participant_id}")
+    except Exception as e:
+        logger.error(f"Error listing evaluation runs under {prefix}: {str(e)}")
+        raise
+
+def evaluation_run_result(timestamp: int, run: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe a complete run by its newest output key and the ETags of all its parts"""
+    parts = sorted(run['parts'] + list(run['shardParts'].values()), key=lambda part: part['key'])
+    return {
+        'key': max(part['key'] for part in parts if part['key'].endswith('_output.jsonl')),
+        'timestamp': timestamp,
+        # Changes whenever any part of the run changes
+        'etag': ','.join(part['etag'] or '' for part in parts),
+        'size': sum(part['size'] for part in parts),
+        'parts': parts
+    }
+
+def evaluation_run_complete(run: Dict[str, Any]) -> bool:
+    """Whether a listed run has all of its output (every shard, for a sharded run)"""
+    if run['manifest'] is None:
+        return run['complete']
+    
+    manifest = load_shard_manifest(run['manifest']['key'], run['manifest']['etag'])
+    if manifest is None:
+        return False
+    return all(index in run['shardParts'] for index in range(manifest['shardCount']))
+
+# Shard manifests never change once written, so warm containers keep them
+_shard_manifests = {}
+
+def load_shard_manifest(s3_key: str, etag: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Read a sharded run's manifest, or None if it cannot be read"""
+    cached = _shard_manifests.get(s3_key)
+    if cached is not None and cached[0] == etag:
+        return cached[1]
+    
+    try:
+        response = s3_client.get_object(Bucket=EVALUATION_OUTPUT_BUCKET, Key=s3_key)
+        manifest = json.loads(response['Body'].read())
+        _shard_manifests[s3_key] = (etag, manifest)
+        return manifest
+    except Exception as e:
+        if is_throttling_error(e):
+            raise
+        # An unreadable manifest makes the run incomplete; the previous run stays ranked
+        logger.warning(f"Failed to read shard manifest {s3_key}: {str(e)}")
+        return None
+
+def process_participant_result(
+    participant_id: str,
+    latest_result: Dict[str, Any],
+    budget: Optional[InflightByteBudget] = None
+) -> Optional[Dict[str, Any]]:
+    """Summarize one participant's latest evaluation results, or None if unavailable"""
+    logger.info(f"Processing results for participant: {participant_id}")
+    
+    try:
+        metric_summary = summarize_run_result(latest_result, budget)
+        if metric_summary is None:
             return None
         
-        # Return the latest file
-        jsonl_files.sort(reverse=True)
-        latest_key = jsonl_files[0][1]
-        logger.info(f"Found latest evaluation result for {participant_id}: {latest_key}")
-        return latest_key
+        logger.info(f"Successfully processed participant {participant_id} - Total Score: {metric_summary['totalScore']:.3f}")
+        
+        return {
+            'participantId': participant_id,
+            'modelName': participant_id,  # Use participant ID as model name
+            'totalScore': metric_summary['totalScore'],
+            'metricScores': metric_summary['metricScores'],
+            'categoryScores': metric_summary['categoryScores'],
+            'evaluationCount': metric_summary['evaluationCount'],
+            'timestamp': metric_summary['timestamp'],
+            'status': 'COMPLETED'
+        }
         
     except Exception as e:
-        logger.error(f"Error finding latest evaluation result for {participant_id}: {str(e)}")
-        raise
+        # A saturated S3 would drop many participants at once, so fail the
+        # rebuild instead of publishing a partial leaderboard
+        if is_throttling_error(e):
+            raise
+        # A failing participant is skipped so it cannot take down the others
+        logger.error(f"Error processing participant {participant_id}: {str(e)}")
+        return None
+
+def summarize_run_result(run_result: Dict[str, Any], budget: Optional[InflightByteBudget] = None) -> Optional[Dict[str, Any]]:
+    """Metric summary of a listed run, or None if it holds no evaluation records"""
+    run_key = run_result['key']
+    
+    # Outputs are only re-downloaded when their ETag changed since the last listing
+    metric_summary = summary_cache.get(run_key, run_result.get('etag'))
+    if metric_summary is None:
+        metric_summary = summarize_evaluation_run(run_result['parts'], run_result['timestamp'], budget)
+        if metric_summary is None:
+            logger.warning(f"No evaluation data found in {run_key}")
+            return None
+        
+        summary_cache.put(run_key, run_result.get('etag'), metric_summary)
+    
+    return metric_summary
 
-def download_and_parse_evaluation_results(s3_key: str) -> List[Dict[str, Any]]:
-    """Download and parse JSONL evaluation results from S3"""
+def iter_evaluation_records(s3_key: str, budget: Optional[InflightByteBudget] = None) -> Iterator[Dict[str, Any]]:
+    """Stream JSONL evaluation results from S3 one record at a time"""
     try:
         response = s3_client.get_object(
             Bucket=EVALUATION_OUTPUT_BUCKET,
             Key=s3_key
         )
+        body = response['Body']
         
-        content = response['Body'].read().decode('utf-8')
-        
-        # Parse JSONL format (one JSON object per line)
-        evaluation_records = []
-        for line in content.strip().split('\n'):
-            if line.strip():
-                try:
-                    record = json.loads(line)
-                    evaluation_records.append(record)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse JSON line: {line[:100]}... Error: {str(e)}")
-                    continue
+        budget = budget or InflightByteBudget(FETCH_MAX_INFLIGHT_BYTES)
+        with budget.reserve(response.get('ContentLength', 0)):
+            record_count = 0
+            try:
+                # Parse JSONL format (one JSON object per line) straight from the
+                # byte stream, without materializing the body or a list of records
+                for line in body.iter_lines(chunk_size=STREAM_CHUNK_SIZE):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Failed to parse JSON line: {line[:100]!r}... Error: {str(e)}")
+                        continue
+                    record_count += 1
+                    yield record
+            finally:
+                body.close()
         
-        logger.info(f"Parsed {len(evaluation_records)} evaluation records from {s3_key}")
-        return evaluation_records
+        logger.info(f"Parsed {record_count} evaluation records from {s3_key}")
         
     except Exception as e:
         logger.error(f"Error downloading/parsing evaluation results from {s3_key}: {str(e)}")
         raise
 
-def calculate_metric_summary(evaluation_data: List[Dict[str, Any]], job_timestamp: Optional[int] = None) -> Dict[str, Any]:
-    """Calculate metric summary from evaluation data"""
+def summarize_evaluation_run(
+    parts: List[Dict[str, Any]],
+    job_timestamp: Optional[int] = None,
+    budget: Optional[InflightByteBudget] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Summarize all output parts of one evaluation run (Bedrock output plus
+    any records served from the judge cache)
+    Returns None when the run holds no evaluation records
+    """
+    accumulator = merge_accumulators([
+        accumulate_evaluation_output(part['key'], part.get('etag'), job_timestamp, budget)
+        for part in parts
+    ])
+    
+    if accumulator is None or not accumulator.record_count:
+        return None
+    
+    return summarize_accumulator(accumulator, job_timestamp)
+
+def accumulate_evaluation_output(
+    s3_key: str,
+    etag: Optional[str],
+    job_timestamp: Optional[int] = None,
+    budget: Optional[InflightByteBudget] = None
+) -> MetricAccumulator:
+    """Accumulate one output part, reusing its summary sidecar when it is still valid"""
     try:
-        metric_totals = defaultdict(list)
-        category_counts = defaultdict(int)
-        total_evaluations = len(evaluation_data)
-        
-        # Process each evaluation record
-        for record in evaluation_data:
-            automated_result = record.get('automatedEvaluationResult', {})
-            scores = automated_result.get('scores', [])
-            input_record = record.get('inputRecord', {})
-            category = input_record.get('category', 'unknown')
+        accumulator = load_summary_sidecar(s3_key, etag)
+        if accumulator is None:
+            # Stream the JSONL file into the accumulator
+            accumulator = MetricAccumulator()
+            for record in iter_evaluation_records(s3_key, budget):
+                accumulator.add_record(record)
             
-            category_counts[category] += 1
-            
-            # Extract metric scores
-            for score_info in scores:
-                metric_name = score_info.get('metricName', '')
-                result = score_info.get('result', 0.0)
-                
-                # Store score with category information
-                metric_totals[metric_name].append({
-                    'score': float(result),
-                    'category': category
-                })
-        
-        # Calculate metric averages
-        metric_scores = {}
-        
-        for metric_name, scores in metric_totals.items():
-            # Overall average for this metric
-            overall_avg = sum(s['score'] for s in scores) / len(scores) if scores else 0.0
-            metric_scores[metric_name] = overall_avg
-        
-        # Calculate total score (average of all metric averages)
-        total_score = sum(metric_scores.values()) / len(metric_scores) if metric_scores else 0.0
-        
-        # Use the job timestamp from S3 path if available, otherwise current time
-        timestamp = job_timestamp if job_timestamp else int(time.time())
-        
-        summary = {
-            'totalScore': total_score,
-            'metricScores': metric_scores,
-            'evaluationCount': total_evaluations,
-            'timestamp': timestamp
-        }
+            if accumulator.record_count:
+                write_summary_sidecar(s3_key, etag, accumulator, job_timestamp)
         
-        return summary
+        return accumulator
         
     except Exception as e:
-        logger.error(f"Error calculating metric summary: {str(e)}")
+        logger.error(f"Error calculating metric summary for {s3_key}: {str(e)}")
         raise
 
+def summary_sidecar_key(s3_key: str) -> str:
+    """S3 key of the summary sidecar stored next to an output part"""
+    return f"{s3_key[:-len('.jsonl')]}.summary.json"
+
+def load_summary_sidecar(s3_key: str, etag: Optional[str]) -> Optional[MetricAccumulator]:
+    """Load the accumulator from a sidecar that matches the output ETag and scoring version"""
+    if not etag:
+        return None
+    
+    sidecar_key = summary_sidecar_key(s3_key)
+    try:
+        response = s3_client.get_object(
+            Bucket=EVALUATION_OUTPUT_BUCKET,
+            Key=sidecar_key
+        )
+        sidecar = json.loads(response['Body'].read())
+    except s3_client.exceptions.NoSuchKey:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable summary sidecar {sidecar_key}: {str(e)}")
+        return None
+    
+    if sidecar.get('scoringVersion') != SCORING_VERSION or sidecar.get('sourceETag') != etag:
+        logger.info(f"Summary sidecar {sidecar_key} is stale, rebuilding it")
+        return None
+    
+    return MetricAccumulator.from_dict(sidecar['accumulator'])
+
+def summarize_run_from_sidecars(run: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Metric summary of a run from the summary sidecars of its parts only, or
+    None while any part has no valid sidecar (the raw output is never read)
+    """
+    accumulators = [load_summary_sidecar(part['key'], part['etag']) for part in run['parts']]
+    if not accumulators or any(accumulator is None for accumulator in accumulators):
+        return None
+    
+    accumulator = merge_accumulators(accumulators)
+    if not accumulator.record_count:
+        return None
+    return summarize_accumulator(accumulator, run['timestamp'])
+
+def write_summary_sidecar(s3_key: str, etag: Optional[str], accumulator: MetricAccumulator, job_timestamp: Optional[int] = None):
+    """Persist the summary of an immutable evaluation output so later reads skip the raw records"""
+    if not etag:
+        return
+    
+    sidecar_key = summary_sidecar_key(s3_key)
+    sidecar = {
+        'scoringVersion': SCORING_VERSION,
+        'sourceKey': s3_key,
+        'sourceETag': etag,
+        'summary': summarize_accumulator(accumulator, job_timestamp),
+        'accumulator': accumulator.to_dict()
+    }
+    
+    try:
+        s3_client.put_object(
+            Bucket=EVALUATION_OUTPUT_BUCKET,
+            Key=sidecar_key,
+            Body=json.dumps(sidecar).encode('utf-8'),
+            ContentType='application/json'
+        )
+        logger.info(f"Wrote summary sidecar {sidecar_key}")
+    except Exception as e:
+        # The sidecar is only an optimization; the summary is still returned
+        logger.warning(f"Failed to write summary sidecar {sidecar_key}: {str(e)}")
+
+def summarize_accumulator(accumulator: MetricAccumulator, job_timestamp: Optional[int] = None) -> Dict[str, Any]:
+    """Build the participant metric summary from an accumulator"""
+    # Total score is the average of all metric averages
+    total_score = accumulator.total_score()
+    
+    # Use the job timestamp from S3 path if available, otherwise current time
+    timestamp = job_timestamp if job_timestamp else int(time.time())
+    
+    summary = {
+        'totalScore': total_score,
+        'metricScores': accumulator.metric_means(),
+        'evaluationCount': accumulator.record_count,
+        'timestamp': timestamp,
+        'metricStandardErrors': accumulator.metric_standard_errors(),
+        'categoryCounts': dict(accumulator.category_counts),
+        'categoryScores': accumulator.category_means(),
+        'categoryStandardErrors': accumulator.category_standard_errors()
+    }
+    
+    return summary
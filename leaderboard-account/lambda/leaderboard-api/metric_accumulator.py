@@ -0,0 +1,139 @@
+import math
+from typing import Dict, Any, Optional, List
+
+class MetricAccumulator:
+    """
+    Constant-memory aggregate of Bedrock evaluation scores
+    Keeps a running count, sum and Welford mean/M2 per metric and per
+    (metric, category), so records are folded in one at a time and partial
+    aggregates (files, shards) can be merged without re-reading records
+    """
+
+    def __init__(self):
+        self.record_count = 0
+        self.category_counts = {}
+        # metric -> [count, sum, mean, m2]
+        self._metrics = {}
+        # (metric, category) -> [count, sum, mean, m2]
+        self._cells = {}
+
+    def add_record(self, record: Dict[str, Any]):
+        """Fold one Bedrock evaluation output record into the aggregate"""
+        automated_result = record.get('automatedEvaluationResult', {})
+        scores = automated_result.get('scores', [])
+        input_record = record.get('inputRecord', {})
+        category = input_record.get('category', 'unknown')
+
+        self.record_count += 1
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+
+        for score_info in scores:
+            metric_name = score_info.get('metricName', '')
+            result = score_info.get('result', 0.0)
+            self.add_score(metric_name, category, float(result))
+
+    def add_score(self, metric_name: str, category: str, score: float):
+        """Fold one metric score into the overall and per-category statistics"""
+        _update_cell(self._metrics.setdefault(metric_name, [0, 0.0, 0.0, 0.0]), score)
+        _update_cell(self._cells.setdefault((metric_name, category), [0, 0.0, 0.0, 0.0]), score)
+
+    def merge(self, other: 'MetricAccumulator') -> 'MetricAccumulator':
+        """Combine another accumulator into this one (Chan et al. parallel variance)"""
+        self.record_count += other.record_count
+        for category, count in other.category_counts.items():
+            self.category_counts[category] = self.category_counts.get(category, 0) + count
+        for metric_name, cell in other._metrics.items():
+            _merge_cell(self._metrics.setdefault(metric_name, [0, 0.0, 0.0, 0.0]), cell)
+        for key, cell in other._cells.items():
+            _merge_cell(self._cells.setdefault(key, [0, 0.0, 0.0, 0.0]), cell)
+        return self
+
+    def metric_means(self) -> Dict[str, float]:
+        """Overall mean score per metric"""
+        return {metric_name: cell[1] / cell[0] for metric_name, cell in self._metrics.items() if cell[0]}
+
+    def metric_standard_errors(self) -> Dict[str, float]:
+        """Standard error of the overall mean per metric"""
+        return {metric_name: _standard_error(cell) for metric_name, cell in self._metrics.items() if cell[0]}
+
+    def category_means(self) -> Dict[str, Dict[str, float]]:
+        """Mean score per category and metric"""
+        means = {}
+        for (metric_name, category), cell in self._cells.items():
+            if cell[0]:
+                means.setdefault(category, {})[metric_name] = cell[1] / cell[0]
+        return means
+
+    def category_standard_errors(self) -> Dict[str, Dict[str, float]]:
+        """Standard error of the mean per category and metric"""
+        errors = {}
+        for (metric_name, category), cell in self._cells.items():
+            if cell[0]:
+                errors.setdefault(category, {})[metric_name] = _standard_error(cell)
+        return errors
+
+    def total_score(self) -> float:
+        """Average of the overall metric means"""
+        metric_scores = self.metric_means()
+        return sum(metric_scores.values()) / len(metric_scores) if metric_scores else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-compatible dict"""
+        return {
+            'recordCount': self.record_count,
+            'categoryCounts': dict(self.category_counts),
+            'metrics': [[metric_name] + cell for metric_name, cell in self._metrics.items()],
+            'cells': [[metric_name, category] + cell for (metric_name, category), cell in self._cells.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MetricAccumulator':
+        """Rebuild an accumulator serialized with to_dict"""
+        accumulator = cls()
+        accumulator.record_count = data.get('recordCount', 0)
+        accumulator.category_counts = dict(data.get('categoryCounts', {}))
+        for metric_name, *cell in data.get('metrics', []):
+            accumulator._metrics[metric_name] = list(cell)
+        for metric_name, category, *cell in data.get('cells', []):
+            accumulator._cells[(metric_name, category)] = list(cell)
+        return accumulator
+
+def merge_accumulators(accumulators: List[MetricAccumulator]) -> Optional[MetricAccumulator]:
+    """Merge several accumulators into a new one, or None if there are none"""
+    if not accumulators:
+        return None
+    merged = MetricAccumulator()
+    for accumulator in accumulators:
+        merged.merge(accumulator)
+    return merged
+
+def _update_cell(cell: List[float], score: float):
+    # Welford's online update; the plain sum is kept as well so means are
+    # computed exactly as sum / count
+    count = cell[0] + 1
+    delta = score - cell[2]
+    mean = cell[2] + delta / count
+    cell[0] = count
+    cell[1] += score
+    cell[2] = mean
+    cell[3] += delta * (score - mean)
+
+def _merge_cell(cell: List[float], other: List[float]):
+    if not other[0]:
+        return
+    if not cell[0]:
+        cell[:] = other
+        return
+    count = cell[0] + other[0]
+    delta = other[2] - cell[2]
+    cell[3] += other[3] + delta * delta * cell[0] * other[0] / count
+    cell[2] += delta * other[0] / count
+    cell[1] += other[1]
+    cell[0] = count
+
+def _standard_error(cell: List[float]) -> float:
+    count = cell[0]
+    if count < 2:
+        return 0.0
+    variance = cell[3] / (count - 1)
+    return math.sqrt(variance / count)
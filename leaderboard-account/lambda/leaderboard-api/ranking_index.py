@@ -0,0 +1,176 @@
+import random
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+# Levels of the skiplist; 2^32 participants is far beyond any leaderboard
+MAX_LEVEL = 32
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key: Optional[tuple], level: int):
+        self.key = key
+        self.next = [None] * level
+        # Number of bottom-level steps each link skips
+        self.width = [1] * level
+
+class RankingIndex:
+    """
+    Order-statistics index of the leaderboard
+    Participants are kept in an indexable skiplist ordered by the ranking key
+    (-totalScore, timestamp, participantId), so insert, update, remove,
+    rank-of and positional range queries take O(log n) expected time.
+    serialize() returns the keys in rank order as JSON-friendly lists.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._head = _Node(None, MAX_LEVEL)
+        self._keys = {}
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, participant_id: str) -> bool:
+        return participant_id in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        """Participant IDs in rank order"""
+        node = self._head.next[0]
+        while node is not None:
+            yield node.key[2]
+            node = node.next[0]
+
+    def get(self, participant_id: str) -> Optional[Tuple[float, int]]:
+        """(totalScore, timestamp) of a ranked participant, or None"""
+        key = self._keys.get(participant_id)
+        return (-key[0], key[1]) if key is not None else None
+
+    def insert(self, participant_id: str, total_score: float, timestamp: int) -> bool:
+        """Add a participant or move it to its new position; False if nothing changed"""
+        key = (-total_score, timestamp, participant_id)
+        current = self._keys.get(participant_id)
+        if current == key:
+            return False
+        if current is not None:
+            self._unlink(current)
+        self._link(key)
+        self._keys[participant_id] = key
+        return True
+
+    def remove(self, participant_id: str) -> bool:
+        """Remove a participant; False if it was not ranked"""
+        key = self._keys.pop(participant_id, None)
+        if key is None:
+            return False
+        self._unlink(key)
+        return True
+
+    def rank_of(self, participant_id: str) -> Optional[int]:
+        """1-based rank of a participant, or None if it is not ranked"""
+        key = self._keys.get(participant_id)
+        if key is None:
+            return None
+        return self.count_before(key) + 1
+
+    def count_before(self, key: tuple, inclusive: bool = False) -> int:
+        """Number of participants ranked before a ranking key (or at it, with inclusive)"""
+        node = self._head
+        position = 0
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and (
+                node.next[level].key <= key if inclusive else node.next[level].key < key
+            ):
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def range(self, start: int, stop: int) -> List[str]:
+        """Participant IDs at 0-based rank positions [start, stop)"""
+        start = max(start, 0)
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+
+        # Descend to the node at position start, then walk the bottom level
+        node = self._head
+        remaining = start + 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+
+        participant_ids = []
+        while node is not None and len(participant_ids) < stop - start:
+            participant_ids.append(node.key[2])
+            node = node.next[0]
+        return participant_ids
+
+    def serialize(self) -> List[List[Any]]:
+        """[[totalScore, timestamp, participantId], ...] in rank order"""
+        entries = []
+        node = self._head.next[0]
+        while node is not None:
+            entries.append([-node.key[0], node.key[1], node.key[2]])
+            node = node.next[0]
+        return entries
+
+    @classmethod
+    def deserialize(cls, entries: List[List[Any]], seed: Optional[int] = None) -> 'RankingIndex':
+        """Rebuild an index from serialize() output"""
+        index = cls(seed)
+        for total_score, timestamp, participant_id in entries:
+            index.insert(participant_id, total_score, timestamp)
+        return index
+
+    @classmethod
+    def from_rankings(cls, rankings: List[Dict[str, Any]], seed: Optional[int] = None) -> 'RankingIndex':
+        """Build an index from leaderboard entries"""
+        index = cls(seed)
+        for participant in rankings:
+            index.insert(participant['participantId'], participant['totalScore'], participant['timestamp'])
+        return index
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def _link(self, key: tuple):
+        # Last node before key on every level, and the bottom-level steps taken there
+        chain = [None] * MAX_LEVEL
+        steps_at_level = [0] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key <= key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        new_node = _Node(key, self._random_level())
+        steps = 0
+        for level in range(len(new_node.next)):
+            previous = chain[level]
+            new_node.next[level] = previous.next[level]
+            previous.next[level] = new_node
+            new_node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(len(new_node.next), MAX_LEVEL):
+            chain[level].width[level] += 1
+
+    def _unlink(self, key: tuple):
+        chain = [None] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), MAX_LEVEL):
+            chain[level].width[level] -= 1
@@ -1,9 +1,14 @@
 import * as cdk from 'aws-cdk-lib';
 import * as s3 from 'aws-cdk-lib/aws-s3';
+import * as s3n from 'aws-cdk-lib/aws-s3-notifications';
 import * as cloudfront from 'aws-cdk-lib/aws-cloudfront';
 import * as origins from 'aws-cdk-lib/aws-cloudfront-origins';
 import * as apigateway from 'aws-cdk-lib/aws-apigateway';
 import * as lambda from 'aws-cdk-lib/aws-lambda';
+import * as lambdaEventSources from 'aws-cdk-lib/aws-lambda-event-sources';
+import * as sqs from 'aws-cdk-lib/aws-sqs';
+import * as events from 'aws-cdk-lib/aws-events';
+import * as targets from 'aws-cdk-lib/aws-events-targets';
 
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as s3deploy from 'aws-cdk-lib/aws-s3-deployment';
@@ -51,6 +56,13 @@ export class LeaderboardStack extends cdk.Stack {
           expiration: cdk.Duration.days(180), // Keep evaluation results for 180 days
           noncurrentVersionExpiration: cdk.Duration.days(30),
         },
+        {
+          id: 'DeleteOldLeaderboardSnapshots',
+          enabled: true,
+          prefix: 'leaderboard-snapshots/versions/',
+          expiration: cdk.Duration.days(7), // Superseded snapshots are only needed by in-flight readers
+          noncurrentVersionExpiration: cdk.Duration.days(1),
+        },
       ],
     });
 
@@ -120,7 +132,7 @@ export class LeaderboardStack extends cdk.Stack {
           statements: [
             new iam.PolicyStatement({
               effect: iam.Effect.ALLOW,
-              actions: ['s3:GetObject', 's3:PutObject', 's3:PutObjectMetadata'],
+              actions: ['s3:GetObject', 's3:PutObject', 's3:PutObjectMetadata', 's3:AbortMultipartUpload'],
               resources: [
                 participantResultsBucket.arnForObjects('*'),
                 evaluationOutputBucket.arnForObjects('*'),
@@ -149,22 +161,119 @@ export class LeaderboardStack extends cdk.Stack {
       },
     });
 
+    // Queue of accepted evaluation submissions, drained by the judge worker
+    const submissionDeadLetterQueue = new sqs.Queue(this, 'SubmissionDeadLetterQueue', {
+      retentionPeriod: cdk.Duration.days(14),
+    });
+
+    const submissionQueue = new sqs.Queue(this, 'SubmissionQueue', {
+      visibilityTimeout: cdk.Duration.minutes(20), // Must exceed the worker timeout
+      deadLetterQueue: {
+        queue: submissionDeadLetterQueue,
+        maxReceiveCount: 3,
+      },
+    });
+
+    // Shared Python modules (retry, circuit breaker and metrics layer) for all functions
+    const commonLayer = new lambda.LayerVersion(this, 'CommonPythonLayer', {
+      code: lambda.Code.fromAsset('lambda/common'),
+      compatibleRuntimes: [lambda.Runtime.PYTHON_3_10],
+      description: 'Shared resilience layer for the leaderboard Lambda functions',
+    });
+
     // Lambda Functions
     const judgeOrchestratorFunction = new lambda.Function(this, 'JudgeOrchestratorFunction', {
       runtime: lambda.Runtime.PYTHON_3_10,
       handler: 'judge_orchestrator.handler',
       code: lambda.Code.fromAsset('lambda/judge-orchestrator'),
+      timeout: cdk.Duration.seconds(29), // Only validates and enqueues; the worker does the heavy lifting
+      memorySize: 256,
+      role: lambdaExecutionRole,
+      layers: [commonLayer],
+      environment: {
+        PARTICIPANT_RESULTS_BUCKET: participantResultsBucket.bucketName,
+        BEDROCK_MODEL_ID: 'anthropic.claude-3-sonnet-20240229-v1:0',
+        BEDROCK_EVALUATION_ROLE_ARN: bedrockEvaluationRole.roleArn,
+        EVALUATION_OUTPUT_BUCKET: evaluationOutputBucket.bucketName,
+        SUBMISSION_QUEUE_URL: submissionQueue.queueUrl,
+        JOB_MAX_CONCURRENT: '10',
+        JOB_CREATE_RATE: '0.2',
+        JOB_CREATE_BURST: '2',
+        JOB_BATCH_MAX_SUBMISSIONS: '1',
+        JOB_BATCH_WINDOW_SECONDS: '30',
+      },
+    });
+
+    const judgeWorkerFunction = new lambda.Function(this, 'JudgeWorkerFunction', {
+      runtime: lambda.Runtime.PYTHON_3_10,
+      handler: 'judge_orchestrator.worker_handler',
+      code: lambda.Code.fromAsset('lambda/judge-orchestrator'),
       timeout: cdk.Duration.minutes(15),
       memorySize: 1024,
       role: lambdaExecutionRole,
+      layers: [commonLayer],
+      environment: {
+        PARTICIPANT_RESULTS_BUCKET: participantResultsBucket.bucketName,
+        BEDROCK_MODEL_ID: 'anthropic.claude-3-sonnet-20240229-v1:0',
+        BEDROCK_EVALUATION_ROLE_ARN: bedrockEvaluationRole.roleArn,
+        EVALUATION_OUTPUT_BUCKET: evaluationOutputBucket.bucketName,
+        SUBMISSION_QUEUE_URL: submissionQueue.queueUrl,
+        JOB_MAX_CONCURRENT: '10',
+        JOB_CREATE_RATE: '0.2',
+        JOB_CREATE_BURST: '2',
+        JOB_BATCH_MAX_SUBMISSIONS: '1',
+        JOB_BATCH_WINDOW_SECONDS: '30',
+        JUDGE_CACHE_ENABLED: 'true',
+        DATASET_MAX_RECORDS: '1000',
+        DATASET_MAX_BYTES: String(256 * 1024 * 1024),
+        DATASET_SHARD_RECORDS: '0',
+        DATASET_MAX_SHARDS: '8',
+      },
+    });
+
+    submissionQueue.grantSendMessages(judgeOrchestratorFunction);
+    // Workers share the scheduler state and job registry objects in S3, so a
+    // submission burst is worked off by a few workers instead of one per message
+    judgeWorkerFunction.addEventSource(new lambdaEventSources.SqsEventSource(submissionQueue, {
+      batchSize: 1,
+      maxConcurrency: 5,
+      reportBatchItemFailures: true,
+    }));
+
+    // Polls tracked evaluation jobs in batches and runs the completion hooks.
+    // The schedule fires every minute; the tracker skips polls that are not
+    // due yet according to its adaptive backoff.
+    const judgeJobTrackerFunction = new lambda.Function(this, 'JudgeJobTrackerFunction', {
+      runtime: lambda.Runtime.PYTHON_3_10,
+      handler: 'judge_orchestrator.tracker_handler',
+      code: lambda.Code.fromAsset('lambda/judge-orchestrator'),
+      timeout: cdk.Duration.minutes(5),
+      memorySize: 512,
+      role: lambdaExecutionRole,
+      layers: [commonLayer],
       environment: {
         PARTICIPANT_RESULTS_BUCKET: participantResultsBucket.bucketName,
         BEDROCK_MODEL_ID: 'anthropic.claude-3-sonnet-20240229-v1:0',
         BEDROCK_EVALUATION_ROLE_ARN: bedrockEvaluationRole.roleArn,
         EVALUATION_OUTPUT_BUCKET: evaluationOutputBucket.bucketName,
+        SUBMISSION_QUEUE_URL: submissionQueue.queueUrl,
+        JOB_MAX_CONCURRENT: '10',
+        JOB_CREATE_RATE: '0.2',
+        JOB_CREATE_BURST: '2',
+        JOB_BATCH_MAX_SUBMISSIONS: '1',
+        JOB_BATCH_WINDOW_SECONDS: '30',
+        JUDGE_CACHE_ENABLED: 'true',
+        JOB_POLL_MIN_INTERVAL: '60',
+        JOB_POLL_MAX_INTERVAL: '900',
+        JOB_RESUBMIT_ATTEMPTS: '1',
       },
     });
 
+    new events.Rule(this, 'JudgeJobTrackerSchedule', {
+      schedule: events.Schedule.rate(cdk.Duration.minutes(1)),
+      targets: [new targets.LambdaFunction(judgeJobTrackerFunction)],
+    });
+
     const leaderboardApiFunction = new lambda.Function(this, 'LeaderboardApiFunction', {
       runtime: lambda.Runtime.PYTHON_3_10,
       handler: 'leaderboard_api.handler',
@@ -172,15 +281,31 @@ export class LeaderboardStack extends cdk.Stack {
       timeout: cdk.Duration.minutes(5),
       memorySize: 1024,
       role: lambdaExecutionRole,
+      layers: [commonLayer],
       environment: {
         EVALUATION_OUTPUT_BUCKET: evaluationOutputBucket.bucketName,
+        FETCH_CONCURRENCY: '16',
+        FETCH_MAX_INFLIGHT_BYTES: String(256 * 1024 * 1024),
+        SUMMARY_CACHE_MAX_ENTRIES: '2048',
+        LEADERBOARD_MAX_AGE: '5',
+        LEADERBOARD_STALE_WHILE_REVALIDATE: '30',
+        COMPRESSION_MIN_BYTES: '1024',
       },
     });
 
+    // Rebuild the leaderboard snapshot whenever Bedrock writes a new evaluation output
+    evaluationOutputBucket.addEventNotification(
+      s3.EventType.OBJECT_CREATED,
+      new s3n.LambdaDestination(leaderboardApiFunction),
+      { prefix: 'evaluation-results/', suffix: '_output.jsonl' },
+    );
+
     // API Gateway
     const api = new apigateway.RestApi(this, 'LeaderboardApi', {
       restApiName: 'LLM Leaderboard API',
       description: 'API for LLM Leaderboard system',
+      // Lets the Lambda return base64-encoded gzip/deflate bodies
+      binaryMediaTypes: ['*/*'],
       defaultCorsPreflightOptions: {
         allowOrigins: apigateway.Cors.ALL_ORIGINS,
         allowMethods: apigateway.Cors.ALL_METHODS,
@@ -230,6 +355,12 @@ export class LeaderboardStack extends cdk.Stack {
     const leaderboardResource = api.root.addResource('leaderboard');
     leaderboardResource.addMethod('GET', new apigateway.LambdaIntegration(leaderboardApiFunction));
 
+    const participantResource = api.root.addResource('participants').addResource('{participantId}');
+    participantResource.addMethod('GET', new apigateway.LambdaIntegration(leaderboardApiFunction));
+
+    const participantRankResource = participantResource.addResource('rank');
+    participantRankResource.addMethod('GET', new apigateway.LambdaIntegration(leaderboardApiFunction));
+
     const judgeResource = judgeApi.root.addResource('evaluate');
     judgeResource.addMethod('POST', new apigateway.LambdaIntegration(judgeOrchestratorFunction), {
       requestModels: {
@@ -237,6 +368,12 @@ export class LeaderboardStack extends cdk.Stack {
       },
     });
 
+    const submissionResource = judgeApi.root.addResource('submissions').addResource('{submissionId}');
+    submissionResource.addMethod('GET', new apigateway.LambdaIntegration(judgeOrchestratorFunction));
+
+    const queueResource = judgeApi.root.addResource('queue');
+    queueResource.addMethod('GET', new apigateway.LambdaIntegration(judgeOrchestratorFunction));
+
     // CloudFront Origin Access Identity
     const originAccessIdentity = new cloudfront.OriginAccessIdentity(this, 'OAI', {
       comment: 'OAI for Leaderboard S3 bucket',
@@ -245,6 +382,21 @@ export class LeaderboardStack extends cdk.Stack {
     // Grant CloudFront access to S3 bucket
     webAppBucket.grantRead(originAccessIdentity);
 
+    // Cache policy for the leaderboard API: TTLs come from the Lambda's
+    // Cache-Control (short max-age + stale-while-revalidate), every query
+    // string is part of the cache key, and Accept-Encoding is forwarded so
+    // the Lambda can return gzip bodies
+    const leaderboardApiCachePolicy = new cloudfront.CachePolicy(this, 'LeaderboardApiCachePolicy', {
+      comment: 'Honors leaderboard API Cache-Control and ETag headers',
+      minTtl: cdk.Duration.seconds(0),
+      defaultTtl: cdk.Duration.seconds(0),
+      maxTtl: cdk.Duration.seconds(60),
+      queryStringBehavior: cloudfront.CacheQueryStringBehavior.all(),
+      headerBehavior: cloudfront.CacheHeaderBehavior.none(),
+      cookieBehavior: cloudfront.CacheCookieBehavior.none(),
+      enableAcceptEncodingGzip: true,
+    });
+
     // CloudFront Distribution
     const distribution = new cloudfront.Distribution(this, 'LeaderboardDistribution', {
       defaultBehavior: {
@@ -258,9 +410,15 @@ export class LeaderboardStack extends cdk.Stack {
         '/leaderboard': {
           origin: new origins.RestApiOrigin(api),
           viewerProtocolPolicy: cloudfront.ViewerProtocolPolicy.HTTPS_ONLY,
-          cachePolicy: cloudfront.CachePolicy.CACHING_DISABLED,
+          cachePolicy: leaderboardApiCachePolicy,
           allowedMethods: cloudfront.AllowedMethods.ALLOW_ALL,
         },
+        '/participants/*': {
+          origin: new origins.RestApiOrigin(api),
+          viewerProtocolPolicy: cloudfront.ViewerProtocolPolicy.HTTPS_ONLY,
+          cachePolicy: leaderboardApiCachePolicy,
+          allowedMethods: cloudfront.AllowedMethods.ALLOW_GET_HEAD,
+        },
       },
       defaultRootObject: 'index.html',
       errorResponses: [
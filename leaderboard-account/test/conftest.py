@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+# The Lambda handlers read their configuration at import time; the tests run
+# them against the local S3, Bedrock and queue stand-ins
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('BEDROCK_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
+os.environ.setdefault('BEDROCK_EVALUATION_ROLE_ARN', 'arn:aws:iam::000000000000:role/evaluation')
+os.environ.setdefault('PARTICIPANT_RESULTS_BUCKET', 'participant-results')
+os.environ.setdefault('EVALUATION_OUTPUT_BUCKET', 'evaluation-output')
+os.environ['S3_BACKEND'] = 'local'
+os.environ['LOCAL_S3_ROOT'] = tempfile.mkdtemp(prefix='leaderboard-test-s3-')
+os.environ['BEDROCK_BACKEND'] = 'local'
+os.environ.pop('SUBMISSION_QUEUE_URL', None)
+
+# Appended, so the installed boto3 wins over the copies vendored in the function directories
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda')
+for directory in ('common/python', 'judge-orchestrator', 'leaderboard-api'):
+    sys.path.append(os.path.join(LAMBDA_DIR, directory))
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def mock_dataset(number: int = 1) -> bytes:
+    """Contents of test/mock-bedrock-dataset00<number>.jsonl"""
+    with open(os.path.join(TEST_DIR, f"mock-bedrock-dataset00{number}.jsonl"), 'rb') as dataset_file:
+        return dataset_file.read()
+
+class FakeDownload:
+    """Streamed response of a presigned URL GET"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.status_code = 200
+        self.headers = {'Content-Length': str(len(body))}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    """judge_orchestrator wired to a fresh local S3 root, local Bedrock and an in-memory queue"""
+    import clients
+    import judge_orchestrator
+    from local_bedrock import LocalBedrockClient
+    from local_s3 import LocalS3Client
+    from submission_queue import InMemorySubmissionQueue
+
+    s3_client = LocalS3Client(str(tmp_path / 's3'))
+    bedrock_client = LocalBedrockClient()
+    downloads = {}
+    monkeypatch.setattr(judge_orchestrator, 's3_client', s3_client)
+    monkeypatch.setattr(judge_orchestrator, 'bedrock_client', bedrock_client)
+    monkeypatch.setattr(judge_orchestrator, 'submission_queue', InMemorySubmissionQueue())
+    monkeypatch.setattr(judge_orchestrator.job_scheduler, 's3_client', s3_client)
+    monkeypatch.setattr(judge_orchestrator.job_tracker, 's3_client', s3_client)
+    monkeypatch.setattr(judge_orchestrator.job_tracker, 'bedrock_client', bedrock_client)
+    monkeypatch.setattr(clients.get_http_session(), 'get', lambda url, **kwargs: FakeDownload(downloads[url]))
+    return SimpleNamespace(module=judge_orchestrator, s3=s3_client, bedrock=bedrock_client, downloads=downloads)
+
+@pytest.fixture
+def leaderboard(tmp_path, monkeypatch):
+    """leaderboard_api wired to a fresh local S3 root"""
+    import leaderboard_api
+    from local_s3 import LocalS3Client
+
+    s3_client = LocalS3Client(str(tmp_path / 's3'))
+    monkeypatch.setattr(leaderboard_api, 's3_client', s3_client)
+    monkeypatch.setattr(leaderboard_api, '_snapshot_memo', {})
+    monkeypatch.setattr(leaderboard_api, '_shard_manifests', {})
+    monkeypatch.setattr(leaderboard_api, 'summary_cache', leaderboard_api.SummaryCache(leaderboard_api.SUMMARY_CACHE_MAX_ENTRIES))
+    return SimpleNamespace(module=leaderboard_api, s3=s3_client)
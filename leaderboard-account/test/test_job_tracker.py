@@ -0,0 +1,115 @@
+import json
+import time
+
+from job_tracker import JOB_REGISTRY_KEY, EvaluationJobTracker
+from local_bedrock import LocalBedrockClient
+from local_s3 import LocalS3Client
+
+from test_submission_queue import submission_status, submit
+
+BUCKET = 'participant-results'
+
+def start_jobs(bedrock, tracker, count):
+    arns = []
+    for i in range(count):
+        arn = bedrock.create_evaluation_job(jobName=f"llm-judge-participant-{i:03d}-1700000000")['jobArn']
+        tracker.register({'evaluationJobArn': arn, 'createdAt': time.time()})
+        arns.append(arn)
+    return arns
+
+def registry(s3_client):
+    return json.loads(s3_client.get_object(Bucket=BUCKET, Key=JOB_REGISTRY_KEY)['Body'].read())
+
+def test_completion_hooks_run_once_and_failed_hooks_are_retried(tmp_path):
+    s3_client = LocalS3Client(str(tmp_path))
+    bedrock = LocalBedrockClient(complete_after_seconds=3600)
+    tracker = EvaluationJobTracker(s3_client, BUCKET, bedrock)
+    calls = []
+    failures = [RuntimeError('S3 unavailable')]
+
+    def record_completion(job):
+        calls.append(('record_completion', job['evaluationJobArn']))
+
+    def flaky_ingest(job):
+        calls.append(('flaky_ingest', job['evaluationJobArn']))
+        if failures:
+            raise failures.pop()
+    tracker.add_hook('Completed', record_completion)
+    tracker.add_hook('Completed', flaky_ingest)
+
+    arn, = start_jobs(bedrock, tracker, 1)
+    assert tracker.poll(force=True)['finished'] == []
+    assert calls == []
+
+    bedrock.finish_job(arn)
+    result = tracker.poll(force=True)
+    assert result['finished'] == []
+    # The job stays tracked (but no longer active) until every hook succeeded
+    job = registry(s3_client)['jobs'][arn]
+    assert job['status'] == 'Completed'
+    assert job['hooksDone'] == ['record_completion']
+    assert tracker.active_jobs() == []
+
+    result = tracker.poll(force=True)
+    assert [job['evaluationJobArn'] for job in result['finished']] == [arn]
+    assert calls == [('record_completion', arn), ('flaky_ingest', arn), ('flaky_ingest', arn)]
+    assert registry(s3_client)['jobs'] == {}
+
+    assert tracker.poll(force=True) == {'polled': False, 'tracked': 0, 'finished': []}
+    assert len(calls) == 3
+
+def test_statuses_are_listed_in_batches(tmp_path):
+    s3_client = LocalS3Client(str(tmp_path))
+    bedrock = LocalBedrockClient()
+    tracker = EvaluationJobTracker(s3_client, BUCKET, bedrock)
+    finished = []
+    tracker.add_hook('Completed', lambda job: finished.append(job['evaluationJobArn']))
+
+    arns = start_jobs(bedrock, tracker, 150)
+    bedrock.calls.clear()
+    result = tracker.poll(force=True)
+
+    # Two pages of ListEvaluationJobs instead of one GetEvaluationJob per job
+    assert bedrock.calls == ['ListEvaluationJobs', 'ListEvaluationJobs']
+    assert sorted(finished) == sorted(arns)
+    assert result['tracked'] == 0
+
+def test_poll_backs_off_while_nothing_changes(tmp_path):
+    s3_client = LocalS3Client(str(tmp_path))
+    bedrock = LocalBedrockClient(complete_after_seconds=3600)
+    tracker = EvaluationJobTracker(s3_client, BUCKET, bedrock, min_interval=60, max_interval=240)
+    start_jobs(bedrock, tracker, 1)
+
+    now = time.time()
+    intervals = []
+    for _ in range(4):
+        tracker.poll(now=now, force=True)
+        intervals.append(registry(s3_client)['pollIntervalSeconds'])
+    assert intervals == [120, 240, 240, 240]
+    assert tracker.poll(now=now + 1)['polled'] is False
+
+def test_failed_job_is_resubmitted(orchestrator, monkeypatch):
+    monkeypatch.setattr(orchestrator.module, 'JOB_RESUBMIT_ATTEMPTS', 1)
+    accepted = submit(orchestrator)
+    orchestrator.module.worker_handler({}, None)
+    first_arn, = orchestrator.bedrock.jobs
+    resubmitted = []
+    resubmit = orchestrator.module.resubmit_evaluation_job
+    monkeypatch.setattr(orchestrator.module, 'resubmit_evaluation_job', lambda job: resubmitted.append(job) or resubmit(job))
+
+    orchestrator.bedrock.finish_job(first_arn, 'Failed')
+    result = orchestrator.module.tracker_handler({'force': True}, None)
+
+    assert result['finished'] == [{'evaluationJobArn': first_arn, 'status': 'Failed'}]
+    assert [job['evaluationJobArn'] for job in resubmitted] == [first_arn]
+    # The requeued job is dispatched by the same tracker run
+    assert result['dispatched'] == 1
+    assert len(orchestrator.bedrock.jobs) == 2
+    assert submission_status(orchestrator, accepted['submissionId']) == 'JOB_CREATED'
+
+    # The second failure exhausts the resubmit attempts
+    second_arn = next(arn for arn in orchestrator.bedrock.jobs if arn != first_arn)
+    orchestrator.bedrock.finish_job(second_arn, 'Failed')
+    orchestrator.module.tracker_handler({'force': True}, None)
+    assert len(resubmitted) == 1
+    assert submission_status(orchestrator, accepted['submissionId']) == 'FAILED'
@@ -0,0 +1,106 @@
+import json
+
+BUCKET = 'evaluation-output'
+
+def run_dir(participant_id, timestamp):
+    return f"evaluation-results/{participant_id}/llm-judge-{participant_id}-{timestamp}"
+
+def write_output(leaderboard, participant_id, timestamp, scores, shard=None):
+    """Write a Bedrock _output.jsonl with one record per score and return its key"""
+    shard_dir = f"shards/{shard}/" if shard is not None else ''
+    key = f"{run_dir(participant_id, timestamp)}/{shard_dir}job-{timestamp}/models/judge/datasets/dataset_output.jsonl"
+    records = [
+        {
+            'inputRecord': {'prompt': f"prompt {i}", 'category': 'general'},
+            'automatedEvaluationResult': {'scores': [{'metricName': 'Builtin.Correctness', 'result': score}]}
+        }
+        for i, score in enumerate(scores)
+    ]
+    leaderboard.s3.put_object(Bucket=BUCKET, Key=key, Body='\n'.join(json.dumps(record) for record in records).encode('utf-8'))
+    return key
+
+def s3_event(*keys):
+    return {'Records': [
+        {'eventSource': 'aws:s3', 's3': {'bucket': {'name': BUCKET}, 'object': {'key': key}}}
+        for key in keys
+    ]}
+
+def rankings(leaderboard):
+    response = leaderboard.module.handler({'httpMethod': 'GET', 'path': '/leaderboard'}, None)
+    assert response['statusCode'] == 200
+    return {participant['participantId']: participant for participant in json.loads(response['body'])['rankings']}
+
+def snapshot_versions(leaderboard):
+    listing = leaderboard.s3.list_objects_v2(Bucket=BUCKET, Prefix='leaderboard-snapshots/versions/')
+    return [obj['Key'] for obj in listing.get('Contents', [])]
+
+def test_new_run_is_ranked(leaderboard):
+    first = write_output(leaderboard, 'participant-001', 1700000000, [0.5, 0.7])
+    result = leaderboard.module.handler(s3_event(first), None)
+    assert result['count'] == 1
+
+    second = write_output(leaderboard, 'participant-002', 1700000100, [0.9, 0.9])
+    result = leaderboard.module.handler(s3_event(second), None)
+    assert result['updated'] == 1
+    assert result['count'] == 2
+
+    ranked = rankings(leaderboard)
+    assert ranked['participant-002']['rank'] == 1
+    assert ranked['participant-001']['rank'] == 2
+    assert ranked['participant-001']['totalScore'] == 0.6
+
+def test_duplicate_event_publishes_nothing(leaderboard):
+    key = write_output(leaderboard, 'participant-001', 1700000000, [0.5])
+    leaderboard.module.handler(s3_event(key), None)
+    other = write_output(leaderboard, 'participant-002', 1700000100, [0.8])
+    first = leaderboard.module.handler(s3_event(other), None)
+    versions = snapshot_versions(leaderboard)
+
+    # S3 delivers notifications at least once
+    second = leaderboard.module.handler(s3_event(other), None)
+
+    assert second['version'] == first['version']
+    assert snapshot_versions(leaderboard) == versions
+
+def test_incomplete_sharded_run_stays_unranked(leaderboard):
+    key = write_output(leaderboard, 'participant-001', 1700000000, [0.5])
+    leaderboard.module.handler(s3_event(key), None)
+
+    leaderboard.s3.put_object(
+        Bucket=BUCKET,
+        Key=f"{run_dir('participant-002', 1700000100)}/shard-manifest.json",
+        Body=json.dumps({'shardCount': 2}).encode('utf-8')
+    )
+    first_shard = write_output(leaderboard, 'participant-002', 1700000100, [0.9], shard=0)
+    result = leaderboard.module.handler(s3_event(first_shard), None)
+
+    assert result['updated'] == 0
+    assert 'participant-002' not in rankings(leaderboard)
+
+    second_shard = write_output(leaderboard, 'participant-002', 1700000100, [0.7], shard=1)
+    result = leaderboard.module.handler(s3_event(second_shard), None)
+
+    assert result['updated'] == 1
+    ranked = rankings(leaderboard)['participant-002']
+    assert ranked['evaluationCount'] == 2
+    assert ranked['totalScore'] == 0.8
+
+def test_newer_run_replaces_older_one(leaderboard):
+    older = write_output(leaderboard, 'participant-001', 1700000000, [0.2])
+    leaderboard.module.handler(s3_event(older), None)
+    other = write_output(leaderboard, 'participant-002', 1700000050, [0.5])
+    leaderboard.module.handler(s3_event(other), None)
+    assert rankings(leaderboard)['participant-001']['rank'] == 2
+
+    newer = write_output(leaderboard, 'participant-001', 1700000100, [0.9])
+    leaderboard.module.handler(s3_event(newer), None)
+
+    ranked = rankings(leaderboard)
+    assert ranked['participant-001']['rank'] == 1
+    assert ranked['participant-001']['timestamp'] == 1700000100
+    assert ranked['participant-001']['totalScore'] == 0.9
+    assert len(ranked) == 2
+
+    # A late notification for the older run does not bring it back
+    leaderboard.module.handler(s3_event(older), None)
+    assert rankings(leaderboard)['participant-001']['timestamp'] == 1700000100
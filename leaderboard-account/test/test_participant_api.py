@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from test_leaderboard_events import s3_event, write_output
+
+def get(leaderboard, path, participant_id):
+    response = leaderboard.module.handler({
+        'httpMethod': 'GET',
+        'path': path,
+        'pathParameters': {'participantId': participant_id}
+    }, None)
+    return response['statusCode'], json.loads(response['body']) if response['body'] else None
+
+@pytest.mark.parametrize('participant_id', ['../participant-001', 'Participant-001', 'participant-001/rank', 'a' * 80])
+def test_rank_rejects_invalid_participant_ids(leaderboard, participant_id):
+    status, body = get(leaderboard, f"/participants/{participant_id}/rank", participant_id)
+    assert status == 400
+    assert body == {'error': 'participantId is not a valid participant ID'}
+
+def test_rank_of_ranked_participant(leaderboard):
+    leaderboard.module.handler(s3_event(write_output(leaderboard, 'participant-001', 1700000000, [0.4])), None)
+    leaderboard.module.handler(s3_event(write_output(leaderboard, 'participant-002', 1700000100, [0.8])), None)
+
+    status, body = get(leaderboard, '/participants/participant-001/rank', 'participant-001')
+    assert status == 200
+    assert body['rank'] == 2
+    assert body['participantCount'] == 2
+
+    status, _ = get(leaderboard, '/participants/participant-003/rank', 'participant-003')
+    assert status == 404
+
+def test_detail_is_served_from_participant_entry(leaderboard, monkeypatch):
+    older = write_output(leaderboard, 'participant-001', 1700000000, [0.4])
+    leaderboard.module.handler(s3_event(older), None)
+    newer = write_output(leaderboard, 'participant-001', 1700000100, [0.6, 0.8])
+    leaderboard.module.handler(s3_event(newer), None)
+
+    def no_snapshot(*args, **kwargs):
+        raise AssertionError('participant detail must not load the snapshot')
+    monkeypatch.setattr(leaderboard.module, 'load_snapshot', no_snapshot)
+    monkeypatch.setattr(leaderboard.module, 'rebuild_snapshot', no_snapshot)
+    monkeypatch.setattr(leaderboard.module, 'iter_evaluation_records', no_snapshot)
+
+    status, body = get(leaderboard, '/participants/participant-001', 'participant-001')
+    assert status == 200
+    assert body['rank'] == 1
+    assert body['participantCount'] == 1
+    assert body['rankedTimestamp'] == 1700000100
+    assert body['totalScore'] == 0.7
+    assert body['evaluationCount'] == 2
+    assert [(run['timestamp'], run['status'], run['totalScore']) for run in body['runs']] == [
+        (1700000100, 'COMPLETED', 0.7),
+        (1700000000, 'COMPLETED', 0.4)
+    ]
+
+def test_detail_of_participant_with_only_a_run_in_progress(leaderboard):
+    leaderboard.module.handler(s3_event(write_output(leaderboard, 'participant-001', 1700000000, [0.5])), None)
+    leaderboard.s3.put_object(
+        Bucket='evaluation-output',
+        Key='evaluation-results/participant-002/llm-judge-participant-002-1700000100/shard-manifest.json',
+        Body=json.dumps({'shardCount': 2}).encode('utf-8')
+    )
+    leaderboard.module.handler(s3_event(write_output(leaderboard, 'participant-002', 1700000100, [0.9], shard=0)), None)
+
+    status, body = get(leaderboard, '/participants/participant-002', 'participant-002')
+    assert status == 200
+    assert body['rank'] is None
+    assert body['runs'] == [{'timestamp': 1700000100, 'status': 'IN_PROGRESS'}]
+
+    status, _ = get(leaderboard, '/participants/participant-003', 'participant-003')
+    assert status == 404
+
+def test_detail_etag_changes_with_participant_entry(leaderboard):
+    leaderboard.module.handler(s3_event(write_output(leaderboard, 'participant-001', 1700000000, [0.5])), None)
+    first = leaderboard.module.handler({
+        'httpMethod': 'GET',
+        'path': '/participants/participant-001',
+        'pathParameters': {'participantId': 'participant-001'}
+    }, None)
+    etag = first['headers']['ETag']
+
+    revalidated = leaderboard.module.handler({
+        'httpMethod': 'GET',
+        'path': '/participants/participant-001',
+        'pathParameters': {'participantId': 'participant-001'},
+        'headers': {'If-None-Match': etag}
+    }, None)
+    assert revalidated['statusCode'] == 304
+
+    leaderboard.module.handler(s3_event(write_output(leaderboard, 'participant-001', 1700000100, [0.9])), None)
+    changed = leaderboard.module.handler({
+        'httpMethod': 'GET',
+        'path': '/participants/participant-001',
+        'pathParameters': {'participantId': 'participant-001'},
+        'headers': {'If-None-Match': etag}
+    }, None)
+    assert changed['statusCode'] == 200
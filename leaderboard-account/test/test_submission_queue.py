@@ -0,0 +1,98 @@
+import json
+
+from botocore.exceptions import ClientError
+
+from conftest import mock_dataset
+
+def submit(orchestrator, participant_id='participant-001'):
+    # mock-bedrock-dataset00N.jsonl holds the responses of participant-00N
+    url = f"https://datasets.example.com/{participant_id}.jsonl"
+    orchestrator.downloads[url] = mock_dataset(int(participant_id[-3:]))
+    response = orchestrator.module.handler({
+        'httpMethod': 'POST',
+        'body': json.dumps({'participantId': participant_id, 'presignedUrl': url})
+    }, None)
+    assert response['statusCode'] == 202
+    return json.loads(response['body'])
+
+def submission_status(orchestrator, submission_id):
+    response = orchestrator.module.handler({'httpMethod': 'GET', 'pathParameters': {'submissionId': submission_id}}, None)
+    return json.loads(response['body'])['status']
+
+def sqs_event(*messages):
+    return {'Records': [
+        {'eventSource': 'aws:sqs', 'messageId': f"message-{i}", 'body': json.dumps(message)}
+        for i, message in enumerate(messages)
+    ]}
+
+def test_post_evaluate_is_queued_and_processed_by_worker(orchestrator):
+    accepted = submit(orchestrator)
+    assert accepted['status'] == 'QUEUED'
+    assert submission_status(orchestrator, accepted['submissionId']) == 'QUEUED'
+
+    assert orchestrator.module.worker_handler({}, None) == {'processed': 1, 'failed': 0}
+
+    assert submission_status(orchestrator, accepted['submissionId']) == 'JOB_CREATED'
+    assert orchestrator.bedrock.calls.count('CreateEvaluationJob') == 1
+    assert orchestrator.module.worker_handler({}, None) == {'processed': 0, 'failed': 0}
+
+def test_file_backed_queue_carries_submissions_to_the_worker(orchestrator, tmp_path, monkeypatch):
+    from submission_queue import FileSubmissionQueue
+
+    monkeypatch.setattr(orchestrator.module, 'submission_queue', FileSubmissionQueue(str(tmp_path / 'queue.jsonl')))
+    first = submit(orchestrator, 'participant-001')
+    second = submit(orchestrator, 'participant-002')
+
+    assert orchestrator.module.worker_handler({}, None) == {'processed': 2, 'failed': 0}
+    for accepted in (first, second):
+        assert submission_status(orchestrator, accepted['submissionId']) == 'JOB_CREATED'
+
+def test_throttled_sqs_message_is_reported_as_batch_item_failure(orchestrator, monkeypatch):
+    accepted = submit(orchestrator)
+    message = orchestrator.module.submission_queue.drain()[0]
+    put_object = orchestrator.s3.put_object
+
+    def throttled_put_object(**kwargs):
+        if kwargs['Key'].startswith('participant-results/'):
+            raise ClientError({'Error': {'Code': 'SlowDown', 'Message': 'Reduce your request rate'}}, 'PutObject')
+        return put_object(**kwargs)
+    monkeypatch.setattr(orchestrator.s3, 'put_object', throttled_put_object)
+
+    result = orchestrator.module.worker_handler(sqs_event(message), None)
+
+    # Left to SQS redelivery instead of being failed
+    assert result == {'batchItemFailures': [{'itemIdentifier': 'message-0'}]}
+    assert submission_status(orchestrator, accepted['submissionId']) == 'PROCESSING'
+
+    monkeypatch.setattr(orchestrator.s3, 'put_object', put_object)
+    assert orchestrator.module.worker_handler(sqs_event(message), None) == {'batchItemFailures': []}
+    assert submission_status(orchestrator, accepted['submissionId']) == 'JOB_CREATED'
+
+def test_permanent_sqs_failure_is_final(orchestrator, monkeypatch):
+    accepted = submit(orchestrator)
+    message = orchestrator.module.submission_queue.drain()[0]
+    put_object = orchestrator.s3.put_object
+
+    def denied_put_object(**kwargs):
+        if kwargs['Key'].startswith('participant-results/'):
+            raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'Access Denied'}}, 'PutObject')
+        return put_object(**kwargs)
+    monkeypatch.setattr(orchestrator.s3, 'put_object', denied_put_object)
+
+    # Acknowledged, so SQS does not redeliver it
+    assert orchestrator.module.worker_handler(sqs_event(message), None) == {'batchItemFailures': []}
+    assert submission_status(orchestrator, accepted['submissionId']) == 'FAILED'
+
+def test_submission_that_cannot_be_queued_is_failed(orchestrator, monkeypatch):
+    def throttled_send(message):
+        raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'SendMessage')
+    monkeypatch.setattr(orchestrator.module.submission_queue, 'send', throttled_send)
+    response = orchestrator.module.handler({
+        'httpMethod': 'POST',
+        'body': json.dumps({'participantId': 'participant-001', 'presignedUrl': 'https://datasets.example.com/participant-001.jsonl'})
+    }, None)
+
+    assert response['statusCode'] == 503
+    submissions = orchestrator.s3.list_objects_v2(Bucket='participant-results', Prefix='submissions/')['Contents']
+    record = json.loads(orchestrator.s3.get_object(Bucket='participant-results', Key=submissions[0]['Key'])['Body'].read())
+    assert record['status'] == 'FAILED'